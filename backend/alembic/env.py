@@ -10,9 +10,11 @@ from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
 from alembic import context
-from database import DATABASE_URL  # Import database URL
+from backend.database import database_url  # Import database URL
 from backend.models import Base          # Import models' Base
 
+DATABASE_URL = database_url()
+
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
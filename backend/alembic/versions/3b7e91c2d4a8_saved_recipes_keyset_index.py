@@ -0,0 +1,38 @@
+"""Index saved recipes for keyset pagination
+
+Revision ID: 3b7e91c2d4a8
+Revises: 6cd7384e2869
+Create Date: 2026-10-18 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e91c2d4a8'
+down_revision: Union[str, Sequence[str], None] = '6cd7384e2869'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pages are ordered by (saved_at, recipe_id), so saved_at must be set
+    op.execute("UPDATE saved_recipes SET saved_at = now() WHERE saved_at IS NULL")
+    op.alter_column('saved_recipes', 'saved_at', existing_type=sa.TIMESTAMP(timezone=True), nullable=False,
+                    existing_server_default=sa.text('now()'))
+    op.create_index('ix_saved_recipes_user_saved', 'saved_recipes', ['user_id', 'saved_at', 'recipe_id'],
+                    unique=False)
+    # the composite index leads with user_id and replaces the single-column one
+    op.drop_index(op.f('ix_saved_recipes_user_id'), table_name='saved_recipes')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_saved_recipes_user_id'), 'saved_recipes', ['user_id'], unique=False)
+    op.drop_index('ix_saved_recipes_user_saved', table_name='saved_recipes')
+    op.alter_column('saved_recipes', 'saved_at', existing_type=sa.TIMESTAMP(timezone=True), nullable=True,
+                    existing_server_default=sa.text('now()'))
@@ -0,0 +1,72 @@
+"""Add saved_recipe_ingredients for ingredient search
+
+Revision ID: 8f2c5a1d6e93
+Revises: 3b7e91c2d4a8
+Create Date: 2026-10-18 11:30:00.000000
+
+"""
+import re
+from typing import Any, Dict, List, Sequence, Set, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f2c5a1d6e93'
+down_revision: Union[str, Sequence[str], None] = '3b7e91c2d4a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Term extraction as of this revision (backend.saved_recipes.ingredient_terms),
+# frozen here so later changes to the application do not change this backfill.
+_MAX_TERM_WORDS = 4
+_WORD_RE = re.compile(r"[a-z0-9]+(?:['-][a-z0-9]+)*")
+
+
+def _words(text: Any) -> List[str]:
+    words = _WORD_RE.findall(str(text or "").lower())
+    return [w[:-1] if w.endswith("s") and not w.endswith("ss") and len(w) > 3 else w for w in words]
+
+
+def ingredient_terms(recipe: Dict[str, Any]) -> Set[str]:
+    terms: Set[str] = set()
+    for ingredient in recipe.get("ingredients") or ():
+        words = _words(ingredient.get("name") if isinstance(ingredient, dict) else ingredient)
+        for i in range(len(words)):
+            for j in range(i + 1, min(len(words), i + _MAX_TERM_WORDS) + 1):
+                terms.add(" ".join(words[i:j])[:255])
+    return terms
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    terms = op.create_table('saved_recipe_ingredients',
+    sa.Column('recipe_id', sa.Integer(), nullable=False),
+    sa.Column('term', sa.String(length=255), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.ForeignKeyConstraint(['recipe_id'], ['saved_recipes.recipe_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ),
+    sa.PrimaryKeyConstraint('recipe_id', 'term')
+    )
+    op.create_index('ix_saved_recipe_ingredients_user_term', 'saved_recipe_ingredients',
+                    ['user_id', 'term', 'recipe_id'], unique=False)
+
+    # backfill with the term extraction the application wrote with at this revision
+    conn = op.get_bind()
+    recipes = sa.table('saved_recipes', sa.column('recipe_id'), sa.column('user_id'), sa.column('recipe_data'))
+    result = conn.execution_options(yield_per=1000).execute(
+        sa.select(recipes.c.recipe_id, recipes.c.user_id, recipes.c.recipe_data)
+    )
+    for rows in result.partitions():
+        batch = [{"recipe_id": r.recipe_id, "user_id": r.user_id, "term": t}
+                 for r in rows for t in ingredient_terms(r.recipe_data or {})]
+        if batch:
+            op.bulk_insert(terms, batch)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_saved_recipe_ingredients_user_term', table_name='saved_recipe_ingredients')
+    op.drop_table('saved_recipe_ingredients')
@@ -1,22 +1,135 @@
 """FastAPI backend for the AI-assisted recipe assistant."""
 
-from typing import List, Optional, Dict, Any
-from fastapi import FastAPI, HTTPException
+import asyncio
+import json
+import os
+import sys
+import time
+from contextlib import asynccontextmanager, suppress
+import uuid
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
+from fastapi import Depends, FastAPI, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
 from .utils.logging_utils import get_logger
 from . import context_manager as ctx
 from . import recipe_retrieval as rr
 from . import substitution_engine as se
-from .llm_interface import ask_llm, generate_recipe, has_llm, modify_recipe
-from .intent_parser import parse_intent
+from . import llm_cache
+from . import llm_interface as llm
+from . import llm_scheduler
+from . import metrics
+from . import model_routing
+from . import recipe_patch
+from . import recipe_rewrite
+from . import resilience
+from . import user_profiles
+from .llm_interface import ask_llm_async, generate_recipe_async, has_llm, modify_recipe_async
+from .history import get_history, history_stats
+from .intent_parser import intent_stats, parse_intent_async, speculative_recipe_name
+from .recipe_rewrite import record as record_rewrite, rewrite_recipe, rewrite_stats
+from .speculation import Speculation, get_speculator, speculation_stats
+from .utils.json_stream import RecipeStreamParser
 from .utils.recipe_utils import normalize_recipe
 
 
 logger = get_logger(__name__)
 
-app = FastAPI(title="Recipe Assistant API", version="0.1.0")
+
+# Startup warm-up (see lifespan): step -> {"state": running/ready/skipped/failed/cancelled, "seconds": ...}
+_WARMUP: Dict[str, Dict[str, Any]] = {}
+
+
+def _database():
+    """``backend.database``, imported on first use (it loads SQLAlchemy)."""
+    from . import database
+    return database
+
+
+def _loaded_database():
+    """``backend.database`` if something has imported it already, else None (never imports it)."""
+    if _WARMUP.get("database", {}).get("state") == "running":
+        return None  # the warm-up thread may be half-way through importing it
+    return sys.modules.get(f"{__package__}.database")
+
+
+def _db_pool_stats() -> Dict[str, Any]:
+    database = _loaded_database()
+    return database.pool_stats() if database is not None else {"ready": False}
+
+
+async def _warm_database() -> bool:
+    database = await asyncio.to_thread(_database)
+    if not database.configured():
+        return False
+    # open the pool's first connection now rather than in the first request
+    async with database.get_engine().connect() as conn:
+        await conn.exec_driver_sql("SELECT 1")
+    return True
+
+
+def _warm_substitutions() -> None:
+    se.warm_up()
+    recipe_rewrite.warm_up()
+
+
+async def _warm(name: str, step) -> None:
+    _WARMUP[name] = {"state": "running"}
+    start = time.perf_counter()
+    try:
+        done = await step()
+    except asyncio.CancelledError:  # shutdown before the step finished
+        _WARMUP[name] = {"state": "cancelled"}
+        raise
+    except Exception as e:
+        logger.warning("warm-up of %s failed: %s", name, e)
+        _WARMUP[name] = {"state": "failed", "error": str(e)}
+        return
+    _WARMUP[name] = {"state": "skipped" if done is False else "ready",
+                     "seconds": round(time.perf_counter() - start, 3)}
+
+
+async def _warm_up() -> None:
+    """Load what the first /ask needs, off the event loop, while requests are already served."""
+    start = time.perf_counter()
+    # one step at a time: the imports hold the GIL, so running them side by
+    # side only delays the LLM client, which the first /ask needs most
+    await _warm("llm_client", lambda: asyncio.to_thread(llm.warm_up))
+    await _warm("recipe_index", lambda: asyncio.to_thread(rr.get_index))
+    await _warm("substitutions", lambda: asyncio.to_thread(_warm_substitutions))
+    await _warm("database", _warm_database)
+    logger.info("warm-up finished in %.2fs: %s", time.perf_counter() - start,
+                ", ".join(f"{k} {v['state']}" for k, v in _WARMUP.items()))
+
+
+def _warmup_stats() -> Dict[str, Any]:
+    """Whether the warm-up has finished, and each step's state and duration."""
+    return {"ready": bool(_WARMUP) and all(v["state"] != "running" for v in _WARMUP.values()), **_WARMUP}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background so the server accepts requests (and /health)
+    # at once; STARTUP_WARMUP=0 leaves everything to the first request.
+    warm_up = None
+    if os.getenv("STARTUP_WARMUP", "1") not in ("0", "false", "False"):
+        warm_up = asyncio.create_task(_warm_up())
+    yield
+    if warm_up is not None:
+        warm_up.cancel()
+        with suppress(asyncio.CancelledError):
+            await warm_up
+    # Release the shared async LLM connection pool and the database pool
+    await llm.aclose()
+    database = _loaded_database()
+    if database is not None:
+        await database.dispose()
+
+
+app = FastAPI(title="Recipe Assistant API", version="0.1.0", lifespan=lifespan)
 
 # Development CORS: allow all
 app.add_middleware(
@@ -25,7 +138,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Response-Time"],
 )
+app.add_middleware(metrics.TimingMiddleware)
 
 
 class Ingredient(BaseModel):
@@ -42,11 +157,22 @@ class Recipe(BaseModel):
 class AskRequest(BaseModel):
     message: str = Field(..., description="User message")
     session_id: str = Field(..., description="Client-generated session identifier")
+    user_id: Optional[uuid.UUID] = Field(
+        None, description="User whose profile's allergies, diets and dislikes apply to the session. "
+                          "Client-supplied and not authenticated: the app has no auth layer yet"
+    )
 
 
 class AskResponse(BaseModel):
     reply: str
     recipe: Optional[Recipe] = None
+    path: Optional[str] = Field(
+        None, description="How a recipe was made: 'local' rewrite, 'llm', or 'fallback' while the LLM is unavailable"
+    )
+    retry_after: Optional[float] = Field(None, description="Set when the request was shed under load: seconds to wait")
+    failed: Optional[bool] = Field(
+        None, description="Set on /ask/stream when the recipe stream failed: the recipe was not changed or generated"
+    )
 
 
 class SubstituteRequest(BaseModel):
@@ -58,10 +184,128 @@ class SubstituteResponse(BaseModel):
     substitutes: List[str]
 
 
-def _respond(session_id: str, reply: str, recipe: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+class SavedRecipeSummary(BaseModel):
+    recipe_id: int
+    name: str
+    saved_at: datetime
+    ingredient_count: int
+    step_count: int
+    first_step: Optional[str] = None
+
+
+class SavedRecipePage(BaseModel):
+    items: List[SavedRecipeSummary]
+    next_cursor: Optional[str] = Field(None, description="Pass as ?cursor= for the next page; null on the last page")
+
+
+class SavedRecipeDetail(Recipe):
+    recipe_id: int
+    saved_at: datetime
+
+
+class SaveRecipesRequest(BaseModel):
+    recipes: List[Recipe] = Field(..., min_length=1, max_length=1000)
+
+
+class UserProfileBody(BaseModel):
+    allergies: List[str] = []
+    dietary_restrictions: List[str] = Field([], description="e.g. vegetarian, vegan, gluten-free")
+    disliked_ingredients: List[str] = []
+    skill_level: Optional[str] = None
+
+
+def _respond(session_id: str, reply: str, recipe: Optional[Dict[str, Any]] = None,
+             path: Optional[str] = None) -> Dict[str, Any]:
     """Append assistant message to history and return API response payload."""
     ctx.append_assistant_message(session_id, reply)
-    return {"reply": reply, "recipe": recipe}
+    return {"reply": reply, "recipe": recipe, "path": path}
+
+
+def _replace_args(session_id: str, replacements: List[Dict[str, str]]) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """Dislikes (session + replaced sources) and (src, dst) pairs for a replace intent."""
+    dislikes = set(ctx.get_dislikes(session_id))
+    for r in replacements:
+        src = r.get("src")
+        if src:
+            dislikes.add(src)
+    subs = [(r["src"], r["dst"]) for r in replacements if r.get("src") and r.get("dst")]
+    return list(dislikes), subs
+
+
+async def _merge_profile(req: AskRequest) -> None:
+    """Merge the user's profile constraints into the session's dislikes (loaded once per session; see user_profiles)."""
+    if req.user_id is None:
+        return
+    update = await user_profiles.session_dislikes(req.user_id, ctx.get_profile_version(req.session_id))
+    if update is not None:
+        ctx.set_profile_dislikes(req.session_id, *update)
+
+
+def _replace_reply(replacements: List[Dict[str, str]]) -> str:
+    if replacements and replacements[0].get("dst"):
+        first = replacements[0]
+        return f"Updated the recipe: replaced '{first['src']}' with '{first['dst']}'."
+    return "Updated the recipe with requested substitutions."
+
+
+_BUSY_REPLY = "I'm getting a lot of requests right now. Please try again in a moment."
+
+
+def _ask_deadline() -> float:
+    """Seconds an /ask request may wait for LLM admission before it is shed (0 = no limit)."""
+    try:
+        return float(os.getenv("ASK_DEADLINE", "20"))
+    except ValueError:
+        return 20.0
+
+
+def _shed(session_id: str, e: llm_scheduler.Overloaded) -> Dict[str, Any]:
+    logger.warning("shedding /ask for session %s: %s", session_id, e)
+    return {**_respond(session_id, _BUSY_REPLY, None), "retry_after": e.retry_after}
+
+
+_LIMITED_REPLY = "I can't reach the recipe model right now, so I can only use saved recipes and known substitutions."
+
+
+def _ask_local(session_id: str, parsed: Dict[str, Any]) -> Dict[str, Any]:
+    """Answer a parsed intent without the LLM (provider unavailable or circuit breaker open).
+
+    Recipes come from the local store with static substitutions for the
+    session's dislikes; swaps use the rule-based rewrite.
+    """
+    resilience.get_resilience().record_fallback()
+    intent = parsed.get("intent")
+    current = ctx.get_current_recipe(session_id)
+    if intent == "get_recipe" and parsed.get("recipe_name"):
+        rn = parsed["recipe_name"]
+        found = rr.get_recipe_by_name(rn)
+        if not found:
+            return _respond(session_id, f"{_LIMITED_REPLY} I don't have a saved recipe for {rn}.", None)
+        recipe = normalize_recipe(se.apply_known_substitutions(found, set(ctx.get_dislikes(session_id))))
+        ctx.set_current_recipe(session_id, recipe)
+        return _respond(session_id, f"Here's a recipe for {recipe.get('name', rn)}.", recipe, "fallback")
+    if intent == "add_dislike" and parsed.get("dislikes"):
+        for d in parsed["dislikes"]:
+            ctx.add_dislike(session_id, d)
+        if not current:
+            return _respond(session_id, "Got it. I'll keep that in mind for substitutions.", None)
+        updated = se.apply_known_substitutions(current, set(ctx.get_dislikes(session_id)))
+        ctx.set_current_recipe(session_id, updated)
+        return _respond(session_id, "Updated the recipe with known substitutions for your dislikes.", updated, "fallback")
+    if intent == "replace":
+        if not current:
+            return _respond(session_id, "Tell me which recipe first (e.g., 'recipe for lasagna').", None)
+        replacements = parsed.get("replacements", [])
+        updated, _ = rewrite_recipe(current, replacements, ctx.get_dislikes(session_id))
+        if updated is None:
+            return _respond(session_id, f"{_LIMITED_REPLY} I couldn't make that change.", None)
+        ctx.set_current_recipe(session_id, updated)
+        return _respond(session_id, _replace_reply(replacements), updated, "fallback")
+    return _respond(session_id, f"{_LIMITED_REPLY} Ask for a recipe by name, e.g. 'recipe for lasagna'.", None)
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
 
 
 @app.get("/recipes/{name}", response_model=Recipe)
@@ -76,20 +320,182 @@ async def get_recipe(name: str):
 @app.post("/substitute", response_model=SubstituteResponse)
 async def substitute(req: SubstituteRequest):
     """Suggest substitutes for a given ingredient."""
-    subs = se.suggest_substitutes(req.ingredient)
+    if resilience.degraded():
+        return {"substitutes": se.known_substitutes(req.ingredient) or []}
+    try:
+        subs = await se.suggest_substitutes_async(req.ingredient)
+    except llm_scheduler.Overloaded:
+        subs = se.known_substitutes(req.ingredient) or []
     return {"substitutes": subs}
 
 
+async def _db_session() -> AsyncIterator[Any]:
+    """Database session for the saved-recipe routes (503 while no database is configured)."""
+    try:
+        session = _database().async_session()
+    except ValueError as e:  # DATABASE_URL is not set
+        raise HTTPException(status_code=503, detail=str(e)) from None
+    async with session:
+        yield session
+
+
+# saved_recipes (SQLAlchemy queries) is imported on first use.
+# The /users/{user_id}/... routes trust the user_id in the path: there is no
+# authentication, so they must only be reachable through a gateway that checks
+# the caller is that user.
+@app.get("/users/{user_id}/recipes", response_model=SavedRecipePage)
+async def list_saved_recipes(user_id: uuid.UUID, limit: int = Query(20, ge=1, le=100), cursor: Optional[str] = None,
+                             include: List[str] = Query([]), exclude: List[str] = Query([]),
+                             session=Depends(_db_session)):
+    """A page of the user's saved recipes, newest first (summaries without the recipe body).
+
+    ``include`` / ``exclude`` (repeatable) filter by ingredient or group, e.g.
+    ``?include=chicken&exclude=dairy``.
+    """
+    from . import saved_recipes
+
+    try:
+        items, next_cursor = await saved_recipes.list_page(session, user_id, limit, cursor, include, exclude)
+    except saved_recipes.InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@app.get("/users/{user_id}/recipes/{recipe_id}", response_model=SavedRecipeDetail)
+async def get_saved_recipe(user_id: uuid.UUID, recipe_id: int, session=Depends(_db_session)):
+    """One saved recipe in full."""
+    from . import saved_recipes
+
+    recipe = await saved_recipes.get_recipe(session, user_id, recipe_id)
+    if recipe is None:
+        raise HTTPException(status_code=404, detail="Saved recipe not found")
+    return recipe
+
+
+@app.post("/users/{user_id}/recipes", response_model=List[SavedRecipeSummary], status_code=201)
+async def save_recipes(user_id: uuid.UUID, req: SaveRecipesRequest, session=Depends(_db_session)):
+    """Save one or more recipes in a single insert; returns their summaries in request order."""
+    from sqlalchemy.exc import IntegrityError
+    from . import saved_recipes
+
+    try:
+        items = await saved_recipes.save_many(session, user_id, [r.model_dump() for r in req.recipes])
+        await session.commit()
+    except IntegrityError:
+        raise HTTPException(status_code=404, detail="User not found")
+    return items
+
+
+@app.delete("/users/{user_id}/recipes/{recipe_id}", status_code=204)
+async def delete_saved_recipe(user_id: uuid.UUID, recipe_id: int, session=Depends(_db_session)):
+    """Remove one saved recipe."""
+    from . import saved_recipes
+
+    if not await saved_recipes.delete_recipe(session, user_id, recipe_id):
+        raise HTTPException(status_code=404, detail="Saved recipe not found")
+    await session.commit()
+    return Response(status_code=204)
+
+
+@app.get("/users/{user_id}/profile", response_model=UserProfileBody)
+async def get_user_profile(user_id: uuid.UUID, session=Depends(_db_session)):
+    """The user's allergies, dietary restrictions, disliked ingredients and skill level."""
+    profile = await user_profiles.get_profile(session, user_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+
+@app.put("/users/{user_id}/profile", response_model=UserProfileBody)
+async def put_user_profile(user_id: uuid.UUID, req: UserProfileBody, session=Depends(_db_session)):
+    """Replace the user's profile; sessions of the user pick it up on their next turn."""
+    from sqlalchemy.exc import IntegrityError
+
+    try:
+        return await user_profiles.update_profile(session, user_id, req.model_dump())
+    except IntegrityError:
+        raise HTTPException(status_code=404, detail="User not found")
+
+
+_STATS_SOURCES = {
+    "intent": intent_stats,
+    "sessions": ctx.session_stats,
+    "llm_cache": lambda: llm_cache.get_cache().stats(),
+    "llm_inflight": llm.inflight_stats,
+    "substitutions": se.substitution_stats,
+    "replace": rewrite_stats,
+    "modify_patch": recipe_patch.patch_stats,
+    "speculation": speculation_stats,
+    "history": history_stats,
+    "llm_queue": llm_scheduler.scheduler_stats,
+    "resilience": resilience.resilience_stats,
+    "routing": model_routing.routing_stats,
+    "profiles": user_profiles.profile_stats,
+    "db_pool": _db_pool_stats,
+    "warmup": _warmup_stats,
+}
+for _name, _fn in _STATS_SOURCES.items():
+    metrics.register_collector(_name, _fn)
+
+
+@app.get("/stats")
+async def stats():
+    """Runtime counters (intent, sessions, LLM cache and coalescing, substitutions, edits, speculation, history, LLM queue, resilience, model routing, profile cache, database pool, startup warm-up)."""
+    return {name: fn() for name, fn in _STATS_SOURCES.items()}
+
+
+@app.get("/health")
+async def health():
+    """Liveness plus dependency state.
+
+    ``status`` is ``degraded`` while the LLM circuit breaker is open or
+    queries are queueing for a database connection, else ``starting``
+    until the startup warm-up has finished. Answered from the first
+    moment; it never waits for or triggers the warm-up.
+    """
+    database = _loaded_database()
+    db = database.pool_stats() if database is not None and database.configured() else None
+    llm_ok = not resilience.degraded()
+    db_ok = db is None or not db["waiting"]
+    warmup = _warmup_stats()
+    status = "ok" if llm_ok and db_ok else "degraded"
+    if status == "ok" and _WARMUP and not warmup["ready"]:
+        status = "starting"
+    return {
+        "status": status,
+        "llm": "ok" if llm_ok else "unavailable",
+        "db": db,
+        "warmup": warmup,
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Stage and LLM latency histograms, token counters and the /stats counters in Prometheus format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 @app.post("/ask", response_model=AskResponse)
-async def ask(req: AskRequest):
+async def ask(req: AskRequest, response: Response):
     """Conversational endpoint coordinating retrieval, substitutions, and state.
 
     - If user asks for a recipe, fetch it, save in session, apply any known dislikes.
     - If user states a dislike or missing ingredient, update session and apply subs to current recipe.
     - Otherwise, return a mock LLM response.
+
+    Under overload the request is shed with a busy reply, ``retry_after`` and
+    a ``Retry-After`` header instead of waiting past ``ASK_DEADLINE``. While
+    the LLM is unavailable it is answered locally (``path='fallback'``).
     """
+    try:
+        with llm_scheduler.deadline(_ask_deadline()):
+            return await _ask(req)
+    except llm_scheduler.Overloaded as e:
+        response.headers["Retry-After"] = str(max(1, round(e.retry_after)))
+        return _shed(req.session_id, e)
+
+
+async def _ask(req: AskRequest) -> Dict[str, Any]:
     session_id = req.session_id
     message = req.message.strip()
     if not message:
@@ -97,37 +503,65 @@ async def ask(req: AskRequest):
 
     # Record user message
     ctx.append_user_message(session_id, message)
+    await _merge_profile(req)
 
     # LLM required: if not available, inform user and return mock response
     if not has_llm():
         return _respond(session_id, "LLM is not available. Please configure OPENAI_API_KEY to enable recipe generation.", None)
 
     # LLM-based intent parsing and handling only
-    history = ctx.get_messages(session_id)
-    parsed = parse_intent(message, history)
+    history = get_history(session_id)
+    # looks like a recipe request but needs the LLM to be sure: start generating now
+    guess = speculative_recipe_name(message)
+    spec = get_speculator().start(
+        guess, lambda: generate_recipe_async(guess, list(ctx.get_dislikes(session_id)), history)
+    )
+    try:
+        with metrics.stage("intent"):
+            parsed = await parse_intent_async(message, history)
+    except BaseException:
+        if spec is not None:
+            spec.discard()
+        raise
+    intent = parsed.get("intent")
+    metrics.INTENTS.inc(intent=intent or "unknown", route="ask")
+    if spec is not None and not (intent == "get_recipe" and spec.matches(parsed.get("recipe_name"))):
+        spec.discard()
+        spec = None
+    if resilience.degraded():
+        if spec is not None:
+            spec.discard()
+        return _ask_local(session_id, parsed)
+    try:
+        return await _ask_llm(session_id, message, parsed, history, spec)
+    except resilience.Unavailable:
+        return _ask_local(session_id, parsed)
+
+
+async def _ask_llm(session_id: str, message: str, parsed: Dict[str, Any], history: List[Dict[str, str]],
+                   spec: Optional[Speculation]) -> Dict[str, Any]:
     intent = parsed.get("intent")
-
     if intent == "replace":
         current = ctx.get_current_recipe(session_id)
         if not current:
             reply = "Tell me which recipe first (e.g., 'recipe for lasagna')."
             return _respond(session_id, reply, None)
         replacements = parsed.get("replacements", [])
-        dislikes = ctx.get_dislikes(session_id)
-        for r in replacements:
-            src = r.get("src")
-            if src:
-                dislikes.add(src)
-        updated = normalize_recipe(
-            modify_recipe(current, list(dislikes), [(r["src"], r["dst"]) for r in replacements if r.get("src") and r.get("dst")], history)
-        )
+        started = time.perf_counter()
+        # plain swaps are applied locally; ambiguous ones go through the LLM
+        with metrics.stage("rewrite"):
+            updated, reason = rewrite_recipe(current, replacements, ctx.get_dislikes(session_id))
+        path = "local"
+        if updated is None:
+            path = "llm"
+            dislikes, subs = _replace_args(session_id, replacements)
+            with metrics.stage("modify"):
+                modified = await modify_recipe_async(current, dislikes, subs, history)
+            with metrics.stage("normalize"):
+                updated = normalize_recipe(modified)
+        record_rewrite(path, time.perf_counter() - started, reason)
         ctx.set_current_recipe(session_id, updated)
-        if replacements:
-            first = replacements[0]
-            reply = f"Updated the recipe: replaced '{first['src']}' with '{first['dst']}'."
-        else:
-            reply = "Updated the recipe with requested substitutions."
-        return _respond(session_id, reply, updated)
+        return _respond(session_id, _replace_reply(replacements), updated, path)
 
     if intent == "add_dislike":
         dislikes_in = parsed.get("dislikes", [])
@@ -136,9 +570,10 @@ async def ask(req: AskRequest):
                 ctx.add_dislike(session_id, d)
             current = ctx.get_current_recipe(session_id)
             if current:
-                regenerated = normalize_recipe(
-                    modify_recipe(current, list(ctx.get_dislikes(session_id)), None, history)
-                )
+                with metrics.stage("modify"):
+                    modified = await modify_recipe_async(current, list(ctx.get_dislikes(session_id)), None, history)
+                with metrics.stage("normalize"):
+                    regenerated = normalize_recipe(modified)
                 ctx.set_current_recipe(session_id, regenerated)
                 reply = "Regenerated the recipe based on your dislikes."
                 return _respond(session_id, reply, regenerated)
@@ -146,12 +581,153 @@ async def ask(req: AskRequest):
 
     if intent == "get_recipe" and parsed.get("recipe_name"):
         rn = parsed.get("recipe_name")
-        generated = normalize_recipe(generate_recipe(rn, list(ctx.get_dislikes(session_id)), history))
+        with metrics.stage("generate"):
+            if spec is not None:
+                raw = await spec.take()
+            else:
+                raw = await generate_recipe_async(rn, list(ctx.get_dislikes(session_id)), history)
+        with metrics.stage("normalize"):
+            generated = normalize_recipe(raw)
         ctx.set_current_recipe(session_id, generated)
         reply = f"Here's a recipe for {generated.get('name', rn)}."
         return _respond(session_id, reply, generated)
 
     # Smalltalk/unknown → generic LLM reply
-    resp = ask_llm(message)
+    with metrics.stage("smalltalk"):
+        resp = await ask_llm_async(message)
     reply = resp.get("text", "I'm here to help with recipes!")
     return _respond(session_id, reply, None)
+
+
+@app.post("/ask/stream")
+async def ask_stream(req: AskRequest):
+    """Streaming variant of /ask over Server-Sent Events.
+
+    Events, in order:
+    - ``reply``: {reply} as soon as the intent is known
+    - ``name`` / ``ingredient`` / ``step``: recipe fields as they are parsed
+      out of the streamed completion
+    - ``done``: the same payload /ask returns, with a normalized recipe
+    """
+    return StreamingResponse(
+        _ask_events_shed(req),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _ask_events_shed(req: AskRequest) -> AsyncIterator[str]:
+    """``_ask_events`` under the request deadline; a shed request ends with a busy ``done``."""
+    try:
+        with llm_scheduler.deadline(_ask_deadline()):
+            async for event in _ask_events(req):
+                yield event
+    except llm_scheduler.Overloaded as e:
+        yield _sse("done", _shed(req.session_id, e))
+
+
+async def _ask_events(req: AskRequest) -> AsyncIterator[str]:
+    session_id = req.session_id
+    message = req.message.strip()
+    if not message:
+        yield _sse("done", {"reply": "Please type something like 'recipe for lasagna'.", "recipe": None})
+        return
+
+    ctx.append_user_message(session_id, message)
+    await _merge_profile(req)
+    if not has_llm():
+        reply = "LLM is not available. Please configure OPENAI_API_KEY to enable recipe generation."
+        yield _sse("done", _respond(session_id, reply, None))
+        return
+
+    history = get_history(session_id)
+    with metrics.stage("intent"):
+        parsed = await parse_intent_async(message, history)
+    intent = parsed.get("intent")
+    metrics.INTENTS.inc(intent=intent or "unknown", route="ask_stream")
+    if resilience.degraded():
+        yield _sse("done", _ask_local(session_id, parsed))
+        return
+    path: Optional[str] = None
+    stage = "modify"
+
+    if intent == "replace":
+        current = ctx.get_current_recipe(session_id)
+        if not current:
+            yield _sse("done", _respond(session_id, "Tell me which recipe first (e.g., 'recipe for lasagna').", None))
+            return
+        replacements = parsed.get("replacements", [])
+        reply = _replace_reply(replacements)
+        started = time.perf_counter()
+        with metrics.stage("rewrite"):
+            updated, reason = rewrite_recipe(current, replacements, ctx.get_dislikes(session_id))
+        if updated is not None:
+            record_rewrite("local", time.perf_counter() - started, reason)
+            ctx.set_current_recipe(session_id, updated)
+            yield _sse("reply", {"reply": reply})
+            yield _sse("done", _respond(session_id, reply, updated, "local"))
+            return
+        path = "llm"
+        dislikes, subs = _replace_args(session_id, replacements)
+        chunks = llm.modify_recipe_stream(current, dislikes, subs, history)
+        fallback: Dict[str, Any] = current
+    elif intent == "add_dislike":
+        dislikes_in = parsed.get("dislikes", [])
+        for d in dislikes_in:
+            ctx.add_dislike(session_id, d)
+        current = ctx.get_current_recipe(session_id)
+        if not (dislikes_in and current):
+            yield _sse("done", _respond(session_id, "Got it. I'll keep that in mind for substitutions.", None))
+            return
+        reply = "Regenerated the recipe based on your dislikes."
+        chunks = llm.modify_recipe_stream(current, list(ctx.get_dislikes(session_id)), None, history)
+        fallback = current
+    elif intent == "get_recipe" and parsed.get("recipe_name"):
+        rn = parsed["recipe_name"]
+        reply = f"Here's a recipe for {rn}."
+        stage = "generate"
+        chunks = llm.generate_recipe_stream(rn, list(ctx.get_dislikes(session_id)), history)
+        fallback = {"name": rn, "ingredients": [], "steps": []}
+    else:
+        try:
+            with metrics.stage("smalltalk"):
+                resp = await ask_llm_async(message)
+        except resilience.Unavailable:
+            yield _sse("done", _ask_local(session_id, parsed))
+            return
+        yield _sse("done", _respond(session_id, resp.get("text", "I'm here to help with recipes!"), None))
+        return
+
+    yield _sse("reply", {"reply": reply})
+    parser = RecipeStreamParser()
+    failed = False
+    with metrics.stage(stage):
+        try:
+            async for chunk in chunks:
+                for event, data in parser.feed(chunk):
+                    yield _sse(event, data)
+        except llm_scheduler.Overloaded:
+            raise
+        except resilience.Unavailable:  # raised before the first chunk
+            yield _sse("done", _ask_local(session_id, parsed))
+            return
+        except Exception as e:
+            logger.warning("recipe stream failed: %s", e)
+            failed = True
+    # a cut-off stream still yields whatever was completed
+    parsed_recipe, tail = parser.close()
+    for event, data in tail:
+        yield _sse(event, data)
+    # a failed edit keeps the current recipe, and so does a failed generation with nothing to show
+    if failed and (stage == "modify" or parsed_recipe is None):
+        if stage == "modify":
+            reply, recipe = "Sorry, I couldn't update the recipe just now, so it is unchanged. Please try again.", current
+        else:
+            reply, recipe = f"Sorry, I couldn't get a recipe for {rn} just now. Please try again.", None
+        yield _sse("done", {**_respond(session_id, reply, recipe, path), "failed": True})
+        return
+    recipe = Recipe.model_validate(normalize_recipe(parsed_recipe or fallback)).model_dump()
+    ctx.set_current_recipe(session_id, recipe)
+    if path is not None:
+        record_rewrite(path, time.perf_counter() - started, reason)
+    yield _sse("done", _respond(session_id, reply, recipe, path))
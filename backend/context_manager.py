@@ -1,65 +1,140 @@
-"""Conversation context manager (in-memory).
+"""Conversation context manager.
 
 Stores per-session state: current recipe and disliked ingredients.
-Suitable for development; replace with Redis/DB for production.
+Sessions live in a pluggable store (see :mod:`backend.session_store`):
+
+- ``SESSION_BACKEND=memory`` (default): in-process LRU + idle TTL, bounded by
+  ``SESSION_MAX`` sessions and ``SESSION_MAX_BYTES``.
+- ``SESSION_BACKEND=sqlite``: shared across worker processes via the SQLite
+  file at ``SESSION_DB_PATH``.
+
+``SESSION_TTL`` (seconds) sets the idle expiry for both.
+
+Reads are copy-free: recipes are stored as frozen snapshots and dislikes as
+frozensets, so callers share them instead of receiving copies.
+
+A session's dislikes are the ones stated in the conversation plus the
+user's profile terms (:func:`set_profile_dislikes`).
 """
 
-from typing import Dict, Optional, Set, Any, List
-from copy import deepcopy
+import os
+from itertools import islice
+from typing import Dict, FrozenSet, Optional, Any
+
+from .session_store import MemorySessionStore, SessionState, SessionStore, SQLiteSessionStore
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
 
 
-_SESSIONS: Dict[str, Dict[str, Any]] = {}
+def _make_store() -> SessionStore:
+    ttl = _env_number("SESSION_TTL", 3600)
+    if os.getenv("SESSION_BACKEND", "memory").lower() == "sqlite":
+        return SQLiteSessionStore(os.getenv("SESSION_DB_PATH", "sessions.db"), ttl=ttl)
+    return MemorySessionStore(
+        max_sessions=int(_env_number("SESSION_MAX", 10000)),
+        max_bytes=int(_env_number("SESSION_MAX_BYTES", 256 * 1024 * 1024)),
+        ttl=ttl,
+    )
 
 
-def get_or_create_session(session_id: str) -> Dict[str, Any]:
-    session = _SESSIONS.get(session_id)
+_STORE: SessionStore = _make_store()
+
+
+def set_store(store: SessionStore) -> None:
+    """Swap the session backend (e.g. in tools and benchmarks)."""
+    global _STORE
+    _STORE = store
+
+
+def session_stats() -> Dict[str, Any]:
+    return _STORE.stats()
+
+
+def get_or_create_session(session_id: str) -> SessionState:
+    session = _STORE.load(session_id)
     if session is None:
-        session = {"current_recipe": None, "dislikes": set(), "messages": []}
-        _SESSIONS[session_id] = session
+        session = SessionState()
+        _STORE.save(session_id, session)
     return session
 
 
-def get_dislikes(session_id: str) -> Set[str]:
-    return set(get_or_create_session(session_id)["dislikes"])  # copy
+def get_dislikes(session_id: str) -> FrozenSet[str]:
+    # frozenset is replaced (not mutated) on write, so sharing it is safe
+    session = get_or_create_session(session_id)
+    if not session.profile_dislikes:
+        return session.dislikes
+    return session.dislikes | session.profile_dislikes
+
+
+def get_profile_version(session_id: str) -> str:
+    """Version of the profile terms the session holds ("" if none were loaded)."""
+    return get_or_create_session(session_id).profile_version
+
+
+def set_profile_dislikes(session_id: str, terms: FrozenSet[str], version: str = "") -> None:
+    """Merge the user's profile terms into the session's dislikes (saved only when they change)."""
+    session = get_or_create_session(session_id)
+    if session.profile_dislikes != terms or session.profile_version != version:
+        session.profile_dislikes = frozenset(terms)
+        session.profile_version = version
+        _STORE.save(session_id, session)
 
 
 def add_dislike(session_id: str, ingredient: str) -> None:
     session = get_or_create_session(session_id)
-    session["dislikes"].add(ingredient.lower())
+    session.dislikes = session.dislikes | {ingredient.lower()}
+    _STORE.save(session_id, session)
 
 
 def set_current_recipe(session_id: str, recipe: Dict[str, Any]) -> None:
     session = get_or_create_session(session_id)
-    session["current_recipe"] = deepcopy(recipe)
+    session.set_recipe(recipe)
+    _STORE.save(session_id, session)
 
 
 def get_current_recipe(session_id: str) -> Optional[Dict[str, Any]]:
-    recipe = get_or_create_session(session_id).get("current_recipe")
-    return deepcopy(recipe) if recipe else None
+    """Return the current recipe as a read-only snapshot (see ``thaw_recipe``)."""
+    return get_or_create_session(session_id).current_recipe
 
 
 def reset_session(session_id: str) -> None:
-    if session_id in _SESSIONS:
-        del _SESSIONS[session_id]
+    _STORE.delete(session_id)
 
 
-def _trim_messages(messages: List[Dict[str, str]], max_len: int = 50) -> List[Dict[str, str]]:
-    return messages[-max_len:]
+def get_messages(session_id: str, limit: int = 20) -> list:
+    msgs = get_or_create_session(session_id).messages
+    return list(islice(msgs, max(0, len(msgs) - limit), None))
 
 
-def get_messages(session_id: str, limit: int = 20) -> list:
+def _append(session_id: str, role: str, text: str) -> None:
     session = get_or_create_session(session_id)
-    msgs = session.get("messages", [])
-    return msgs[-limit:]
+    # bounded deque drops the oldest turn itself
+    session.messages.append({"role": role, "content": text})
+    session.turns += 1
+    _STORE.save(session_id, session)
 
 
-def append_user_message(session_id: str, text: str) -> None:
+def get_session(session_id: str) -> SessionState:
+    """The live session state (treat as read-only; use the setters to change it)."""
+    return get_or_create_session(session_id)
+
+
+def set_summary(session_id: str, summary: str, upto: int) -> None:
+    """Store the rolling summary covering turns before absolute index ``upto``."""
     session = get_or_create_session(session_id)
-    session.setdefault("messages", []).append({"role": "user", "content": text})
-    session["messages"] = _trim_messages(session["messages"]) 
+    session.summary = summary
+    session.summary_upto = upto
+    _STORE.save(session_id, session)
+
+
+def append_user_message(session_id: str, text: str) -> None:
+    _append(session_id, "user", text)
 
 
 def append_assistant_message(session_id: str, text: str) -> None:
-    session = get_or_create_session(session_id)
-    session.setdefault("messages", []).append({"role": "assistant", "content": text})
-    session["messages"] = _trim_messages(session["messages"]) 
+    _append(session_id, "assistant", text)
@@ -0,0 +1,173 @@
+"""Token-budgeted conversation history for LLM prompts.
+
+Sits on top of :mod:`backend.context_manager`. :func:`get_history` returns a
+session's history as a bounded window: a rolling extractive summary of older
+turns (one system message) followed by the newest turns verbatim, each cut to
+``HISTORY_MESSAGE_MAX_TOKENS``. When the window grows past
+``HISTORY_TOKEN_BUDGET`` tokens or ``HISTORY_MAX_TURNS`` turns, the oldest
+turns are folded into the summary until it is back to half the budget, so the
+prompt prefix only changes every few turns and stays provider-cache friendly.
+
+:func:`fit` trims a window to one call's budget (``HISTORY_BUDGET_<TASK>``,
+e.g. ``HISTORY_BUDGET_INTENT``) and records how many prompt tokens that saved
+against the old fixed slice of raw turns; see :func:`history_stats`.
+
+Tokens are counted with ``tiktoken`` when it is installed, otherwise
+estimated as one token per four characters.
+"""
+
+import math
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from . import context_manager as ctx
+
+try:  # optional, exact counts for OpenAI models
+    import tiktoken  # type: ignore
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+except Exception:  # pragma: no cover - package not installed
+    _ENCODING = None
+
+
+_MESSAGE_OVERHEAD = 4  # role and separators per chat message
+_SUMMARY_PREFIX = "Summary of earlier conversation:\n"
+_SUMMARY_LINE_TOKENS = 24
+
+_DEFAULT_BUDGETS = {"intent": 300, "generate": 600, "modify": 600, "patch": 600}
+
+_LOCK = threading.Lock()
+_STATS: Dict[str, Dict[str, int]] = {}
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+def message_tokens(message: Dict[str, str]) -> int:
+    return _MESSAGE_OVERHEAD + count_tokens(message.get("content", ""))
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    """Cut ``text`` to about ``max_tokens``, keeping its head and tail."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    # the estimate is per character, so scale by the observed ratio
+    keep = max(8, int(len(text) * max_tokens / count_tokens(text)) // 2)
+    return text[:keep].rstrip() + " … " + text[-keep:].lstrip()
+
+
+def _turns(messages: Iterable[Dict[str, str]]) -> List[Dict[str, str]]:
+    return [{"role": m["role"], "content": m["content"]}
+            for m in messages if m.get("role") in ("user", "assistant") and m.get("content")]
+
+
+class HistoryWindow(list):
+    """Chat messages for a prompt; ``raw`` keeps the untrimmed turns.
+
+    The first message is the summary (role ``system``) if there is one.
+    """
+
+    def __init__(self, messages: Iterable[Dict[str, str]], raw: Iterable[Dict[str, str]] = ()):
+        super().__init__(messages)
+        self.raw = list(raw)
+
+
+def _summary_message(summary: str) -> Dict[str, str]:
+    return {"role": "system", "content": _SUMMARY_PREFIX + summary}
+
+
+def _fold(summary: str, turns: List[Dict[str, str]], max_tokens: int) -> str:
+    lines = summary.splitlines() if summary else []
+    lines.extend(f"{m['role']}: {_truncate(' '.join(m['content'].split()), _SUMMARY_LINE_TOKENS)}" for m in turns)
+    # the summary is bounded too: the oldest lines go first
+    while lines and count_tokens("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+def get_history(session_id: str) -> HistoryWindow:
+    """The session's history as a summary plus recent turns within budget."""
+    budget = int(_env_number("HISTORY_TOKEN_BUDGET", 800))
+    max_turns = int(_env_number("HISTORY_MAX_TURNS", 12))
+    per_message = int(_env_number("HISTORY_MESSAGE_MAX_TOKENS", 200))
+    summary_max = int(_env_number("HISTORY_SUMMARY_MAX_TOKENS", 120))
+
+    session = ctx.get_session(session_id)
+    raw = list(session.messages)
+    first = session.turns - len(raw)  # absolute index of raw[0]
+    start = max(session.summary_upto, first)
+    pending = [{**m, "content": _truncate(m["content"], per_message)} for m in raw[start - first:]]
+
+    summary = session.summary
+    sizes = [message_tokens(m) for m in pending]
+    used = (message_tokens(_summary_message(summary)) if summary else 0) + sum(sizes)
+    if used > budget or len(pending) > max_turns:
+        # fold down to half the budget so the next few turns append to a stable prefix
+        n = 0
+        while n < len(pending) and (used > budget // 2 or len(pending) - n > max_turns // 2):
+            used -= sizes[n]
+            n += 1
+        summary = _fold(summary, _turns(pending[:n]), summary_max)
+        pending = pending[n:]
+        ctx.set_summary(session_id, summary, start + n)
+
+    messages = ([_summary_message(summary)] if summary else []) + _turns(pending)
+    return HistoryWindow(messages, raw)
+
+
+def fit(history: Optional[List[Dict[str, str]]], task: str, legacy_limit: int) -> List[Dict[str, str]]:
+    """Messages from ``history`` within the prompt budget for ``task``.
+
+    The newest turns come first; the summary is kept if it still fits.
+    ``legacy_limit`` is the raw slice the call used before budgeting; the
+    difference is counted as tokens saved (negative when the summary costs
+    more than it replaced).
+    """
+    if not history:
+        return []
+    budget = int(_env_number(f"HISTORY_BUDGET_{task.upper()}", _DEFAULT_BUDGETS.get(task, 600)))
+    head = [m for m in history[:1] if m.get("role") == "system" and m.get("content", "").startswith(_SUMMARY_PREFIX)]
+    turns = _turns(history[len(head):])
+
+    used = keep = 0
+    for m in reversed(turns):
+        size = message_tokens(m)
+        if used + size > budget:
+            break
+        used += size
+        keep += 1
+    if head and used + message_tokens(head[0]) > budget:
+        head = []
+    used += sum(message_tokens(m) for m in head)
+    out = head + turns[len(turns) - keep:]
+
+    raw = getattr(history, "raw", history)
+    legacy = sum(message_tokens(m) for m in _turns(raw[-legacy_limit:]))
+    with _LOCK:
+        s = _STATS.setdefault(task, {"calls": 0, "history_tokens": 0, "legacy_tokens": 0, "saved_tokens": 0})
+        s["calls"] += 1
+        s["history_tokens"] += used
+        s["legacy_tokens"] += legacy
+        s["saved_tokens"] += legacy - used
+    return out
+
+
+def history_stats() -> Dict[str, Any]:
+    with _LOCK:
+        out: Dict[str, Any] = {task: dict(s) for task, s in _STATS.items()}
+    for s in out.values():
+        s["saved_per_call"] = (s["saved_tokens"] / s["calls"]) if s["calls"] else 0.0
+    out["tokenizer"] = "tiktoken" if _ENCODING is not None else "estimate"
+    return out
@@ -0,0 +1,23 @@
+"""Ingredient groups shared by search filters, profiles and local edits.
+
+A group name ("dairy", "meat", ...) stands for any of its ingredients:
+saved-recipe filters (:mod:`backend.saved_recipes`) and profile diets
+(:mod:`backend.user_profiles`) expand it, and the local rewrite
+(:mod:`backend.recipe_rewrite`) treats swaps out of the meat and seafood
+groups as technique changes. Kept free of heavy imports so all three can
+use it.
+"""
+
+from typing import Dict, Tuple
+
+
+INGREDIENT_GROUPS: Dict[str, Tuple[str, ...]] = {
+    "dairy": ("milk", "butter", "buttermilk", "cheese", "cream", "yogurt", "yoghurt", "ghee", "whey", "ricotta",
+              "mozzarella", "parmesan", "cheddar", "feta"),
+    "meat": ("beef", "pork", "chicken", "turkey", "lamb", "veal", "duck", "bacon", "ham", "sausage", "steak",
+             "mince", "chorizo", "pancetta", "prosciutto"),
+    "seafood": ("fish", "salmon", "tuna", "cod", "tilapia", "shrimp", "prawn", "crab", "lobster", "scallop",
+                "mussel", "clam", "squid", "anchovy"),
+    "nuts": ("almond", "cashew", "walnut", "pecan", "hazelnut", "pistachio", "peanut", "macadamia"),
+    "gluten": ("flour", "bread", "breadcrumb", "pasta", "noodle", "couscous", "barley", "semolina", "wheat"),
+}
@@ -11,42 +11,52 @@ Intent schema:
   "replacements": [{"src": string, "dst": string}]
 }
 
+Common phrasings are first classified locally by :mod:`backend.intent_rules`;
+the LLM is only consulted when the local classifier's confidence is below
+``INTENT_MIN_CONFIDENCE`` (default 0.8). Hit/miss counters are available via
+:func:`intent_stats`. Async LLM calls are hedged when slow; while the LLM
+circuit breaker is open (or the call fails) the message is settled locally
+instead, as a recipe request when a dish name can be guessed.
+
 If LLM is not available or returns invalid JSON, returns a best-effort empty/unknown intent.
 """
 
-from typing import Dict, List, Optional
-from .llm_interface import chat_json, has_llm
+import os
+from typing import Any, Dict, List, Optional
+from .llm_interface import chat_json, chat_json_async, has_llm
+from . import history as history_window
+from . import intent_rules
+from . import resilience
 
 
-def parse_intent(message: str, history: Optional[List[Dict]] = None) -> Dict:
-    """Parse a user message into a structured intent using the LLM (JSON mode).
+_STATS: Dict[str, int] = {"local_hits": 0, "llm_fallbacks": 0, "degraded": 0}
 
-    history: optional prior chat turns as list of {role, content}
-    """
-    message = (message or "").strip()
-    if not message or not has_llm():
-        return {"intent": "unknown", "recipe_name": None, "dislikes": [], "replacements": []}
-
-    sys = (
-        "You are an intent parser for a recipe assistant. Return ONLY JSON following this schema: "
-        "{intent: one of [get_recipe, add_dislike, replace, smalltalk, unknown], "
-        "recipe_name: string|null, dislikes: string[], replacements: [{src:string, dst:string}]}. "
-        "Normalize typos. If user asks for a recipe by name, set intent=get_recipe and fill recipe_name. "
-        "If user expresses a dislike or allergy or can't have something, set intent=add_dislike and put those terms in dislikes. "
-        "If user requests replacements (e.g., 'replace milk with oat milk', 'use oat milk instead of milk'), set intent=replace and fill replacements. "
-        "If the message is just chit-chat, set intent=smalltalk."
-    )
-
-    msgs = [{"role": "system", "content": sys}]
-    if history:
-        for m in history[-6:]:
-            if m.get("role") in ("user", "assistant") and m.get("content"):
-                msgs.append({"role": m["role"], "content": m["content"]})
+
+_SYSTEM = (
+    "You are an intent parser for a recipe assistant. Return ONLY JSON following this schema: "
+    "{intent: one of [get_recipe, add_dislike, replace, smalltalk, unknown], "
+    "recipe_name: string|null, dislikes: string[], replacements: [{src:string, dst:string}]}. "
+    "Normalize typos. If user asks for a recipe by name, set intent=get_recipe and fill recipe_name. "
+    "If user expresses a dislike or allergy or can't have something, set intent=add_dislike and put those terms in dislikes. "
+    "If user requests replacements (e.g., 'replace milk with oat milk', 'use oat milk instead of milk'), set intent=replace and fill replacements. "
+    "If the message is just chit-chat, set intent=smalltalk."
+)
+
+
+def _empty_intent() -> Dict:
+    return {"intent": "unknown", "recipe_name": None, "dislikes": [], "replacements": []}
+
+
+def _intent_messages(message: str, history: Optional[List[Dict]]) -> List[Dict]:
+    msgs = [{"role": "system", "content": _SYSTEM}]
+    msgs.extend(history_window.fit(history, "intent", 6))
     msgs.append({"role": "user", "content": message})
+    return msgs
+
 
-    out = chat_json(msgs, max_tokens=300)
+def _normalize_intent(out: Dict) -> Dict:
     if not isinstance(out, dict):
-        return {"intent": "unknown", "recipe_name": None, "dislikes": [], "replacements": []}
+        return _empty_intent()
 
     intent = out.get("intent") or "unknown"
     recipe_name = out.get("recipe_name") if isinstance(out.get("recipe_name"), str) else None
@@ -68,3 +78,84 @@ def parse_intent(message: str, history: Optional[List[Dict]] = None) -> Dict:
         "replacements": norm_repl,
     }
 
+
+def _min_confidence() -> float:
+    try:
+        return float(os.getenv("INTENT_MIN_CONFIDENCE", "0.8"))
+    except ValueError:
+        return 0.8
+
+
+def _fast_path(message: str) -> Optional[Dict]:
+    """Return the local intent, or None when the LLM is needed."""
+    local, confidence = intent_rules.classify(message)
+    if confidence >= _min_confidence():
+        _STATS["local_hits"] += 1
+        return local
+    _STATS["llm_fallbacks"] += 1
+    return None
+
+
+def _degraded_intent(message: str) -> Dict:
+    """Best local reading of ``message`` when the LLM cannot be used."""
+    _STATS["degraded"] += 1
+    name = intent_rules.guess_recipe_name(message)
+    if name:
+        return {**_empty_intent(), "intent": "get_recipe", "recipe_name": name}
+    return _empty_intent()
+
+
+def speculative_recipe_name(message: str) -> Optional[str]:
+    """Recipe name worth generating while the LLM parses ``message``.
+
+    Only returned when the LLM will actually be consulted (the local rules
+    are not confident) and the message still looks like a recipe request.
+    """
+    message = (message or "").strip()
+    if not message or not has_llm() or resilience.degraded():
+        return None
+    _, confidence = intent_rules.classify(message)
+    if confidence >= _min_confidence():
+        return None
+    return intent_rules.guess_recipe_name(message)
+
+
+def intent_stats() -> Dict[str, Any]:
+    """Counters for the local fast path versus LLM round trips."""
+    total = _STATS["local_hits"] + _STATS["llm_fallbacks"]
+    return {**_STATS, "hit_ratio": (_STATS["local_hits"] / total) if total else 0.0}
+
+
+def parse_intent(message: str, history: Optional[List[Dict]] = None) -> Dict:
+    """Parse a user message into a structured intent (local rules, then LLM JSON mode).
+
+    history: optional prior chat turns as list of {role, content}
+    """
+    message = (message or "").strip()
+    if not message:
+        return _empty_intent()
+    intent = _fast_path(message)
+    if intent is not None:
+        return intent
+    if not has_llm():
+        return _empty_intent()
+    out = chat_json(_intent_messages(message, history), task="intent")
+    return _normalize_intent(out)
+
+
+async def parse_intent_async(message: str, history: Optional[List[Dict]] = None) -> Dict:
+    """Async variant of :func:`parse_intent`."""
+    message = (message or "").strip()
+    if not message:
+        return _empty_intent()
+    intent = _fast_path(message)
+    if intent is not None:
+        return intent
+    if not has_llm():
+        return _empty_intent()
+    if resilience.degraded():
+        return _degraded_intent(message)
+    out = await chat_json_async(_intent_messages(message, history), task="intent", hedge=True)
+    if not out:  # failed or rejected call
+        return _degraded_intent(message)
+    return _normalize_intent(out)
@@ -0,0 +1,211 @@
+"""Rule-based intent classifier (local fast path).
+
+Recognizes the common phrasings ("recipe for X", "I don't like X",
+"replace X with Y", greetings) with regex and keyword tables and returns
+the same schema as :mod:`backend.intent_parser` together with a confidence
+score. Anything it is unsure about (mixed intents, unknown phrasing) gets a
+low score so the caller can fall back to the LLM parser.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+
+GREETINGS = {
+    "hi", "hello", "hey", "hiya", "yo", "howdy", "good morning", "good afternoon",
+    "good evening", "thanks", "thank you", "thanks a lot", "thank you so much",
+    "thx", "ty", "bye", "goodbye", "see you", "ok", "okay", "cool", "great",
+    "awesome", "nice", "how are you", "what's up", "whats up",
+}
+
+# (pattern, index of src group, index of dst group)
+_REPLACE_PATTERNS: List[Tuple[re.Pattern, int, int]] = [
+    (re.compile(r"\b(?:replace|swap)\s+(?:the\s+)?(.+?)\s+(?:with|for)\s+(.+)$"), 1, 2),
+    (re.compile(r"\bswitch\s+(?:the\s+)?(.+?)\s+(?:with|for|to)\s+(.+)$"), 1, 2),
+    (re.compile(r"\bsubstitute\s+(.+?)\s+with\s+(.+)$"), 1, 2),
+    (re.compile(r"\bsubstitute\s+(.+?)\s+for\s+(.+)$"), 2, 1),
+    (re.compile(r"\b(?:use|try|put)\s+(.+?)\s+instead\s+of\s+(.+)$"), 2, 1),
+    (re.compile(r"^(.+?)\s+instead\s+of\s+(.+)$"), 2, 1),
+]
+
+_DISLIKE_PATTERNS: List[re.Pattern] = [
+    re.compile(r"\bi\s+(?:really\s+)?(?:don'?t|do\s+not)\s+(?:like|eat|enjoy)\s+(.+)$"),
+    re.compile(r"\bi\s+(?:really\s+)?(?:dislike|hate|detest|avoid)\s+(.+)$"),
+    re.compile(r"\bi(?:'m|\s+am)\s+(?:allergic|intolerant)\s+to\s+(.+)$"),
+    re.compile(r"\bi\s+(?:can'?t|cannot)\s+(?:have|eat|stand|use)\s+(.+)$"),
+    re.compile(r"\bno\s+(.+?)\s+please$"),
+]
+
+# (pattern, also a request inside a question)
+_RECIPE_PATTERNS: List[Tuple[re.Pattern, bool]] = [
+    # "what is a good recipe for a party?" asks for advice, not for a dish
+    (re.compile(r"\brecipe\s+(?:for|of)\s+(.+)$"), False),
+    (re.compile(r"\bhow\s+(?:do\s+i|to|can\s+i|would\s+i|should\s+i)\s+(?:make|cook|prepare|bake)\s+(.+)$"), True),
+    (re.compile(r"^(?:can\s+you\s+|could\s+you\s+|please\s+)?teach\s+me\s+how\s+to\s+(?:make|cook|bake)\s+(.+)$"),
+     True),
+    # "i want ..." / "make me ..." alone are as often chat as requests; only
+    # an explicit cooking verb makes them one
+    (re.compile(r"^i\s+(?:want|would\s+like|'d\s+like|wanna)\s+to\s+(?:make|cook|bake)\s+(.+)$"), True),
+    (re.compile(r"^(?:(?:can|could)\s+you\s+)?(?:give|show|find|send)\s+me\s+(?:a|an|the)\s+(.+?)\s+recipe$"),
+     True),
+    (re.compile(r"^(.+?)\s+recipe$"), False),
+]
+
+# a question unless it opens as a polite request ("can you give me ...?")
+_QUESTION_START = re.compile(r"^(?:what|what's|whats|which|who|where|why|when|is|are|was|do|does|did|any|anyone|got|"
+                             r"should|have\s+you)\b")
+_POLITE_START = re.compile(r"^(?:can|could|would|will)\s+you\b|^please\b")
+
+_LEADING_FILLER = re.compile(r"^(?:a|an|the|some|recipe\s+for|recipe\s+of)\s+")
+_TRAILING_FILLER = re.compile(r"\s+(?:please|pls|anymore|at\s+all|recipe|today|tonight|for\s+dinner|for\s+lunch)$")
+_LIST_SPLIT = re.compile(r"\s*(?:,|\band\b|\bor\b|&|/)\s*")
+_TRAILING_POLITE = re.compile(r"(?:[\s,]+(?:please|pls|thanks|thank\s+you))+$")
+_PUNCT = " \t.!?,;:\"'"
+# words that refer back to the current recipe or start a request rather than
+# naming a dish ("give me another recipe", "show me my saved recipes")
+_NOT_A_DISH = {"it", "this", "that", "something", "anything", "one", "more", "again", "something else", "another",
+               "else", "other", "different", "new", "my", "your", "saved", "what", "dinner", "lunch", "food",
+               "give", "show", "make", "find", "get", "tell", "send", "me", "i", "you",
+               "a", "an", "the", "some", "any", "our", "his", "her", "their"}
+# words that only qualify or set the scene; a name made of nothing else
+# ("a vegan recipe", "a quick recipe", "recipe for a party") is not a dish
+_VAGUE = {"vegan", "vegetarian", "pescatarian", "keto", "paleo", "gluten-free", "dairy-free", "low-carb", "low",
+          "carb", "fat", "calorie", "healthy", "healthier", "quick", "easy", "simple", "fast", "cheap", "good",
+          "great", "nice", "best", "tasty", "delicious", "favorite", "favourite", "random", "fun", "fancy", "light",
+          "hearty", "cozy", "comfort", "classic", "traditional", "family", "kid-friendly", "kids", "party",
+          "birthday", "holiday", "christmas", "thanksgiving", "easter", "weekend", "weeknight", "date", "night",
+          "picnic", "crowd", "guests", "breakfast", "brunch", "supper", "dessert", "snack", "meal", "dish",
+          "recipe", "recipes", "and", "or", "for", "two", "one", "today", "tonight"}
+# comparatives: "how do i make pasta healthier" asks for an edit
+_COMPARATIVE = {"better", "thicker", "thinner", "spicier", "milder", "crispier", "crunchier", "softer", "healthier",
+                "lighter", "richer", "creamier", "sweeter", "saltier", "tastier", "faster", "quicker", "cheaper",
+                "less", "more"}
+# activities rather than ingredients ("i don't like cooking")
+_ACTIVITIES = {"cooking", "baking", "cleaning", "washing", "chopping", "peeling", "eating", "grilling", "frying",
+               "waiting", "doing", "dishes", "recipes", "food", "spending"}
+
+
+def _clean(term: str) -> str:
+    term = term.strip(_PUNCT)
+    prev = None
+    while prev != term:
+        prev = term
+        term = _LEADING_FILLER.sub("", term)
+        term = _TRAILING_FILLER.sub("", term).strip(_PUNCT)
+    return term
+
+
+def _split_list(text: str) -> List[str]:
+    return [t for t in (_clean(p) for p in _LIST_SPLIT.split(text)) if t]
+
+
+def _result(intent: str, recipe_name: Optional[str] = None, dislikes: Optional[List[str]] = None,
+            replacements: Optional[List[Dict[str, str]]] = None) -> Dict:
+    return {
+        "intent": intent,
+        "recipe_name": recipe_name,
+        "dislikes": dislikes or [],
+        "replacements": replacements or [],
+    }
+
+
+# Each matcher returns (triggered, result). A rule can trigger yet refuse to
+# produce a result when its captured text looks ambiguous; that still counts
+# as a vote so mixed messages are left to the LLM.
+
+def _match_replace(text: str) -> Tuple[bool, Optional[Dict]]:
+    for pattern, src_i, dst_i in _REPLACE_PATTERNS:
+        m = pattern.search(text)
+        if m:
+            src, dst = _clean(m.group(src_i)), _clean(m.group(dst_i))
+            if src and dst and src != dst and src not in _NOT_A_DISH:
+                return True, _result("replace", replacements=[{"src": src, "dst": dst}])
+            return True, None
+    return False, None
+
+
+def _match_dislike(text: str) -> Tuple[bool, Optional[Dict]]:
+    for pattern in _DISLIKE_PATTERNS:
+        m = pattern.search(text)
+        if m:
+            terms = _split_list(m.group(1))
+            if terms and not any(t in _NOT_A_DISH or t.split()[0] in _ACTIVITIES for t in terms):
+                return True, _result("add_dislike", dislikes=terms)
+            return True, None
+    return False, None
+
+
+def _is_dish(name: str) -> bool:
+    # the whole phrase and its first word: "something vegetarian", "another one";
+    # a dish needs at least one word that is not a qualifier ("vegan", "party")
+    words = name.split()
+    return bool(words) and name not in _NOT_A_DISH and words[0] not in _NOT_A_DISH and len(words) <= 6 \
+        and words[0] != "to" and not all(w in _VAGUE or w in _NOT_A_DISH for w in words) \
+        and not any(w in _COMPARATIVE for w in words)
+
+
+def _is_question(message: str, text: str) -> bool:
+    if _POLITE_START.match(text):
+        return False
+    return (message or "").rstrip().endswith("?") or bool(_QUESTION_START.match(text))
+
+
+def _match_recipe(text: str, question: bool = False) -> Tuple[bool, Optional[Dict]]:
+    for pattern, in_question in _RECIPE_PATTERNS:
+        m = pattern.search(text)
+        if m:
+            if question and not in_question:
+                return True, None
+            name = _clean(m.group(1))
+            # a trailing clause ("... but no mushrooms") needs the LLM
+            if _is_dish(name) and not re.search(r"\b(?:it|this|that|but|without|except|no|with)\b", name):
+                return True, _result("get_recipe", recipe_name=name)
+            return True, None
+    return False, None
+
+
+_CLAUSE = re.compile(r"\s*(?:,|\b(?:but|without|except|no|with)\b).*$")
+
+
+def _normalize(message: str) -> str:
+    text = " ".join((message or "").lower().split()).replace("’", "'").strip(_PUNCT)
+    return _TRAILING_POLITE.sub("", text).strip(_PUNCT)
+
+
+def guess_recipe_name(message: str) -> Optional[str]:
+    """Best-effort dish name for messages that look like recipe requests.
+
+    Unlike :func:`classify` this also answers for mixed messages ("lasagna
+    recipe but no mushrooms" -> "lasagna"); it is only a guess, used to start
+    work speculatively while the LLM parses the real intent.
+    """
+    text = _normalize(message)
+    if not text or _match_replace(text)[0]:
+        return None
+    for pattern, _ in _RECIPE_PATTERNS:
+        m = pattern.search(text)
+        if m:
+            name = _clean(_CLAUSE.sub("", m.group(1)))
+            return name if _is_dish(name) else None
+    return None
+
+
+def classify(message: str) -> Tuple[Dict, float]:
+    """Classify ``message`` locally and return ``(intent, confidence)``.
+
+    Confidence is 1.0 for exact greetings, 0.9 for a single unambiguous
+    rule match and 0.0 when no rule (or more than one kind of rule) fires,
+    or when a recipe phrasing is part of a question ("what's a good recipe
+    for a party?").
+    """
+    text = _normalize(message)
+    if not text:
+        return _result("unknown"), 0.0
+    if text in GREETINGS:
+        return _result("smalltalk"), 1.0
+
+    votes = [_match_replace(text), _match_dislike(text), _match_recipe(text, _is_question(message, text))]
+    triggered = [result for hit, result in votes if hit]
+    if len(triggered) != 1 or triggered[0] is None:
+        return _result("unknown"), 0.0
+    return triggered[0], 0.9
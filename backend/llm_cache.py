@@ -0,0 +1,175 @@
+"""Content-addressed cache for LLM recipe responses.
+
+Keys are SHA-256 digests of the canonical request content (task, model,
+normalized recipe name or base recipe, sorted dislikes, substitutions), so
+"lasagna, no mushroom" hits the same entry whatever the casing or dislike
+order. Entries live in an in-memory LRU with TTL and, optionally, a SQLite
+tier that survives restarts.
+
+Configuration (env):
+    LLM_CACHE_SIZE       max in-memory entries (0 disables the cache)
+    LLM_CACHE_MAX_BYTES  max summed size of in-memory entries
+    LLM_CACHE_TTL        entry lifetime in seconds (0 = no expiry)
+    LLM_CACHE_PATH       optional SQLite file for the persistent tier
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+from .utils.recipe_utils import freeze_recipe
+
+
+def _norm(text: Any) -> str:
+    return " ".join(str(text or "").lower().split())
+
+
+def make_key(task: str, model: str, **parts: Any) -> str:
+    """Digest of the request content; dict keys are sorted for stability."""
+    payload = json.dumps({"task": task, "model": model, **parts}, sort_keys=True, ensure_ascii=False,
+                         separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def generate_key(model: str, recipe_name: str, dislikes: Optional[Iterable[str]]) -> str:
+    return make_key("generate", model, name=_norm(recipe_name),
+                    dislikes=sorted({_norm(d) for d in dislikes or () if d}))
+
+
+def modify_key(model: str, base_recipe: Dict[str, Any], dislikes: Optional[Iterable[str]],
+               substitutions: Optional[Iterable]) -> str:
+    return make_key("modify", model, recipe=base_recipe,
+                    dislikes=sorted({_norm(d) for d in dislikes or () if d}),
+                    substitutions=sorted((_norm(a), _norm(b)) for a, b in substitutions or ()))
+
+
+class ResponseCache:
+    """LRU + TTL cache of JSON-able responses with an optional SQLite tier.
+
+    Values are returned as frozen snapshots (see ``freeze_recipe``) and are
+    shared between callers without copying.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 32 * 1024 * 1024, ttl: float = 86400.0,
+                 path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # key -> (value, created, size); ordered least recently used first
+        self._data: "OrderedDict[str, tuple[Any, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+            )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _expired(self, created: float, now: float) -> bool:
+        return bool(self.ttl) and now - created > self.ttl
+
+    def _insert(self, key: str, value: Any, created: float, size: int) -> None:
+        old = self._data.pop(key, None)
+        if old is not None:
+            self._bytes -= old[2]
+        self._data[key] = (value, created, size)
+        self._bytes += size
+        while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, _, dropped) = self._data.popitem(last=False)
+            self._bytes -= dropped
+            self._counters["evictions"] += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                if not self._expired(entry[1], now):
+                    self._data.move_to_end(key)
+                    self._counters["hits"] += 1
+                    return entry[0]
+                self._bytes -= self._data.pop(key)[2]
+                self._counters["expired"] += 1
+            if self._conn is not None:
+                row = self._conn.execute("SELECT value, created FROM llm_cache WHERE key = ?", (key,)).fetchone()
+                if row is not None and not self._expired(row[1], now):
+                    value = freeze_recipe(json.loads(row[0]))
+                    self._insert(key, value, row[1], len(row[0]))
+                    self._counters["disk_hits"] += 1
+                    return value
+            self._counters["misses"] += 1
+            return None
+
+    def put(self, key: str, value: Any) -> Any:
+        """Store ``value`` and return the frozen snapshot that was cached."""
+        if not self.enabled:
+            return value
+        raw = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        frozen = freeze_recipe(value)
+        now = time.time()
+        with self._lock:
+            self._insert(key, frozen, now, len(raw))
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, created) VALUES (?, ?, ?)", (key, raw, now)
+                )
+        return frozen
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self._counters["hits"] + self._counters["disk_hits"]
+            total = hits + self._counters["misses"]
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hit_ratio": (hits / total) if total else 0.0,
+                **self._counters,
+            }
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _from_env() -> ResponseCache:
+    return ResponseCache(
+        max_entries=int(_env_number("LLM_CACHE_SIZE", 1024)),
+        max_bytes=int(_env_number("LLM_CACHE_MAX_BYTES", 32 * 1024 * 1024)),
+        ttl=_env_number("LLM_CACHE_TTL", 86400),
+        path=os.getenv("LLM_CACHE_PATH") or None,
+    )
+
+
+_CACHE: Optional[ResponseCache] = None
+
+
+def get_cache() -> ResponseCache:
+    """Process-wide recipe response cache, configured from env on first use."""
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = _from_env()
+    return _CACHE
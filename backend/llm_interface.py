@@ -2,121 +2,470 @@
 
 Uses the modern OpenAI SDK (v1+) and returns a simple dict: {"text": ...}.
 Falls back to a mock response if the package or API key is missing.
+
+Every helper has an ``*_async`` twin backed by a shared ``AsyncOpenAI``
+client so FastAPI handlers never block the event loop on a completion.
+Async calls share one connection pool, are admitted by the priority
+scheduler in :mod:`backend.llm_scheduler` (concurrency and tokens-per-minute
+limits, deadlines) and run under :mod:`backend.resilience` (per-helper
+timeouts, retries, hedged intent calls, circuit breaker). ``LLM_TIMEOUT``
+(seconds) remains the transport timeout of the shared client.
+Identical concurrent async calls (same cache key or same JSON-mode messages)
+are coalesced into one upstream request; see :func:`inflight_stats`.
+
+The OpenAI SDK (and httpx under it) is imported when the first client is
+built, not with this module, so importing the app stays fast; the app
+builds the async client during its startup warm-up (:func:`warm_up`).
+
+``modify_recipe`` asks for a compact patch (see :mod:`backend.recipe_patch`)
+and applies it locally, regenerating the full recipe only if the patch does
+not apply; set ``MODIFY_MODE=full`` to always regenerate.
 """
 
-from typing import Dict, Optional, Any
+from contextvars import ContextVar
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple
+import asyncio
+import importlib.util
 import os
-from dotenv import load_dotenv
-
-try:  # keep a small guard for missing package
-    from openai import OpenAI  # type: ignore
-except Exception:  # pragma: no cover - package not installed
-    OpenAI = None  # type: ignore
+import threading
+import time
+
+from . import history as history_window
+from . import llm_cache
+from . import llm_scheduler
+from . import metrics
+from . import model_routing
+from . import recipe_patch
+from . import resilience
+from .singleflight import SingleFlight
+from .utils.env import load_env
+from .utils.json_stream import loads_lenient
+from .utils.logging_utils import get_logger
 
 
 _client = None
-load_dotenv()
+_async_client = None
+# the warm-up builds the async client in a thread while requests may already need it
+_async_client_lock = threading.Lock()
+_sdk_available: Optional[bool] = None
+_inflight = SingleFlight()
+# token usage accumulator for the current task (see track_usage)
+_usage: ContextVar[Optional[Dict[str, int]]] = ContextVar("llm_usage", default=None)
+# whether the last routed call in the current task was answered by a fallback model
+_fell_back: ContextVar[bool] = ContextVar("llm_fell_back", default=False)
+logger = get_logger(__name__)
+load_env()
+
+
+def _sdk_installed() -> bool:
+    """True if the OpenAI SDK can be imported (checked without importing it)."""
+    global _sdk_available
+    if _sdk_available is None:
+        _sdk_available = importlib.util.find_spec("openai") is not None
+    return _sdk_available
+
+
+def _openai():
+    """The ``openai`` module, imported on first use; None if it is not installed."""
+    if not _sdk_installed():
+        return None
+    try:  # keep a small guard for a broken install
+        import openai  # type: ignore
+    except Exception:  # pragma: no cover - package not importable
+        return None
+    return openai
+
 
 def _get_client():
     global _client
     if _client is not None:
         return _client
     api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key or OpenAI is None:
+    openai = _openai() if api_key else None
+    if openai is None:
         _client = None
         return None
     base_url = os.getenv("OPENAI_BASE_URL")  # optional (Azure/proxy)
-    _client = OpenAI(api_key=api_key, base_url=base_url) if base_url else OpenAI(api_key=api_key)
+    _client = openai.OpenAI(api_key=api_key, base_url=base_url) if base_url else openai.OpenAI(api_key=api_key)
     return _client
 
 
+def _max_concurrency() -> int:
+    """Upper bound on in-flight async completions per worker."""
+    try:
+        return max(1, int(os.getenv("LLM_MAX_CONCURRENCY", "32")))
+    except ValueError:
+        return 32
+
+
+def _timeout() -> float:
+    """Transport timeout in seconds of the async client (per-helper deadlines are in resilience)."""
+    try:
+        return float(os.getenv("LLM_TIMEOUT", "60"))
+    except ValueError:
+        return 60.0
+
+
+def _get_async_client():
+    """Return the shared AsyncOpenAI client (one connection pool per process)."""
+    global _async_client
+    if _async_client is not None:
+        return _async_client
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return None
+    with _async_client_lock:
+        if _async_client is None:
+            _async_client = _build_async_client(api_key)
+    return _async_client
+
+
+def _build_async_client(api_key: str):
+    openai = _openai()
+    if openai is None:
+        return None
+    import httpx
+
+    limit = _max_concurrency()
+    http_client = openai.DefaultAsyncHttpxClient(
+        limits=httpx.Limits(max_connections=limit, max_keepalive_connections=limit)
+    )
+    # retries are done by backend.resilience, per helper
+    kwargs: Dict[str, Any] = {"api_key": api_key, "timeout": _timeout(), "max_retries": 0, "http_client": http_client}
+    base_url = os.getenv("OPENAI_BASE_URL")
+    if base_url:
+        kwargs["base_url"] = base_url
+    return openai.AsyncOpenAI(**kwargs)
+
+
+def warm_up() -> bool:
+    """Import the SDK and build the shared async client ahead of the first request.
+
+    Blocking (the SDK import, TLS setup and the lazily imported
+    ``chat.completions`` resource take most of a second); the app runs it
+    in a thread at startup. Returns False when no LLM is configured.
+    """
+    client = _get_async_client()
+    if client is None:
+        return False
+    client.chat.completions  # noqa: B018 - imports openai.resources on first access
+    return True
+
+
+def track_usage(acc: Dict[str, int]) -> None:
+    """Add token usage of async completions made from the current task to ``acc``.
+
+    Tasks inherit the tracker from the task that creates them, so work that
+    is handed to a single-flight task is still counted. Requests still in
+    flight are counted under ``pending_prompt_tokens`` (estimated prompt)
+    and ``pending_completion_tokens`` (estimated output streamed so far),
+    so work cancelled midway can be charged.
+    """
+    for key in ("prompt_tokens", "completion_tokens", "pending_prompt_tokens", "pending_completion_tokens"):
+        acc.setdefault(key, 0)
+    _usage.set(acc)
+
+
+def _record_usage(usage) -> None:
+    acc = _usage.get()
+    if acc is not None and usage is not None:
+        acc["prompt_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+        acc["completion_tokens"] += getattr(usage, "completion_tokens", 0) or 0
+
+
+def _track_pending(prompt: int = 0, completion: int = 0) -> None:
+    acc = _usage.get()
+    if acc is not None:
+        acc["pending_prompt_tokens"] += prompt
+        acc["pending_completion_tokens"] += completion
+
+
+def _create(client, helper: str, route: model_routing.Route, **kwargs):
+    """Run one blocking chat completion on ``route``'s models in turn, recorded under ``helper``."""
+    params = route.params(kwargs)
+    start = time.perf_counter()
+    for i, model in enumerate(route.models):
+        attempt = time.perf_counter()
+        try:
+            resp = client.chat.completions.create(model=model, **params)
+        except Exception as e:
+            metrics.record_llm(helper, time.perf_counter() - attempt, error=True, model=model)
+            if i == len(route.models) - 1:
+                model_routing.record(route.task, None, time.perf_counter() - start, fallback=i > 0)
+                raise
+            logger.warning(f"{route.task}: {model} failed ({e}); trying {route.models[i + 1]}")
+            continue
+        metrics.record_llm(helper, time.perf_counter() - attempt, getattr(resp, "usage", None), model=model)
+        model_routing.record(route.task, model, time.perf_counter() - start, fallback=i > 0)
+        _fell_back.set(i > 0)
+        return resp
+
+
+def _prompt_tokens(kwargs: Dict[str, Any]) -> int:
+    return sum(history_window.message_tokens(m) for m in kwargs.get("messages") or [])
+
+
+def _estimate_tokens(kwargs: Dict[str, Any]) -> int:
+    """Tokens a call may consume: prompt estimate plus its ``max_tokens``."""
+    return _prompt_tokens(kwargs) + int(kwargs.get("max_tokens") or 0)
+
+
+def _used_tokens(usage) -> Optional[int]:
+    if usage is None:
+        return None
+    return (getattr(usage, "prompt_tokens", 0) or 0) + (getattr(usage, "completion_tokens", 0) or 0)
+
+
+async def _attempt(client, helper: str, kwargs: Dict[str, Any], timeout: float):
+    """One upstream request: admission by the scheduler, then at most ``timeout`` seconds at the provider."""
+    scheduler = llm_scheduler.get_scheduler()
+    ticket = await scheduler.acquire(llm_scheduler.PRIORITIES.get(helper, 2), _estimate_tokens(kwargs))
+    usage = None
+    prompt = _prompt_tokens(kwargs)
+    _track_pending(prompt)
+    try:
+        start = time.perf_counter()
+        try:
+            resp = await asyncio.wait_for(client.chat.completions.create(**kwargs), timeout)
+        except BaseException as e:
+            metrics.record_llm(helper, time.perf_counter() - start, error=True, model=kwargs["model"])
+            # a cancelled request stays pending: its prompt was sent and billed
+            if not isinstance(e, asyncio.CancelledError):
+                _track_pending(-prompt)
+            raise
+        usage = getattr(resp, "usage", None)
+    finally:
+        scheduler.release(ticket, _used_tokens(usage))
+    metrics.record_llm(helper, time.perf_counter() - start, usage, model=kwargs["model"])
+    _track_pending(-prompt)
+    _record_usage(usage)
+    return resp
+
+
+async def _routed(route: model_routing.Route, call):
+    """Await ``call(model)`` for each model of ``route`` until one answers.
+
+    Shedding and an open circuit breaker end the chain at once: they are
+    not specific to one model.
+    """
+    start = time.perf_counter()
+    for i, model in enumerate(route.models):
+        try:
+            result = await call(model)
+        except (llm_scheduler.Overloaded, resilience.CircuitOpen):
+            raise
+        except Exception as e:
+            if i == len(route.models) - 1:
+                model_routing.record(route.task, None, time.perf_counter() - start, fallback=i > 0)
+                raise
+            logger.warning(f"{route.task}: {model} failed ({e}); trying {route.models[i + 1]}")
+            continue
+        model_routing.record(route.task, model, time.perf_counter() - start, fallback=i > 0)
+        _fell_back.set(i > 0)
+        return result
+
+
+async def _acreate(client, helper: str, route: model_routing.Route, hedge: bool = False, **kwargs):
+    """Run one chat completion on ``route`` with deadline, retries and the circuit breaker.
+
+    May raise ``Overloaded`` (shed), ``CircuitOpen`` or ``Unavailable``.
+    ``hedge`` allows a second request when the first is slow, unless calls
+    are already queueing.
+    """
+    policy = resilience.get_resilience()
+    params = route.params(kwargs)
+    hedge = hedge and not llm_scheduler.get_scheduler().busy()
+    return await _routed(route, lambda model: policy.call(
+        helper,
+        lambda timeout: _attempt(client, helper, {**params, "model": model}, timeout),
+        hedge=hedge,
+        passthrough=(llm_scheduler.Overloaded,),
+    ))
+
+
+async def _astream(client, helper: str, route: model_routing.Route, **kwargs) -> AsyncIterator[str]:
+    """Stream one chat completion's content deltas; the admission slot is held until it ends.
+
+    Opening the stream is retried (and routed) like :func:`_acreate`; once
+    deltas have been yielded a failure is only reported to the circuit
+    breaker.
+    """
+    policy = resilience.get_resilience()
+    scheduler = llm_scheduler.get_scheduler()
+    params = route.params(kwargs)
+    ticket = await scheduler.acquire(llm_scheduler.PRIORITIES.get(helper, 2), _estimate_tokens(params))
+    start = time.perf_counter()
+    usage, error, model = None, True, route.model
+
+    async def open_stream(candidate: str):
+        nonlocal model
+        model = candidate
+        return await policy.call(helper, lambda timeout: asyncio.wait_for(client.chat.completions.create(
+            model=candidate, stream=True, stream_options={"include_usage": True}, **params
+        ), timeout))
+
+    # pending until the stream ends; a consumer that stops early leaves the tokens charged
+    prompt, streamed = _prompt_tokens(params), 0
+    _track_pending(prompt)
+    try:
+        stream = await _routed(route, open_stream)
+        try:
+            async for chunk in stream:
+                # the final chunk carries usage and no choices
+                usage = getattr(chunk, "usage", None) or usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    delta = chunk.choices[0].delta.content
+                    received = history_window.count_tokens(delta)
+                    streamed += received
+                    _track_pending(completion=received)
+                    yield delta
+        except Exception:
+            policy.breaker.record(False)
+            raise
+        error = False
+        _track_pending(-prompt, -streamed)
+        _record_usage(usage)
+    except Exception:
+        _track_pending(-prompt, -streamed)
+        raise
+    finally:
+        scheduler.release(ticket, _used_tokens(usage))
+        metrics.record_llm(helper, time.perf_counter() - start, usage, error=error, model=model)
+
+
+def inflight_stats() -> Dict[str, int]:
+    """Single-flight counters: upstream calls started vs. calls deduplicated."""
+    return _inflight.stats()
+
+
+async def aclose() -> None:
+    """Close the shared async client (call on app shutdown)."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
+
+
+def _content(resp, default: str = "") -> str:
+    """Extract the first choice's message content from a completion."""
+    text = resp.choices[0].message.content if resp.choices else default
+    return text or default
+
+
+def _mock_text(prompt: str) -> str:
+    return "I'm here to help with recipes!" if not prompt else (
+        f"[Mock LLM] '{prompt[:160]}'. Configure OPENAI_API_KEY to enable real responses."
+    )
+
+
+def _ask_messages(prompt: str, system: Optional[str]) -> List[Dict[str, str]]:
+    sys_msg = system or "You are a helpful cooking assistant. Answer clearly and succinctly."
+    return [
+        {"role": "system", "content": sys_msg},
+        {"role": "user", "content": prompt},
+    ]
+
+
 def ask_llm(
     prompt: str,
     system: Optional[str] = None,
     model: Optional[str] = None,
-    temperature: float = 0.3,
-    max_tokens: int = 300,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
 ) -> Dict[str, str]:
-    """Query GPT and return a dict with 'text'."""
+    """Query GPT and return a dict with 'text'.
+
+    ``model``, ``temperature`` and ``max_tokens`` default to the smalltalk route.
+    """
     prompt = (prompt or "").strip()
     client = _get_client()
-    model_name = model or os.getenv("OPENAI_MODEL", "gpt-4o")
-    sys_msg = system or "You are a helpful cooking assistant. Answer clearly and succinctly."
 
     if not client:
         # Clean mock fallback
-        text = "I'm here to help with recipes!" if not prompt else (
-            f"[Mock LLM] '{prompt[:160]}'. Configure OPENAI_API_KEY to enable real responses."
+        return {"text": _mock_text(prompt)}
+
+    try:
+        resp = _create(
+            client, "ask_llm", model_routing.get_route("smalltalk").pinned(model),
+            temperature=temperature,
+            max_tokens=max_tokens,
+            messages=_ask_messages(prompt, system),
         )
-        return {"text": text}
+        return {"text": _content(resp)}
+    except Exception as e:  # pragma: no cover - runtime/network errors
+        return {"text": f"LLM error: {e}"}
+
+
+async def ask_llm_async(
+    prompt: str,
+    system: Optional[str] = None,
+    model: Optional[str] = None,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+) -> Dict[str, str]:
+    """Async variant of :func:`ask_llm`."""
+    prompt = (prompt or "").strip()
+    client = _get_async_client()
+
+    if not client:
+        return {"text": _mock_text(prompt)}
 
     try:
-        resp = client.chat.completions.create(
-            model=model_name,
+        resp = await _acreate(
+            client, "ask_llm", model_routing.get_route("smalltalk").pinned(model),
             temperature=temperature,
             max_tokens=max_tokens,
-            messages=[
-                {"role": "system", "content": sys_msg},
-                {"role": "user", "content": prompt},
-            ],
+            messages=_ask_messages(prompt, system),
         )
-        text = resp.choices[0].message.content if resp.choices else ""
-        return {"text": text or ""}
+        return {"text": _content(resp)}
+    except (llm_scheduler.Overloaded, resilience.Unavailable):
+        raise  # shed or provider unavailable: the caller answers with a busy or local reply
     except Exception as e:  # pragma: no cover - runtime/network errors
         return {"text": f"LLM error: {e}"}
 
 
 def has_llm() -> bool:
-    """Return True if the OpenAI client is available and configured."""
-    return _get_client() is not None
+    """Return True if the OpenAI client is available and configured.
 
+    Checks the API key and that the SDK is installed without building a
+    client, so the first request does not import the SDK.
+    """
+    return bool(os.getenv("OPENAI_API_KEY")) and _sdk_installed()
+
+
+def _parse_json(content: str, fallback: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], bool]:
+    """Parse model JSON, recovering truncated/garbled output where possible.
 
-def _model_name(override: Optional[str] = None) -> str:
-    """Resolve the model name with env default."""
-    return override or os.getenv("OPENAI_MODEL", "gpt-4o")
+    Returns ``(obj, complete)``; ``complete`` is False when the object was
+    recovered from a partial document or ``fallback`` was used.
+    """
+    value, complete = loads_lenient(content or "")
+    if not isinstance(value, dict) or not value:
+        return (fallback or {}), False
+    return value, complete
 
 
 def _parse_json_safe(content: str, fallback: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """Parse JSON content, returning fallback on error."""
-    import json
-    import re
-    try:
-        return json.loads(content)
-    except Exception:
-        match = re.search(r"\{.*\}\s*$", content, re.DOTALL)
-        if match:
-            try:
-                return json.loads(match.group(0))
-            except Exception:
-                pass
-        return fallback or {}
-
+    return _parse_json(content, fallback)[0]
 
-def generate_recipe(recipe_name: str, dislikes: Optional[list] = None, history: Optional[list] = None) -> Dict:
-    """Generate a recipe via LLM as structured JSON.
 
-    Returns a dict with keys: name, ingredients (list of {name, quantity}), steps (list[str]).
-    Falls back to a minimal stub if LLM unavailable.
-    """
-    import json
+def _mock_recipe(recipe_name: str) -> Dict:
+    return {
+        "name": recipe_name.lower(),
+        "ingredients": [
+            {"name": "ingredient 1", "quantity": "1 unit"},
+            {"name": "ingredient 2", "quantity": "to taste"}
+        ],
+        "steps": [
+            f"Prepare the ingredients for {recipe_name}.",
+            "Cook and assemble as appropriate.",
+            "Serve warm."
+        ]
+    }
 
-    dislikes = dislikes or []
-    client = _get_client()
-    if not client:
-        # Fallback minimal structure (mock)
-        return {
-            "name": recipe_name.lower(),
-            "ingredients": [
-                {"name": "ingredient 1", "quantity": "1 unit"},
-                {"name": "ingredient 2", "quantity": "to taste"}
-            ],
-            "steps": [
-                f"Prepare the ingredients for {recipe_name}.",
-                "Cook and assemble as appropriate.",
-                "Serve warm."
-            ]
-        }
 
+def _generate_messages(recipe_name: str, dislikes: list, history: Optional[list]) -> List[Dict[str, str]]:
     system = (
         "You are a helpful cooking assistant. Generate concise, home-cook friendly recipes."
     )
@@ -129,60 +478,211 @@ def generate_recipe(recipe_name: str, dislikes: Optional[list] = None, history:
         "}. Avoid markdown and extra commentary.\n"
         f"Recipe: {recipe_name}. Exclude or replace these if possible: {dislikes_text}."
     )
+    messages = [{"role": "system", "content": system}]
+    # include recent turns (and the rolling summary) within the prompt budget
+    messages.extend(history_window.fit(history, "generate", 8))
+    messages.append({"role": "user", "content": user})
+    return messages
+
+
+def _finish_generated(content: str, recipe_name: str) -> Tuple[Dict, bool]:
+    parsed, complete = _parse_json(content, {"name": recipe_name, "ingredients": [], "steps": []})
+    if "name" not in parsed:
+        parsed["name"] = recipe_name
+    if "ingredients" not in parsed:
+        parsed["ingredients"] = []
+    if "steps" not in parsed:
+        parsed["steps"] = []
+    return parsed, complete
+
+
+def _finish_modified(content: str, base_recipe: Dict) -> Tuple[Dict, bool]:
+    parsed, complete = _parse_json(content, base_recipe)
+    if parsed is not base_recipe:
+        # a truncated modification keeps the base recipe's missing fields
+        for k in ("name", "ingredients", "steps"):
+            if k not in parsed and k in base_recipe:
+                parsed[k] = base_recipe[k]
+    return parsed, complete
+
+
+def _cache_result(key: str, result: Tuple[Dict, bool]) -> Dict:
+    """Cache a usable model result; recovered/fallback and empty recipes are not cached.
+
+    Nor are answers from a fallback model: keys name the route's primary model.
+    """
+    recipe, complete = result
+    if not complete or not recipe.get("ingredients") or _fell_back.get():
+        return recipe
+    return llm_cache.get_cache().put(key, recipe)
+
+
+def generate_recipe(recipe_name: str, dislikes: Optional[list] = None, history: Optional[list] = None) -> Dict:
+    """Generate a recipe via LLM as structured JSON.
+
+    Returns a dict with keys: name, ingredients (list of {name, quantity}), steps (list[str]).
+    Falls back to a minimal stub if LLM unavailable. Results are cached by
+    recipe name, dislikes and model (see :mod:`backend.llm_cache`) and returned
+    as read-only snapshots.
+    """
+    dislikes = dislikes or []
+    route = model_routing.get_route("generate")
+    client = _get_client()
+    if not client:
+        # Fallback minimal structure (mock)
+        return _mock_recipe(recipe_name)
 
+    key = llm_cache.generate_key(route.model, recipe_name, dislikes)
+    cached = llm_cache.get_cache().get(key)
+    if cached is not None:
+        return cached
     try:
-        messages = [{"role": "system", "content": system}]
-        if history:
-            # include a small slice of prior turns to give continuity
-            for m in history[-8:]:
-                if m.get("role") in ("user", "assistant") and m.get("content"):
-                    messages.append({"role": m["role"], "content": m["content"]})
-        messages.append({"role": "user", "content": user})
-
-        resp = client.chat.completions.create(
-            model=_model_name(),
-            temperature=0.3,
-            max_tokens=800,
-            messages=messages,
+        resp = _create(
+            client, "generate_recipe", route,
+            messages=_generate_messages(recipe_name, dislikes, history),
             response_format={"type": "json_object"},
         )
-        content = resp.choices[0].message.content if resp.choices else "{}"
-        parsed = _parse_json_safe(content, {"name": recipe_name, "ingredients": [], "steps": []})
-        if "name" not in parsed:
-            parsed["name"] = recipe_name
-        if "ingredients" not in parsed:
-            parsed["ingredients"] = []
-        if "steps" not in parsed:
-            parsed["steps"] = []
-        return parsed
+        return _cache_result(key, _finish_generated(_content(resp, "{}"), recipe_name))
     except Exception as e:  # pragma: no cover - runtime/network errors
         return {"name": recipe_name, "ingredients": [], "steps": [f"LLM error: {e}"]}
 
 
-def chat_json(messages: list, max_tokens: int = 400) -> Dict:
+async def generate_recipe_async(recipe_name: str, dislikes: Optional[list] = None, history: Optional[list] = None) -> Dict:
+    """Async variant of :func:`generate_recipe`."""
+    dislikes = dislikes or []
+    route = model_routing.get_route("generate")
+    client = _get_async_client()
+    if not client:
+        return _mock_recipe(recipe_name)
+
+    key = llm_cache.generate_key(route.model, recipe_name, dislikes)
+    cached = llm_cache.get_cache().get(key)
+    if cached is not None:
+        return cached
+
+    async def call() -> Dict:
+        try:
+            resp = await _acreate(
+                client, "generate_recipe", route,
+                messages=_generate_messages(recipe_name, dislikes, history),
+                response_format={"type": "json_object"},
+            )
+            return _cache_result(key, _finish_generated(_content(resp, "{}"), recipe_name))
+        except (llm_scheduler.Overloaded, resilience.Unavailable):
+            raise
+        except Exception as e:  # pragma: no cover - runtime/network errors
+            return {"name": recipe_name, "ingredients": [], "steps": [f"LLM error: {e}"]}
+
+    return await _inflight.do(key, call)
+
+
+def chat_json(messages: list, max_tokens: Optional[int] = None, task: str = "intent") -> Dict:
     """Send a chat with response_format json_object and return parsed JSON.
 
     Returns empty dict if LLM unavailable or parsing fails.
     messages: list of {role: 'system'|'user'|'assistant', content: str}
+    task: routing task (``intent`` or ``substitute``), see :mod:`backend.model_routing`
     """
-    import json
     client = _get_client()
     if not client:
         return {}
+    route = model_routing.get_route(task)
     try:
-        resp = client.chat.completions.create(
-            model=_model_name(),
-            temperature=0.2,
+        resp = _create(
+            client, "chat_json", route,
             max_tokens=max_tokens,
             messages=messages,
             response_format={"type": "json_object"},
         )
-        content = resp.choices[0].message.content if resp.choices else "{}"
-        return _parse_json_safe(content, {})
+        return _parse_json_safe(_content(resp, "{}"), {})
     except Exception:
         return {}
 
 
+async def chat_json_async(messages: list, max_tokens: Optional[int] = None, task: str = "intent",
+                          hedge: bool = False) -> Dict:
+    """Async variant of :func:`chat_json`; ``hedge`` allows a hedged second request."""
+    client = _get_async_client()
+    if not client:
+        return {}
+    route = model_routing.get_route(task)
+
+    async def call() -> Dict:
+        try:
+            resp = await _acreate(
+                client, "chat_json", route, hedge=hedge,
+                max_tokens=max_tokens,
+                messages=messages,
+                response_format={"type": "json_object"},
+            )
+            return _parse_json_safe(_content(resp, "{}"), {})
+        except llm_scheduler.Overloaded:
+            raise
+        except Exception:
+            return {}
+
+    key = llm_cache.make_key("chat_json", route.model, messages=messages, max_tokens=max_tokens)
+    return await _inflight.do(key, call)
+
+
+def _modify_messages(base_recipe: Dict, dislikes: list, substitutions: list, history: Optional[list]) -> List[Dict[str, str]]:
+    import json
+
+    system = "You are a helpful cooking assistant. Modify the given recipe JSON to satisfy user constraints without losing structure."
+    subs_text = "; ".join([f"{a} -> {b}" for a, b in substitutions]) if substitutions else "none"
+    user = (
+        "Modify the following recipe JSON to avoid dislikes and apply substitutions, keeping the same JSON schema.\n"
+        f"Dislikes: {', '.join(dislikes) if dislikes else 'none'}\n"
+        f"Substitutions: {subs_text}\n"
+        f"Recipe JSON: {json.dumps(base_recipe, ensure_ascii=False)}"
+    )
+
+    messages = [{"role": "system", "content": system}]
+    messages.extend(history_window.fit(history, "modify", 8))
+    messages.append({"role": "user", "content": user})
+    return messages
+
+
+def _patch_mode() -> bool:
+    return os.getenv("MODIFY_MODE", "patch").lower() != "full"
+
+
+def _patch_messages(base_recipe: Dict, dislikes: list, substitutions: list, history: Optional[list]) -> List[Dict[str, str]]:
+    import json
+
+    system = "You are a helpful cooking assistant. You edit recipes by returning a compact recipe patch as JSON."
+    subs_text = "; ".join([f"{a} -> {b}" for a, b in substitutions]) if substitutions else "none"
+    user = (
+        "Edit the recipe below to avoid dislikes and apply substitutions. Do not repeat the recipe; "
+        f"return only the changes as {recipe_patch.PATCH_FORMAT}. Adjust steps that mention changed ingredients.\n"
+        f"Dislikes: {', '.join(dislikes) if dislikes else 'none'}\n"
+        f"Substitutions: {subs_text}\n"
+        f"Recipe JSON: {json.dumps(base_recipe, ensure_ascii=False)}"
+    )
+
+    messages = [{"role": "system", "content": system}]
+    messages.extend(history_window.fit(history, "patch", 8))
+    messages.append({"role": "user", "content": user})
+    return messages
+
+
+def _finish_patch(content: str, base_recipe: Dict, dislikes: list, substitutions: list) -> Optional[Dict]:
+    """Apply a patch completion to the base recipe; None if it does not apply cleanly."""
+    patch, complete = _parse_json(content, {})
+    try:
+        if not complete:
+            raise recipe_patch.PatchError("truncated patch")
+        recipe = recipe_patch.apply_patch(base_recipe, patch)
+        recipe_patch.check_avoided(recipe, list(dislikes) + [a for a, _ in substitutions],
+                                   allowed=[b for _, b in substitutions])
+    except recipe_patch.PatchError as e:
+        recipe_patch.record(False)
+        logger.info(f"recipe patch rejected, regenerating: {e}")
+        return None
+    recipe_patch.record(True)
+    return recipe
+
+
 def modify_recipe(base_recipe: Dict, dislikes: Optional[list] = None, substitutions: Optional[list] = None, history: Optional[list] = None) -> Dict:
     """Modify an existing recipe via LLM given constraints.
 
@@ -190,41 +690,152 @@ def modify_recipe(base_recipe: Dict, dislikes: Optional[list] = None, substituti
     dislikes: list of strings to avoid
     substitutions: list of pairs like [("milk", "oat milk")]
     history: optional chat history (list of {role, content}) for context
-    """
-    import json
 
+    Results are cached by base recipe content, dislikes, substitutions and model.
+    """
     dislikes = dislikes or []
     substitutions = substitutions or []
+    route = model_routing.get_route("modify")
     client = _get_client()
     if not client:
         # fallback: just return the base recipe unchanged
         return base_recipe
 
-    system = "You are a helpful cooking assistant. Modify the given recipe JSON to satisfy user constraints without losing structure."
-    subs_text = "; ".join([f"{a} -> {b}" for a, b in substitutions]) if substitutions else "none"
-    user = (
-        "Modify the following recipe JSON to avoid dislikes and apply substitutions, keeping the same JSON schema.\n"
-        f"Dislikes: {', '.join(dislikes) if dislikes else 'none'}\n"
-        f"Substitutions: {subs_text}\n"
-        f"Recipe JSON: {json.dumps(base_recipe, ensure_ascii=False)}"
-    )
-
-    messages = [{"role": "system", "content": system}]
-    if history:
-        for m in history[-8:]:
-            if m.get("role") in ("user", "assistant") and m.get("content"):
-                messages.append({"role": m["role"], "content": m["content"]})
-    messages.append({"role": "user", "content": user})
-
+    key = llm_cache.modify_key(route.model, base_recipe, dislikes, substitutions)
+    cached = llm_cache.get_cache().get(key)
+    if cached is not None:
+        return cached
     try:
-        resp = client.chat.completions.create(
-            model=_model_name(),
-            temperature=0.3,
-            max_tokens=900,
-            messages=messages,
+        if _patch_mode():
+            resp = _create(
+                client, "modify_recipe", route,
+                messages=_patch_messages(base_recipe, dislikes, substitutions, history),
+                response_format={"type": "json_object"},
+            )
+            patched = _finish_patch(_content(resp, "{}"), base_recipe, dislikes, substitutions)
+            if patched is not None:
+                return _cache_result(key, (patched, True))
+        resp = _create(
+            client, "modify_recipe", route,
+            messages=_modify_messages(base_recipe, dislikes, substitutions, history),
             response_format={"type": "json_object"},
         )
-        content = resp.choices[0].message.content if resp.choices else "{}"
-        return _parse_json_safe(content, base_recipe)
+        return _cache_result(key, _finish_modified(_content(resp, "{}"), base_recipe))
     except Exception as e:  # pragma: no cover
         return base_recipe
+
+
+async def _apatch(client, base_recipe: Dict, dislikes: list, substitutions: list,
+                  history: Optional[list]) -> Optional[Dict]:
+    resp = await _acreate(
+        client, "modify_recipe", model_routing.get_route("modify"),
+        messages=_patch_messages(base_recipe, dislikes, substitutions, history),
+        response_format={"type": "json_object"},
+    )
+    return _finish_patch(_content(resp, "{}"), base_recipe, dislikes, substitutions)
+
+
+async def modify_recipe_async(base_recipe: Dict, dislikes: Optional[list] = None, substitutions: Optional[list] = None, history: Optional[list] = None) -> Dict:
+    """Async variant of :func:`modify_recipe`."""
+    dislikes = dislikes or []
+    substitutions = substitutions or []
+    route = model_routing.get_route("modify")
+    client = _get_async_client()
+    if not client:
+        return base_recipe
+
+    key = llm_cache.modify_key(route.model, base_recipe, dislikes, substitutions)
+    cached = llm_cache.get_cache().get(key)
+    if cached is not None:
+        return cached
+
+    async def call() -> Dict:
+        try:
+            if _patch_mode():
+                patched = await _apatch(client, base_recipe, dislikes, substitutions, history)
+                if patched is not None:
+                    return _cache_result(key, (patched, True))
+            resp = await _acreate(
+                client, "modify_recipe", route,
+                messages=_modify_messages(base_recipe, dislikes, substitutions, history),
+                response_format={"type": "json_object"},
+            )
+            return _cache_result(key, _finish_modified(_content(resp, "{}"), base_recipe))
+        except (llm_scheduler.Overloaded, resilience.Unavailable):
+            raise
+        except Exception:  # pragma: no cover
+            return base_recipe
+
+    return await _inflight.do(key, call)
+
+
+async def generate_recipe_stream(recipe_name: str, dislikes: Optional[list] = None,
+                                 history: Optional[list] = None) -> AsyncIterator[str]:
+    """Stream the raw JSON text of a generated recipe as it is produced.
+
+    Cache hits and the no-LLM mock are yielded as a single chunk; the caller
+    parses the chunks (see ``utils.json_stream``). A fully consumed stream is
+    stored in the response cache like :func:`generate_recipe` results.
+    """
+    import json
+
+    dislikes = dislikes or []
+    route = model_routing.get_route("generate")
+    client = _get_async_client()
+    if not client:
+        yield json.dumps(_mock_recipe(recipe_name))
+        return
+    key = llm_cache.generate_key(route.model, recipe_name, dislikes)
+    cached = llm_cache.get_cache().get(key)
+    if cached is not None:
+        yield json.dumps(cached, ensure_ascii=False)
+        return
+    parts = []
+    async for delta in _astream(
+        client, "generate_recipe", route,
+        messages=_generate_messages(recipe_name, dislikes, history),
+        response_format={"type": "json_object"},
+    ):
+        parts.append(delta)
+        yield delta
+    _cache_result(key, _finish_generated("".join(parts), recipe_name))
+
+
+async def modify_recipe_stream(base_recipe: Dict, dislikes: Optional[list] = None, substitutions: Optional[list] = None,
+                               history: Optional[list] = None) -> AsyncIterator[str]:
+    """Streaming variant of :func:`modify_recipe_async` (raw JSON text chunks)."""
+    import json
+
+    dislikes = dislikes or []
+    substitutions = substitutions or []
+    route = model_routing.get_route("modify")
+    client = _get_async_client()
+    if not client:
+        yield json.dumps(base_recipe, ensure_ascii=False)
+        return
+    key = llm_cache.modify_key(route.model, base_recipe, dislikes, substitutions)
+    cached = llm_cache.get_cache().get(key)
+    if cached is not None:
+        yield json.dumps(cached, ensure_ascii=False)
+        return
+    if _patch_mode():
+        # a patch is short enough to fetch whole; only a rejected one streams the full recipe
+        try:
+            patched = await _apatch(client, base_recipe, dislikes, substitutions, history)
+        except (llm_scheduler.Overloaded, resilience.Unavailable):
+            raise
+        except Exception as e:  # pragma: no cover - runtime/network errors
+            logger.warning(f"recipe patch request failed: {e}")
+            patched = None
+        if patched is not None:
+            yield json.dumps(_cache_result(key, (patched, True)), ensure_ascii=False)
+            return
+    parts = []
+    async for delta in _astream(
+        client, "modify_recipe", route,
+        messages=_modify_messages(base_recipe, dislikes, substitutions, history),
+        response_format={"type": "json_object"},
+    ):
+        parts.append(delta)
+        yield delta
+    _cache_result(key, _finish_modified("".join(parts), base_recipe))
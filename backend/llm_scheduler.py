@@ -0,0 +1,230 @@
+"""Admission control for upstream LLM calls.
+
+Every async completion acquires a slot from one :class:`LLMScheduler` before
+it is sent. The scheduler bounds concurrent calls (``LLM_MAX_CONCURRENCY``)
+and the tokens sent per rolling minute (``LLM_TOKENS_PER_MINUTE``, prompt
+estimate plus ``max_tokens``, corrected with the reported usage; 0 disables
+the limit). Waiting calls are served by priority, then arrival:
+
+- 0: ``chat_json`` (intent parsing, substitutions): small and on the
+  critical path of every request
+- 1: ``ask_llm`` (smalltalk)
+- 2: ``generate_recipe`` / ``modify_recipe``
+
+A call that cannot start before its deadline raises :class:`Overloaded`
+instead of waiting on. The deadline is the request's (see :func:`deadline`,
+set by ``/ask`` from ``ASK_DEADLINE``) or, outside a request,
+``LLM_QUEUE_TIMEOUT`` seconds. Calls are also shed at once while
+``LLM_MAX_QUEUE`` calls are already waiting.
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from . import metrics
+
+
+PRIORITIES = {"chat_json": 0, "ask_llm": 1, "generate_recipe": 2, "modify_recipe": 2}
+
+_WINDOW = 60.0
+
+# absolute monotonic deadline of the current request (None = per-call default)
+_deadline: ContextVar[Optional[float]] = ContextVar("llm_deadline", default=None)
+
+QUEUE_WAIT = metrics.histogram("sous_llm_queue_wait_seconds", "Time upstream calls waited for admission")
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class Overloaded(Exception):
+    """An LLM call was shed: it could not be admitted before its deadline."""
+
+    def __init__(self, reason: str, retry_after: float = 1.0):
+        super().__init__(f"LLM capacity exceeded ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """Give LLM calls made inside the block (and tasks started there) ``seconds`` to be admitted."""
+    token = _deadline.set(time.monotonic() + seconds if seconds > 0 else None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+class _Waiter:
+    __slots__ = ("priority", "tokens", "future", "enqueued")
+
+    def __init__(self, priority: int, tokens: int, future: "asyncio.Future"):
+        self.priority = priority
+        self.tokens = tokens
+        self.future = future
+        self.enqueued = time.monotonic()
+
+
+class Ticket:
+    """An admitted call; pass it back to :meth:`LLMScheduler.release`."""
+
+    __slots__ = ("reserved", "entry")
+
+    def __init__(self, reserved: int, entry: List[float]):
+        self.reserved = reserved
+        self.entry = entry  # [time, tokens] in the rate window
+
+
+class LLMScheduler:
+    def __init__(self, max_concurrency: int = 32, tokens_per_minute: int = 0, max_queue: int = 1000,
+                 queue_timeout: float = 30.0):
+        self.max_concurrency = max_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._active = 0
+        self._queue: List[Tuple[int, int, _Waiter]] = []
+        self._seq = itertools.count()
+        self._window: Deque[List[float]] = deque()
+        self._window_tokens = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._counters: Dict[str, Any] = {
+            "admitted": 0, "queued": 0, "shed_deadline": 0, "shed_queue_full": 0,
+            "max_queue_depth": 0, "wait_seconds_total": 0.0,
+        }
+
+    def _expire(self, now: float) -> None:
+        while self._window and now - self._window[0][0] > _WINDOW:
+            self._window_tokens -= int(self._window.popleft()[1])
+
+    def _fits(self, tokens: int, now: float) -> bool:
+        if self._active >= self.max_concurrency:
+            return False
+        if not self.tokens_per_minute:
+            return True
+        self._expire(now)
+        # a call larger than the whole budget still runs once the window is empty
+        return self._window_tokens + tokens <= self.tokens_per_minute or not self._window
+
+    def _grant(self, tokens: int, now: float) -> Ticket:
+        self._active += 1
+        entry = [now, tokens]
+        self._window.append(entry)
+        self._window_tokens += tokens
+        self._counters["admitted"] += 1
+        return Ticket(tokens, entry)
+
+    def _dispatch(self) -> None:
+        self._timer = None
+        now = time.monotonic()
+        while self._queue:
+            waiter = self._queue[0][2]
+            if waiter.future.done():  # timed out or cancelled
+                heapq.heappop(self._queue)
+                continue
+            if not self._fits(waiter.tokens, now):
+                break
+            heapq.heappop(self._queue)
+            waiter.future.set_result(self._grant(waiter.tokens, now))
+        if self._queue and self._active < self.max_concurrency and self._window and self._timer is None:
+            # blocked on the token budget: retry when the oldest reservation leaves the window
+            delay = max(0.0, self._window[0][0] + _WINDOW - now) + 0.001
+            self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    async def acquire(self, priority: int, tokens: int) -> Ticket:
+        now = time.monotonic()
+        if not self._queue and self._fits(tokens, now):
+            QUEUE_WAIT.observe(0.0, priority=priority)
+            return self._grant(tokens, now)
+        if len(self._queue) >= self.max_queue:
+            self._counters["shed_queue_full"] += 1
+            raise Overloaded("queue full")
+        due = _deadline.get()
+        timeout = (due - now) if due is not None else self.queue_timeout
+        if timeout <= 0:
+            self._counters["shed_deadline"] += 1
+            raise Overloaded("deadline")
+
+        waiter = _Waiter(priority, tokens, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._queue, (priority, next(self._seq), waiter))
+        self._counters["queued"] += 1
+        self._counters["max_queue_depth"] = max(self._counters["max_queue_depth"], len(self._queue))
+        self._dispatch()
+        try:
+            ticket = await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except asyncio.TimeoutError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                return self._granted(waiter)  # admitted in the same tick
+            waiter.future.cancel()
+            self._counters["shed_deadline"] += 1
+            raise Overloaded("deadline", retry_after=max(1.0, timeout)) from None
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self.release(waiter.future.result())
+            else:
+                waiter.future.cancel()
+            raise
+        return self._granted(waiter, ticket)
+
+    def _granted(self, waiter: _Waiter, ticket: Optional[Ticket] = None) -> Ticket:
+        waited = time.monotonic() - waiter.enqueued
+        self._counters["wait_seconds_total"] += waited
+        QUEUE_WAIT.observe(waited, priority=waiter.priority)
+        return ticket or waiter.future.result()
+
+    def release(self, ticket: Ticket, used_tokens: Optional[int] = None) -> None:
+        self._active -= 1
+        if used_tokens is not None and used_tokens != ticket.entry[1]:
+            # settle the reservation to what the provider reported
+            if self._window and ticket.entry[0] >= self._window[0][0]:
+                self._window_tokens += used_tokens - int(ticket.entry[1])
+            ticket.entry[1] = used_tokens
+        if self._queue:
+            self._dispatch()
+
+    def busy(self) -> bool:
+        """True when a new call would have to wait for admission."""
+        return bool(self._queue) or self._active >= self.max_concurrency
+
+    def stats(self) -> Dict[str, Any]:
+        self._expire(time.monotonic())
+        admitted = self._counters["admitted"]
+        return {
+            **self._counters,
+            "active": self._active,
+            "queue_depth": sum(1 for _, _, w in self._queue if not w.future.done()),
+            "tokens_last_minute": self._window_tokens,
+            "avg_wait_ms": (self._counters["wait_seconds_total"] / admitted * 1000) if admitted else 0.0,
+        }
+
+
+_SCHEDULER: Optional[LLMScheduler] = None
+
+
+def get_scheduler() -> LLMScheduler:
+    """Process-wide scheduler, configured from env on first use."""
+    global _SCHEDULER
+    if _SCHEDULER is None:
+        _SCHEDULER = LLMScheduler(
+            max_concurrency=max(1, int(_env_number("LLM_MAX_CONCURRENCY", 32))),
+            tokens_per_minute=int(_env_number("LLM_TOKENS_PER_MINUTE", 0)),
+            max_queue=int(_env_number("LLM_MAX_QUEUE", 1000)),
+            queue_timeout=_env_number("LLM_QUEUE_TIMEOUT", 30),
+        )
+    return _SCHEDULER
+
+
+def scheduler_stats() -> Dict[str, Any]:
+    return get_scheduler().stats()
@@ -0,0 +1,265 @@
+"""In-process metrics with a Prometheus text exposition.
+
+Counters and histograms are plain Python objects guarded by one lock each,
+so recording a sample costs a dict lookup and a ``bisect``; there is no
+external dependency. :func:`render` produces the text served on
+``/metrics``. Existing ``*_stats()`` counters are exported through
+collectors registered with :func:`register_collector`, so they are read
+only when scraped.
+
+:func:`stage` times a named stage of request handling into
+``sous_stage_seconds`` and, when the request is traced by
+:class:`TimingMiddleware`, into its ``Server-Timing`` header
+(``METRICS_TIMING_HEADERS=1``).
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+_Labels = Tuple[Tuple[str, str], ...]
+
+_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# stage -> seconds for the request being traced (None when not traced)
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+def _key(labels: Dict[str, Any]) -> _Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt_labels(labels: _Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    body = ",".join('{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+                    for k, v in pairs)
+    return "{" + body + "}"
+
+
+def _fmt_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[_Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = _key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(_key(labels), 0)
+
+    def samples(self) -> Iterator[Tuple[str, _Labels, float]]:
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            yield self.name, labels, value
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = _LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[_Labels, List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _key(labels)
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][i] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def snapshot(self, **labels: Any) -> Optional[Dict[str, Any]]:
+        """Counts, sum and bucket bounds for one label set (None if unseen)."""
+        with self._lock:
+            entry = self._values.get(_key(labels))
+            if entry is None:
+                return None
+            return {"buckets": self.buckets, "counts": list(entry[0]), "sum": entry[1], "count": entry[2]}
+
+    def quantile(self, q: float, **labels: Any) -> float:
+        """Upper bucket bound below which a ``q`` fraction of samples fall."""
+        snap = self.snapshot(**labels)
+        if not snap or not snap["count"]:
+            return 0.0
+        target, seen = q * snap["count"], 0
+        for bound, n in zip(self.buckets + (float("inf"),), snap["counts"]):
+            seen += n
+            if seen >= target:
+                return bound
+        return float("inf")
+
+    def samples(self) -> Iterator[Tuple[str, _Labels, float]]:
+        with self._lock:
+            items = [(labels, list(e[0]), e[1], e[2]) for labels, e in self._values.items()]
+        for labels, counts, total, count in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                yield self.name + "_bucket", labels + (("le", _fmt_value(bound)),), cumulative
+            yield self.name + "_sum", labels, total
+            yield self.name + "_count", labels, count
+
+
+_REGISTRY: List[Any] = []
+_COLLECTORS: List[Tuple[str, Callable[[], Dict[str, Any]]]] = []
+
+
+def counter(name: str, help: str) -> Counter:
+    metric = Counter(name, help)
+    _REGISTRY.append(metric)
+    return metric
+
+
+def histogram(name: str, help: str, buckets: Tuple[float, ...] = _LATENCY_BUCKETS) -> Histogram:
+    metric = Histogram(name, help, buckets)
+    _REGISTRY.append(metric)
+    return metric
+
+
+def register_collector(prefix: str, fn: Callable[[], Dict[str, Any]]) -> None:
+    """Export the numeric fields of ``fn()`` as ``sous_<prefix>_<field>`` gauges.
+
+    Nested dicts become labels (``{"intent": {"calls": 3}}`` ->
+    ``sous_<prefix>_calls{key="intent"} 3``).
+    """
+    _COLLECTORS.append((prefix, fn))
+
+
+STAGE_SECONDS = histogram("sous_stage_seconds", "Time spent in each stage of request handling")
+REQUEST_SECONDS = histogram("sous_request_seconds", "HTTP request latency until response headers")
+LLM_SECONDS = histogram("sous_llm_request_seconds", "Upstream chat completion latency per helper and model")
+LLM_REQUESTS = counter("sous_llm_requests_total", "Upstream chat completions per helper, model and outcome")
+LLM_TOKENS = counter("sous_llm_tokens_total", "Tokens reported by the provider per helper, model and kind")
+INTENTS = counter("sous_intents_total", "Parsed intents per route")
+
+
+def record_llm(helper: str, seconds: float, usage: Any = None, error: bool = False, model: str = "") -> None:
+    """Record one upstream completion for ``helper`` (e.g. ``chat_json``) sent to ``model``."""
+    LLM_SECONDS.observe(seconds, helper=helper, model=model)
+    LLM_REQUESTS.inc(helper=helper, model=model, outcome="error" if error else "ok")
+    if usage is not None:
+        LLM_TOKENS.inc(getattr(usage, "prompt_tokens", 0) or 0, helper=helper, model=model, kind="prompt")
+        LLM_TOKENS.inc(getattr(usage, "completion_tokens", 0) or 0, helper=helper, model=model, kind="completion")
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the enclosed block as stage ``name``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        timings = _timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + elapsed
+
+
+def _flatten(prefix: str, data: Dict[str, Any], labels: _Labels = ()) -> Iterator[Tuple[str, _Labels, float]]:
+    for field, value in data.items():
+        if isinstance(value, bool):
+            value = int(value)
+        if isinstance(value, (int, float)):
+            yield f"sous_{prefix}_{field}", labels, value
+        elif isinstance(value, dict) and not labels:
+            yield from _flatten(prefix, value, (("key", str(field)),))
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format (0.0.4)."""
+    lines: List[str] = []
+    for metric in _REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in metric.samples():
+            lines.append(f"{name}{_fmt_labels(labels)} {_fmt_value(value)}")
+    for prefix, fn in _COLLECTORS:
+        try:
+            data = fn()
+        except Exception:  # a broken collector must not break the scrape
+            continue
+        # samples of one metric must be contiguous in the exposition
+        grouped: Dict[str, List[str]] = {}
+        for name, labels, value in _flatten(prefix, data):
+            grouped.setdefault(name, []).append(f"{name}{_fmt_labels(labels)} {_fmt_value(value)}")
+        for name, samples in grouped.items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+
+def _timing_headers() -> bool:
+    return os.getenv("METRICS_TIMING_HEADERS", "0").lower() in ("1", "true", "yes")
+
+
+class TimingMiddleware:
+    """ASGI middleware recording request latency per route.
+
+    With ``METRICS_TIMING_HEADERS=1`` responses also carry
+    ``Server-Timing`` (stages finished before the headers were sent) and
+    ``X-Response-Time`` in milliseconds.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.headers = _timing_headers()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
+        token = _timings.set(timings)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                elapsed = time.perf_counter() - start
+                route = scope.get("route")
+                REQUEST_SECONDS.observe(elapsed, path=getattr(route, "path", "unmatched"),
+                                        method=scope.get("method", ""))
+                if self.headers:
+                    parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items()]
+                    parts.append(f"total;dur={elapsed * 1000:.1f}")
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", ", ".join(parts).encode("latin-1")))
+                    headers.append((b"x-response-time", f"{elapsed * 1000:.1f}ms".encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _timings.reset(token)
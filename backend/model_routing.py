@@ -0,0 +1,143 @@
+"""Per-task model routing for LLM calls.
+
+Every completion belongs to one task, and each task has a :class:`Route`:
+a chain of models tried in order plus a sampling profile.
+
+- ``intent``: intent classification JSON (small model)
+- ``smalltalk``: free-text chat replies (small model)
+- ``substitute``: batched ingredient substitutes JSON (small model)
+- ``generate``: full recipe generation
+- ``modify``: recipe patches and full rewrites
+
+Small-model tasks default to ``OPENAI_SMALL_MODEL`` (``gpt-4o-mini``) and fall
+back to ``OPENAI_MODEL`` (``gpt-4o``); the others use ``OPENAI_MODEL`` only.
+``OPENAI_MODEL_<TASK>`` replaces a task's chain (comma-separated, e.g.
+``OPENAI_MODEL_INTENT=gpt-4o-mini,gpt-4o``). ``LLM_TEMPERATURE_<TASK>`` and
+``LLM_MAX_TOKENS_<TASK>`` override the profile; a call's own ``max_tokens``
+is capped by the profile.
+
+The next model in the chain is tried when a model is unavailable after its
+retries or rejects the request (e.g. unknown model on a proxy). Latency of
+each routed call (for streams: until the stream opens) is recorded per task
+and answering model in ``sous_llm_task_seconds``; :func:`routing_stats` has the counters.
+"""
+
+import os
+from typing import Any, Dict, Optional, Tuple
+
+from . import metrics
+
+
+TASKS = ("intent", "smalltalk", "substitute", "generate", "modify")
+
+# task -> (temperature, max_tokens)
+_PROFILES: Dict[str, Tuple[float, int]] = {
+    "intent": (0.2, 300),
+    "smalltalk": (0.3, 300),
+    "substitute": (0.2, 1500),
+    "generate": (0.3, 800),
+    "modify": (0.3, 900),
+}
+
+_SMALL_TASKS = ("intent", "smalltalk", "substitute")
+
+TASK_SECONDS = metrics.histogram("sous_llm_task_seconds", "Routed LLM call latency per task and answering model")
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class Route:
+    """Models (in fallback order) and sampling profile for one task."""
+
+    __slots__ = ("task", "models", "temperature", "max_tokens")
+
+    def __init__(self, task: str, models: Tuple[str, ...], temperature: float, max_tokens: int):
+        self.task = task
+        self.models = models
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+
+    @property
+    def model(self) -> str:
+        """Primary model (part of cache keys)."""
+        return self.models[0]
+
+    def pinned(self, model: Optional[str]) -> "Route":
+        """This route restricted to ``model`` (no fallback), or itself when None."""
+        if not model:
+            return self
+        return Route(self.task, (model,), self.temperature, self.max_tokens)
+
+    def params(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Request parameters: the profile's temperature unless given, ``max_tokens`` capped by the profile."""
+        out = {"temperature": self.temperature, **{k: v for k, v in kwargs.items() if v is not None}}
+        out["max_tokens"] = min(int(out.get("max_tokens") or self.max_tokens), self.max_tokens)
+        return out
+
+
+def _chain(task: str) -> Tuple[str, ...]:
+    default = os.getenv("OPENAI_MODEL", "gpt-4o")
+    configured = os.getenv(f"OPENAI_MODEL_{task.upper()}")
+    if configured:
+        models = [m.strip() for m in configured.split(",") if m.strip()]
+    elif task in _SMALL_TASKS:
+        models = [os.getenv("OPENAI_SMALL_MODEL", "gpt-4o-mini"), default]
+    else:
+        models = [default]
+    return tuple(dict.fromkeys(models)) or (default,)
+
+
+def _build(task: str) -> Route:
+    temperature, max_tokens = _PROFILES[task]
+    return Route(
+        task,
+        _chain(task),
+        _env_number(f"LLM_TEMPERATURE_{task.upper()}", temperature),
+        max(1, int(_env_number(f"LLM_MAX_TOKENS_{task.upper()}", max_tokens))),
+    )
+
+
+_ROUTES: Optional[Dict[str, Route]] = None
+_STATS: Dict[str, Dict[str, Any]] = {task: {"calls": 0, "fallbacks": 0, "errors": 0, "seconds": 0.0} for task in TASKS}
+
+
+def get_route(task: str) -> Route:
+    """Route for ``task``; routes are configured from env on first use."""
+    global _ROUTES
+    if _ROUTES is None:
+        _ROUTES = {t: _build(t) for t in TASKS}
+    return _ROUTES[task]
+
+
+def record(task: str, model: Optional[str], seconds: float, fallback: bool = False) -> None:
+    """Record one routed call answered by ``model`` (None when every model failed)."""
+    stats = _STATS[task]
+    stats["calls"] += 1
+    stats["seconds"] += seconds
+    if fallback:
+        stats["fallbacks"] += 1
+    if model is None:
+        stats["errors"] += 1
+        return
+    TASK_SECONDS.observe(seconds, task=task, model=model)
+
+
+def routing_stats() -> Dict[str, Any]:
+    """Per task: model chain, calls, fallbacks to a later model, failures and mean latency."""
+    out: Dict[str, Any] = {}
+    for task in TASKS:
+        route, stats = get_route(task), _STATS[task]
+        calls = stats["calls"]
+        out[task] = {
+            "models": ",".join(route.models),
+            "calls": calls,
+            "fallbacks": stats["fallbacks"],
+            "errors": stats["errors"],
+            "avg_ms": (stats["seconds"] / calls * 1000) if calls else 0.0,
+        }
+    return out
@@ -1,12 +1,16 @@
 # iui/backend/models.py
 
-from sqlalchemy import Column, Integer, String, ForeignKey, TIMESTAMP, JSON, ARRAY, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, TIMESTAMP, JSON, ARRAY, Text, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from .database import Base # Import our new Base class
 import uuid
 
+# Postgres types, with JSON stand-ins so the schema also builds on SQLite (benchmarks)
+JSONB_ = JSONB().with_variant(JSON(), "sqlite")
+TEXT_ARRAY = ARRAY(Text).with_variant(JSON(), "sqlite")
+
 # Table 1: users
 class User(Base):
     __tablename__ = "users"
@@ -26,9 +30,9 @@ class UserProfile(Base):
     
     profile_id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id"), nullable=False, unique=True)
-    allergies = Column(ARRAY(Text), default=[])
-    dietary_restrictions = Column(ARRAY(Text), default=[])
-    disliked_ingredients = Column(ARRAY(Text), default=[])
+    allergies = Column(TEXT_ARRAY, default=[])
+    dietary_restrictions = Column(TEXT_ARRAY, default=[])
+    disliked_ingredients = Column(TEXT_ARRAY, default=[])
     skill_level = Column(String(50))
     
     user = relationship("User", back_populates="profile")
@@ -36,11 +40,24 @@ class UserProfile(Base):
 # Table 3: saved_recipes
 class SavedRecipe(Base):
     __tablename__ = "saved_recipes"
+    # keyset pagination: newest first per user, recipe_id breaks saved_at ties
+    __table_args__ = (Index("ix_saved_recipes_user_saved", "user_id", "saved_at", "recipe_id"),)
     
     recipe_id = Column(Integer, primary_key=True, autoincrement=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id"), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id"), nullable=False)
     recipe_title = Column(String(255), nullable=False)
-    recipe_data = Column(JSONB, nullable=False)
-    saved_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    recipe_data = Column(JSONB_, nullable=False)
+    saved_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
     
-    user = relationship("User", back_populates="recipes")
\ No newline at end of file
+    user = relationship("User", back_populates="recipes")
+
+# Table 4: saved_recipe_ingredients (searchable ingredient terms of saved_recipes,
+# written together with the recipe; see backend/saved_recipes.py)
+class SavedRecipeIngredient(Base):
+    __tablename__ = "saved_recipe_ingredients"
+    # include filters: user + term -> recipe ids without touching saved_recipes
+    __table_args__ = (Index("ix_saved_recipe_ingredients_user_term", "user_id", "term", "recipe_id"),)
+
+    recipe_id = Column(Integer, ForeignKey("saved_recipes.recipe_id", ondelete="CASCADE"), primary_key=True)
+    term = Column(String(255), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id"), nullable=False)
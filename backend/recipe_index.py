@@ -0,0 +1,148 @@
+"""In-memory recipe name index.
+
+Builds, once per catalogue version, the lookups ``recipe_retrieval`` needs:
+
+- exact name -> recipe (dict lookup)
+- n-gram (1-3 characters) inverted index for substring ("contains") matches
+
+Recipes can come from a parsed JSON list or from a compact on-disk file that
+is memory-mapped, so large catalogues only decode the recipes actually hit.
+
+Compact format (little endian):
+    magic b"RCPIDX1\\n" | uint32 count |
+    count x (uint64 name_off, uint32 name_len, uint64 rec_off, uint32 rec_len) |
+    blob area (UTF-8 lower-cased names and JSON-encoded recipes)
+
+Build one with:
+    python -m backend.recipe_index data/recipes.json data/recipes.idx
+"""
+
+import json
+import mmap
+import struct
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+
+MAGIC = b"RCPIDX1\n"
+_HEADER = struct.Struct("<I")
+_ENTRY = struct.Struct("<QIQI")
+
+
+def _grams(text: str) -> Set[str]:
+    """All substrings of ``text`` up to 3 characters long."""
+    return {text[i:i + n] for n in (1, 2, 3) for i in range(len(text) - n + 1)}
+
+
+def _query_grams(query: str) -> Set[str]:
+    if len(query) <= 3:
+        return {query}
+    return {query[i:i + 3] for i in range(len(query) - 2)}
+
+
+class RecipeIndex:
+    """Name index over an ordered recipe catalogue.
+
+    An exact (case-insensitive) name match wins anywhere in the catalogue;
+    otherwise the first recipe in catalogue order whose name contains the
+    query is returned. This differs from the linear scan it replaced, which
+    returned the first recipe matching either way, so "pancakes" now finds
+    "Pancakes" even after "Banana pancakes".
+    """
+
+    def __init__(self, names: List[str], loader: Callable[[int], Dict[str, Any]]):
+        self._names = names
+        self._load = loader
+        self._exact: Dict[str, int] = {}
+        # posting lists are appended in catalogue order, so they stay sorted
+        self._grams: Dict[str, List[int]] = {}
+        for i, name in enumerate(names):
+            self._exact.setdefault(name, i)
+            for g in _grams(name):
+                self._grams.setdefault(g, []).append(i)
+
+    @classmethod
+    def from_recipes(cls, recipes: Iterable[Dict[str, Any]]) -> "RecipeIndex":
+        items = list(recipes)
+        names = [str(r.get("name", "")).lower() for r in items]
+        return cls(names, items.__getitem__)
+
+    @classmethod
+    def from_compact(cls, path: Path) -> "RecipeIndex":
+        """Open a compact catalogue file; recipe bodies stay on disk until hit."""
+        with path.open("rb") as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if buf[:len(MAGIC)] != MAGIC:
+            buf.close()
+            raise ValueError(f"{path} is not a compact recipe catalogue")
+        (count,) = _HEADER.unpack_from(buf, len(MAGIC))
+        table = len(MAGIC) + _HEADER.size
+        entries = [_ENTRY.unpack_from(buf, table + i * _ENTRY.size) for i in range(count)]
+        names = [bytes(buf[o:o + n]).decode("utf-8") for o, n, _, _ in entries]
+
+        def load(i: int) -> Dict[str, Any]:
+            _, _, off, length = entries[i]
+            return json.loads(buf[off:off + length])
+
+        index = cls(names, load)
+        index._mmap = buf  # keep the mapping alive with the index
+        return index
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def _find(self, query: str) -> Optional[int]:
+        if query in self._exact:
+            return self._exact[query]
+        if not query:
+            return 0 if self._names else None
+        postings = sorted((self._grams.get(g, []) for g in _query_grams(query)), key=len)
+        if not postings[0]:
+            return None
+        if len(query) <= 3:
+            # the query is itself a gram: its posting list is the answer
+            return postings[0][0]
+        if any(not plist for plist in postings[1:]):
+            return None
+        # walk the rarest trigram's postings in order; trigrams can all occur
+        # without the full substring, so each candidate is verified
+        for i in postings[0]:
+            if query in self._names[i]:
+                return i
+        return None
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        i = self._find(name.lower().strip())
+        return self._load(i) if i is not None else None
+
+
+def write_compact(recipes: Iterable[Dict[str, Any]], path: Path) -> None:
+    """Write ``recipes`` to ``path`` in the compact format."""
+    items = list(recipes)
+    blobs: List[bytes] = []
+    entries = []
+    offset = len(MAGIC) + _HEADER.size + _ENTRY.size * len(items)
+    for r in items:
+        name = str(r.get("name", "")).lower().encode("utf-8")
+        rec = json.dumps(r, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        entries.append((offset, len(name), offset + len(name), len(rec)))
+        blobs.extend((name, rec))
+        offset += len(name) + len(rec)
+    with path.open("wb") as f:
+        f.write(MAGIC)
+        f.write(_HEADER.pack(len(items)))
+        for e in entries:
+            f.write(_ENTRY.pack(*e))
+        for b in blobs:
+            f.write(b)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("usage: python -m backend.recipe_index <recipes.json> <out.idx>")
+    src, dst = Path(sys.argv[1]), Path(sys.argv[2])
+    with src.open("r", encoding="utf-8") as f:
+        data = json.load(f)
+    write_compact(data.get("recipes", []), dst)
+    print(f"wrote {len(data.get('recipes', []))} recipes to {dst}")
@@ -0,0 +1,153 @@
+"""Compact recipe patches for ``modify_recipe``.
+
+Instead of re-emitting the whole recipe, the model can answer with a list of
+edits against the stored recipe, e.g.::
+
+    {"ops": [{"op": "replace_ingredient", "index": 2, "name": "oat milk"},
+             {"op": "replace_step", "index": 4, "text": "Whisk in the oat milk."}]}
+
+Supported ops (indices are 0-based positions in the *original* lists):
+
+- ``rename`` {name}
+- ``replace_ingredient`` {index, name, quantity?}  (quantity kept if omitted)
+- ``remove_ingredient`` {index}
+- ``add_ingredient`` {name, quantity?}  (appended)
+- ``replace_step`` {index, text}
+- ``remove_step`` {index}
+- ``insert_step`` {index, text}  (before original step ``index``; ``len`` appends)
+
+:func:`apply_patch` validates the whole patch before building a new recipe
+and raises :class:`PatchError` if anything is off, so the caller can fall
+back to full regeneration.
+"""
+
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from .term_matcher import get_matcher
+from .utils.recipe_utils import normalize_recipe
+
+
+class PatchError(ValueError):
+    """The patch is malformed or does not apply to the recipe."""
+
+
+PATCH_FORMAT = (
+    '{"ops": [...]} with 0-based indices into the original lists. Ops: '
+    '{"op": "replace_ingredient", "index": i, "name": str, "quantity": str}, '
+    '{"op": "remove_ingredient", "index": i}, '
+    '{"op": "add_ingredient", "name": str, "quantity": str}, '
+    '{"op": "replace_step", "index": i, "text": str}, '
+    '{"op": "remove_step", "index": i}, '
+    '{"op": "insert_step", "index": i, "text": str}, '
+    '{"op": "rename", "name": str}'
+)
+
+_LOCK = threading.Lock()
+_STATS = {"applied": 0, "rejected": 0}
+
+
+def _text(op: Dict[str, Any], field: str, required: bool = True) -> Optional[str]:
+    value = op.get(field)
+    if value is None and not required:
+        return None
+    if not isinstance(value, (str, int, float)) or not str(value).strip():
+        raise PatchError(f"{op.get('op')}: '{field}' must be a non-empty string")
+    return str(value).strip()
+
+
+def _index(op: Dict[str, Any], size: int, allow_end: bool = False) -> int:
+    i = op.get("index")
+    if isinstance(i, bool) or not isinstance(i, int):
+        raise PatchError(f"{op.get('op')}: 'index' must be an integer")
+    if not 0 <= i < size + (1 if allow_end else 0):
+        raise PatchError(f"{op.get('op')}: index {i} out of range")
+    return i
+
+
+def _claim(touched: set, key: tuple) -> None:
+    if key in touched:
+        raise PatchError(f"{key[0]} {key[1]} edited twice")
+    touched.add(key)
+
+
+def apply_patch(recipe: Dict[str, Any], patch: Any) -> Dict[str, Any]:
+    """Return a new normalized recipe with ``patch`` applied."""
+    base = normalize_recipe(recipe)
+    if not isinstance(patch, dict) or not isinstance(patch.get("ops"), list):
+        raise PatchError("patch must be an object with an 'ops' list")
+    ings, steps = base["ingredients"], base["steps"]
+    name = base["name"]
+
+    ing_edits: Dict[int, Optional[Dict[str, str]]] = {}  # None = removed
+    step_edits: Dict[int, Optional[str]] = {}
+    inserts: Dict[int, List[str]] = {}
+    added: List[Dict[str, str]] = []
+    touched: set = set()
+
+    for op in patch["ops"]:
+        kind = op.get("op") if isinstance(op, dict) else None
+        if kind == "rename":
+            name = _text(op, "name")
+        elif kind == "replace_ingredient":
+            i = _index(op, len(ings))
+            _claim(touched, ("ingredient", i))
+            qty = _text(op, "quantity", required=False)
+            ing_edits[i] = {"name": _text(op, "name"), "quantity": qty if qty is not None else ings[i]["quantity"]}
+        elif kind == "remove_ingredient":
+            i = _index(op, len(ings))
+            _claim(touched, ("ingredient", i))
+            ing_edits[i] = None
+        elif kind == "add_ingredient":
+            added.append({"name": _text(op, "name"), "quantity": _text(op, "quantity", required=False) or ""})
+        elif kind == "replace_step":
+            i = _index(op, len(steps))
+            _claim(touched, ("step", i))
+            step_edits[i] = _text(op, "text")
+        elif kind == "remove_step":
+            i = _index(op, len(steps))
+            _claim(touched, ("step", i))
+            step_edits[i] = None
+        elif kind == "insert_step":
+            inserts.setdefault(_index(op, len(steps), allow_end=True), []).append(_text(op, "text"))
+        else:
+            raise PatchError(f"unknown op {kind!r}")
+
+    new_ings = [ing_edits.get(i, ing) for i, ing in enumerate(ings)]
+    new_ings = [ing for ing in new_ings if ing is not None] + added
+    new_steps: List[str] = []
+    for i in range(len(steps) + 1):
+        new_steps.extend(inserts.get(i, ()))
+        if i < len(steps):
+            step = step_edits.get(i, steps[i])
+            if step is not None:
+                new_steps.append(step)
+    if not new_ings or not new_steps:
+        raise PatchError("patch leaves the recipe without ingredients or steps")
+    return {"name": name, "ingredients": new_ings, "steps": new_steps}
+
+
+def check_avoided(recipe: Dict[str, Any], avoid: Iterable[str], allowed: Iterable[str] = ()) -> None:
+    """Raise PatchError if an ingredient still names something in ``avoid``.
+
+    Terms match as in substitutions (:mod:`backend.term_matcher`: whole
+    words, plurals). ``allowed`` are requested replacements; they are
+    blanked out before matching so "oat milk" does not count as "milk".
+    """
+    allowed_matcher = get_matcher(a for a in allowed if a and a.strip())
+    avoid_matcher = get_matcher(t for t in avoid if t and t.strip())
+    for ing in recipe.get("ingredients", []):
+        found = avoid_matcher.find(allowed_matcher.strip(str(ing.get("name", ""))))
+        if found:
+            raise PatchError(f"patched recipe still contains {found[0]!r}")
+
+
+def record(applied: bool) -> None:
+    with _LOCK:
+        _STATS["applied" if applied else "rejected"] += 1
+
+
+def patch_stats() -> Dict[str, Any]:
+    with _LOCK:
+        total = _STATS["applied"] + _STATS["rejected"]
+        return {**_STATS, "apply_ratio": (_STATS["applied"] / total) if total else 0.0}
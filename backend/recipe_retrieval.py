@@ -2,41 +2,78 @@
 
 For development/offline mode, load from data/recipes.json.
 You can extend this to call Spoonacular/Edamam later.
+
+The catalogue is indexed once (see :mod:`backend.recipe_index`) and only
+rebuilt when the source file's mtime changes. Set ``RECIPES_INDEX_PATH`` to a
+compact catalogue built with ``python -m backend.recipe_index`` to serve
+large catalogues from a memory-mapped file instead of JSON.
 """
 
 import json
+import os
+import threading
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 
+from .recipe_index import RecipeIndex
 from .utils.logging_utils import get_logger
 
 
 logger = get_logger(__name__)
 
+_INDEX: Optional[RecipeIndex] = None
+_INDEX_KEY: Optional[Tuple[str, float]] = None
+_INDEX_LOCK = threading.Lock()
+
 
 def _data_path() -> Path:
     return Path(__file__).resolve().parent.parent / "data" / "recipes.json"
 
 
-def _load_all() -> Dict[str, Any]:
-    path = _data_path()
+def _source_path() -> Path:
+    compact = os.getenv("RECIPES_INDEX_PATH")
+    return Path(compact) if compact else _data_path()
+
+
+def _load_all(path: Optional[Path] = None) -> Dict[str, Any]:
+    path = path or _data_path()
     try:
         with path.open("r", encoding="utf-8") as f:
             data = json.load(f)
             return data
     except FileNotFoundError:
-        logger.warning("recipes.json not found; returning empty dataset")
+        logger.warning("%s not found; returning empty dataset", path)
         return {"recipes": []}
 
 
-def get_recipe_by_name(name: str) -> Optional[Dict[str, Any]]:
-    name_l = name.lower().strip()
-    data = _load_all()
-    for r in data.get("recipes", []):
-        if r.get("name", "").lower() == name_l:
-            return r
-        # simple contains match
-        if name_l in r.get("name", "").lower():
-            return r
-    return None
+def _build_index(path: Path) -> RecipeIndex:
+    if path.suffix == ".json":
+        return RecipeIndex.from_recipes(_load_all(path).get("recipes", []))
+    return RecipeIndex.from_compact(path)
+
 
+def get_index() -> RecipeIndex:
+    """Return the recipe index, rebuilding it if the source file changed."""
+    global _INDEX, _INDEX_KEY
+    path = _source_path()
+    try:
+        key = (str(path), path.stat().st_mtime)
+    except FileNotFoundError:
+        key = (str(path), -1.0)
+    if _INDEX is not None and key == _INDEX_KEY:
+        return _INDEX
+    with _INDEX_LOCK:
+        if _INDEX is None or key != _INDEX_KEY:
+            if key[1] < 0 and path.suffix != ".json":
+                logger.warning("%s not found; returning empty dataset", path)
+                _INDEX = RecipeIndex.from_recipes([])
+            else:
+                _INDEX = _build_index(path)
+            _INDEX_KEY = key
+            logger.info("indexed %d recipes from %s", len(_INDEX), path)
+    return _INDEX
+
+
+def get_recipe_by_name(name: str) -> Optional[Dict[str, Any]]:
+    """Exact (case-insensitive) name match, else first name containing ``name``."""
+    return get_index().get(name)
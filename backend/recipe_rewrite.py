@@ -0,0 +1,159 @@
+"""Local execution of the ``replace`` intent.
+
+Applies explicit ``(src, dst)`` replacements and known dislike substitutions
+straight to the normalized recipe (ingredient names and step text) with the
+substitution engine's matcher, so a simple "use oat milk instead of milk"
+needs no completion. The rewrite is refused, and the caller falls back to
+``modify_recipe``, when it would be a guess:
+
+- ``missing``: a replaced ingredient does not occur in the recipe
+- ``no_substitute``: no target was given and none is known locally
+- ``technique``: the swap crosses ingredient classes whose cooking differs
+  (meat or seafood to something else, eggs/flour/leaveners/thickeners)
+- ``ambiguous``: a replaced ingredient is part of a longer ingredient name
+  ("milk" in "coconut milk", "chicken" in "chicken breast"), so replacing
+  the word would invent an ingredient
+- ``duplicate``: the result would list the same ingredient twice
+
+``record`` and ``rewrite_stats`` track how often each path is taken and how
+long it took, so the latency saved is visible under ``/stats``.
+"""
+
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from . import substitution_engine as se
+from .ingredient_groups import INGREDIENT_GROUPS
+from .utils.logging_utils import get_logger
+from .utils.recipe_utils import normalize_recipe
+
+
+logger = get_logger(__name__)
+
+# swaps between these classes (or out of them) change how a dish is cooked
+_CATEGORIES: Dict[str, Tuple[str, ...]] = {
+    "meat": INGREDIENT_GROUPS["meat"],
+    "seafood": INGREDIENT_GROUPS["seafood"],
+    "egg": ("egg", "flax egg", "chia egg", "egg white", "egg yolk"),
+    "structure": ("flour", "yeast", "baking powder", "baking soda", "gelatin", "agar", "cornstarch"),
+}
+_CATEGORY_OF = {term: cat for cat, terms in _CATEGORIES.items() for term in terms}
+
+_LOCK = threading.Lock()
+_STATS: Dict[str, Any] = {"local": 0, "llm": 0, "local_seconds": 0.0, "llm_seconds": 0.0, "fallback_reasons": {}}
+
+
+def _norm(text: Any) -> str:
+    return " ".join(str(text or "").lower().split())
+
+
+def _category(term: str) -> Optional[str]:
+    found = se.get_matcher(_CATEGORY_OF).find(term)
+    # the last class word names the ingredient ("chicken egg" is an egg)
+    return _CATEGORY_OF[found[-1]] if found else None
+
+
+def warm_up() -> None:
+    """Compile the ingredient-class matcher ahead of the first rewrite."""
+    se.get_matcher(_CATEGORY_OF)
+
+
+def _changes_technique(src: str, dst: str) -> bool:
+    a, b = _category(src), _category(dst)
+    return a != b and (a is not None or b is not None)
+
+
+def _pick(subs: Optional[List[str]], disliked: "se.TermMatcher") -> Optional[str]:
+    for s in subs or ():
+        if not disliked.find(s):
+            return s
+    return None
+
+
+def _inside_longer_name(recipe: Dict[str, Any], pairs: Dict[str, str]) -> bool:
+    """True if a term to replace occurs in an ingredient name that is more than that term."""
+    matcher = se.get_matcher(pairs)
+    for ing in recipe.get("ingredients") or ():
+        name = _norm(ing.get("name"))
+        for term in matcher.find(name):
+            # the name is the term itself (up to plural) only if each matches the other
+            if not se.get_matcher([name]).find(term):
+                return True
+    return False
+
+
+def _plan(recipe: Dict[str, Any], replacements: Iterable[Dict[str, str]],
+          dislikes: Iterable[str]) -> Tuple[Optional[Dict[str, str]], str]:
+    """Map of term -> substitute to apply, or (None, reason)."""
+    disliked = se.get_matcher(dislikes)
+    texts = list(se.recipe_texts(recipe))
+    pairs: Dict[str, str] = {}
+    for r in replacements:
+        src = _norm(r.get("src"))
+        if not src:
+            continue
+        dst = " ".join(str(r.get("dst") or "").split()) or _pick(se.known_substitutes(src), disliked)
+        if not dst:
+            return None, "no_substitute"
+        pairs[src] = dst
+
+    present = {t for text in texts for t in se.get_matcher(pairs).find(text)}
+    if any(src not in present for src in pairs):
+        return None, "missing"
+
+    # session dislikes still in the recipe get their first acceptable local substitute
+    for term in {t for text in texts for t in disliked.find(text)}:
+        if term in pairs or any(se.get_matcher([term]).find(dst) for dst in pairs.values()):
+            continue
+        dst = _pick(se.known_substitutes(term), disliked)
+        if not dst:
+            return None, "no_substitute"
+        pairs[term] = dst
+
+    if _inside_longer_name(recipe, pairs):
+        return None, "ambiguous"
+    if any(_changes_technique(src, dst) for src, dst in pairs.items()):
+        return None, "technique"
+    return pairs, "local"
+
+
+def rewrite_recipe(recipe: Dict[str, Any], replacements: Iterable[Dict[str, str]],
+                   dislikes: Iterable[str]) -> Tuple[Optional[Dict[str, Any]], str]:
+    """Apply a replace intent locally.
+
+    Returns ``(recipe, "local")`` with a new normalized recipe, or
+    ``(None, reason)`` when the rewrite is ambiguous and needs the LLM.
+    """
+    base = normalize_recipe(recipe)
+    pairs, reason = _plan(base, replacements, dislikes)
+    if pairs is None:
+        return None, reason
+
+    rewrite = se.get_matcher(pairs).replacer(pairs.get)
+    for ing in base["ingredients"]:
+        ing["name"] = rewrite(ing["name"])
+    base["steps"] = [rewrite(step) for step in base["steps"]]
+
+    names = [_norm(ing["name"]) for ing in base["ingredients"]]
+    if len(set(names)) != len(names):
+        return None, "duplicate"
+    return base, "local"
+
+
+def record(path: str, seconds: float, reason: Optional[str] = None) -> None:
+    """Count one replace request served by ``path`` ("local" or "llm")."""
+    with _LOCK:
+        _STATS[path] += 1
+        _STATS[f"{path}_seconds"] += seconds
+        if reason and reason != "local":
+            reasons = _STATS["fallback_reasons"]
+            reasons[reason] = reasons.get(reason, 0) + 1
+
+
+def rewrite_stats() -> Dict[str, Any]:
+    with _LOCK:
+        out = {k: (dict(v) if isinstance(v, dict) else v) for k, v in _STATS.items()}
+    for path in ("local", "llm"):
+        n = out[path]
+        out[f"{path}_avg_ms"] = (out[f"{path}_seconds"] / n * 1000) if n else 0.0
+    return out
@@ -0,0 +1,294 @@
+"""Timeouts, retries, hedging and a circuit breaker for upstream LLM calls.
+
+:meth:`Resilience.call` runs one logical call made of one or more attempts:
+
+- each attempt has a per-helper deadline (``LLM_TIMEOUT_CHAT_JSON``,
+  ``LLM_TIMEOUT_ASK_LLM``, ``LLM_TIMEOUT_GENERATE_RECIPE``,
+  ``LLM_TIMEOUT_MODIFY_RECIPE``; seconds)
+- timeouts, connection errors, 429s and 5xx are retried up to
+  ``LLM_RETRIES`` times with full-jitter exponential backoff
+  (``LLM_RETRY_BASE`` seconds, capped at ``LLM_RETRY_MAX``)
+- hedged calls (intent parsing) send a second attempt once the first has run
+  longer than the helper's recent p95 (at least ``LLM_HEDGE_MIN_DELAY``) and
+  keep whichever answers first; ``LLM_HEDGE=0`` disables this
+
+The circuit breaker opens after ``LLM_BREAKER_FAILURES`` consecutive
+attempts that failed with a retryable error; other errors do not count. A
+call whose retries are exhausted raises :class:`Unavailable`; while the
+breaker is open, calls fail at once with :class:`CircuitOpen` and
+:func:`degraded` is true so requests are served from local fallbacks; after
+``LLM_BREAKER_RESET`` seconds one probe call is let through and its outcome
+closes or re-opens the breaker.
+"""
+
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from .utils.logging_utils import get_logger
+
+
+_BASE_TIMEOUT_TYPES: tuple = (asyncio.TimeoutError, TimeoutError)
+_ERROR_TYPES: Optional[Tuple[tuple, tuple]] = None
+
+
+logger = get_logger(__name__)
+
+DEFAULT_TIMEOUTS = {"chat_json": 10.0, "ask_llm": 20.0, "generate_recipe": 60.0, "modify_recipe": 60.0}
+
+_HEDGE_MIN_SAMPLES = 20
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _error_types() -> Tuple[tuple, tuple]:
+    """(timeout, retryable) exception types, with the SDK's typed errors once it is loaded.
+
+    The SDK is imported by :mod:`backend.llm_interface` when it builds a
+    client; until then no provider error can have been raised, so this
+    module does not import it.
+    """
+    global _ERROR_TYPES
+    if _ERROR_TYPES is not None:
+        return _ERROR_TYPES
+    openai = sys.modules.get("openai")
+    if openai is None or not hasattr(openai, "APITimeoutError"):
+        return _BASE_TIMEOUT_TYPES, ()
+    _ERROR_TYPES = (
+        _BASE_TIMEOUT_TYPES + (openai.APITimeoutError,),
+        (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError),
+    )
+    return _ERROR_TYPES
+
+
+class Unavailable(Exception):
+    """The LLM provider could not answer: every attempt timed out or failed transiently."""
+
+
+class CircuitOpen(Unavailable):
+    """The LLM provider is considered unhealthy; the call was not attempted."""
+
+
+def retryable(exc: BaseException) -> bool:
+    """True for failures worth another attempt (timeouts, connection errors, 408/409/429/5xx)."""
+    timeouts, transient = _error_types()
+    if isinstance(exc, timeouts + transient + (ConnectionError,)):
+        return True
+    status = getattr(exc, "status_code", None)
+    return isinstance(status, int) and (status in (408, 409, 429) or status >= 500)
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open -> half_open (one probe) -> closed."""
+
+    def __init__(self, failures: int = 5, reset_after: float = 30.0):
+        self.failures = failures
+        self.reset_after = reset_after
+        self.state = "closed"
+        self._consecutive = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self._counters = {"opened": 0, "rejected": 0}
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_after:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            self._counters["rejected"] += 1
+            return False
+
+    def is_open(self) -> bool:
+        """True while calls would be rejected (no probe is due yet)."""
+        with self._lock:
+            if self.state == "open":
+                return time.monotonic() - self._opened_at < self.reset_after
+            return self.state == "half_open" and self._probing
+
+    def record(self, ok: bool) -> None:
+        with self._lock:
+            self._probing = False
+            if ok:
+                self._consecutive = 0
+                self.state = "closed"
+                return
+            self._consecutive += 1
+            if self.state == "half_open" or self._consecutive >= self.failures:
+                if self.state != "open":
+                    self._counters["opened"] += 1
+                    logger.warning("LLM circuit breaker opened after %d failed attempts", self._consecutive)
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """End an attempt that says nothing about provider health (shed or cancelled)."""
+        with self._lock:
+            self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self._consecutive, **self._counters}
+
+
+class Resilience:
+    def __init__(self, breaker: CircuitBreaker, retries: int = 2, base_delay: float = 0.25, max_delay: float = 4.0,
+                 hedge: bool = True, hedge_min_delay: float = 0.3, hedge_quantile: float = 0.95):
+        self.breaker = breaker
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_quantile = hedge_quantile
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._counters = {"calls": 0, "retries": 0, "timeouts": 0, "failures": 0, "hedged": 0, "hedge_wins": 0,
+                          "short_circuited": 0, "fallback_replies": 0}
+
+    def timeout(self, helper: str) -> float:
+        return _env_number(f"LLM_TIMEOUT_{helper.upper()}", DEFAULT_TIMEOUTS.get(helper, 60.0))
+
+    def hedge_delay(self, helper: str) -> Optional[float]:
+        """Seconds before a hedge is sent, or None while there is too little history."""
+        samples = self._latencies.get(helper)
+        if not samples or len(samples) < _HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        return max(self.hedge_min_delay, ordered[int(self.hedge_quantile * (len(ordered) - 1))])
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    async def _timed(self, helper: str, attempt: Callable[[float], Awaitable[Any]]) -> Any:
+        start = time.perf_counter()
+        try:
+            result = await attempt(self.timeout(helper))
+        except Exception as e:
+            if isinstance(e, _error_types()[0]):
+                self._counters["timeouts"] += 1
+            raise
+        self._latencies.setdefault(helper, deque(maxlen=200)).append(time.perf_counter() - start)
+        return result
+
+    async def _hedged(self, helper: str, attempt: Callable[[float], Awaitable[Any]]) -> Any:
+        delay = self.hedge_delay(helper)
+        if delay is None:
+            return await self._timed(helper, attempt)
+        first = asyncio.ensure_future(self._timed(helper, attempt))
+        second: Optional[asyncio.Future] = None
+        try:
+            done, _ = await asyncio.wait({first}, timeout=delay)
+            if done:
+                return first.result()
+            self._counters["hedged"] += 1
+            second = asyncio.ensure_future(self._timed(helper, attempt))
+            pending = {first, second}
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self._counters["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error  # both attempts failed
+        finally:
+            for task in (first, second):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    async def call(self, helper: str, attempt: Callable[[float], Awaitable[Any]], hedge: bool = False,
+                   passthrough: tuple = ()) -> Any:
+        """Run ``attempt`` with deadline, retries and (optionally) a hedge.
+
+        ``attempt(timeout)`` makes one upstream request and must give up
+        after ``timeout`` seconds of waiting on the provider. Exceptions in
+        ``passthrough`` (e.g. admission shedding) are raised unchanged and do
+        not count against the provider.
+        """
+        self._counters["calls"] += 1
+        for n in range(self.retries + 1):
+            if not self.breaker.allow():
+                self._counters["short_circuited"] += 1
+                raise CircuitOpen("LLM circuit breaker is open")
+            try:
+                if hedge and self.hedge:
+                    result = await self._hedged(helper, attempt)
+                else:
+                    result = await self._timed(helper, attempt)
+            except passthrough:
+                self.breaker.release()
+                raise
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except Exception as e:
+                if not retryable(e):
+                    # a rejected request (bad model, 400, parse error) says nothing about provider health
+                    self.breaker.release()
+                    self._counters["failures"] += 1
+                    raise
+                self.breaker.record(False)
+                if n == self.retries:
+                    self._counters["failures"] += 1
+                    raise Unavailable(f"{helper} failed after {n + 1} attempts: {e}") from e
+                self._counters["retries"] += 1
+                await asyncio.sleep(self._backoff(n))
+                continue
+            self.breaker.record(True)
+            return result
+
+    def record_fallback(self) -> None:
+        """Count a reply served from local fallbacks instead of the LLM."""
+        self._counters["fallback_replies"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {**self._counters, "breaker": self.breaker.stats()}
+        for helper in self._latencies:
+            delay = self.hedge_delay(helper)
+            if delay is not None:
+                out[f"hedge_delay_{helper}"] = delay
+        return out
+
+
+_RESILIENCE: Optional[Resilience] = None
+
+
+def get_resilience() -> Resilience:
+    """Process-wide resilience policy, configured from env on first use."""
+    global _RESILIENCE
+    if _RESILIENCE is None:
+        _RESILIENCE = Resilience(
+            CircuitBreaker(failures=max(1, int(_env_number("LLM_BREAKER_FAILURES", 5))),
+                           reset_after=_env_number("LLM_BREAKER_RESET", 30)),
+            retries=max(0, int(_env_number("LLM_RETRIES", 2))),
+            base_delay=_env_number("LLM_RETRY_BASE", 0.25),
+            max_delay=_env_number("LLM_RETRY_MAX", 4.0),
+            hedge=os.getenv("LLM_HEDGE", "1").lower() not in ("0", "false", "no"),
+            hedge_min_delay=_env_number("LLM_HEDGE_MIN_DELAY", 0.3),
+        )
+    return _RESILIENCE
+
+
+def degraded() -> bool:
+    """True while the breaker is open and requests should use local fallbacks."""
+    return get_resilience().breaker.is_open()
+
+
+def resilience_stats() -> Dict[str, Any]:
+    return get_resilience().stats()
@@ -0,0 +1,233 @@
+"""Saved-recipe queries on an ``AsyncSession`` (see :mod:`backend.database`).
+
+- :func:`list_page` pages a user's recipes newest first with keyset
+  pagination on ``(saved_at, recipe_id)`` (index
+  ``ix_saved_recipes_user_saved``): each page is one index range scan
+  however deep it is, unlike ``OFFSET``. Pages are :data:`SUMMARY_COLUMNS`
+  projections (title, counts, first step); ``recipe_data`` stays in the
+  database until :func:`get_recipe` asks for it.
+- :func:`save_many` inserts any number of recipes in one ``INSERT ...
+  RETURNING`` round trip, plus one insert of their ingredient terms.
+- ``include`` / ``exclude`` ingredient filters ("with chicken, no dairy")
+  are answered from ``saved_recipe_ingredients`` (one row per recipe and
+  term, written with the recipe): includes are a range scan of
+  ``ix_saved_recipe_ingredients_user_term``, excludes a primary-key probe
+  per candidate recipe. ``recipe_data`` is never scanned.
+
+Terms are the ingredient names' word runs (lowercased, trailing plural
+``s`` dropped), so "cheese" matches "ricotta cheese" and "ground beef"
+matches "lean ground beef". A filter naming a group in
+:data:`~backend.ingredient_groups.INGREDIENT_GROUPS` ("dairy", "meat", ...) matches any of its
+ingredients; matching is by word, so "dairy" also excludes "oat milk".
+
+Cursors are opaque strings; clients pass back ``next_cursor`` unchanged.
+"""
+
+import base64
+import re
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import Integer, Select, and_, delete, exists, func, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+from .ingredient_groups import INGREDIENT_GROUPS
+from .models import SavedRecipe, SavedRecipeIngredient
+
+
+MAX_PAGE_SIZE = 100
+
+
+# longest word run stored per ingredient name
+_MAX_TERM_WORDS = 4
+
+_WORD_RE = re.compile(r"[a-z0-9]+(?:['-][a-z0-9]+)*")
+
+
+class json_array_length(FunctionElement):
+    """Length of the JSON array under ``key`` of a JSON(B) column (0 if missing)."""
+
+    type = Integer()
+    inherit_cache = True
+
+    def __init__(self, column: Any, key: str):
+        self.key = key
+        super().__init__(column)
+
+
+@compiles(json_array_length)
+def _json_array_length(element, compiler, **kw):
+    return "coalesce(json_array_length(%s, '$.%s'), 0)" % (compiler.process(element.clauses, **kw), element.key)
+
+
+@compiles(json_array_length, "postgresql")
+def _jsonb_array_length(element, compiler, **kw):
+    return "coalesce(jsonb_array_length(%s -> '%s'), 0)" % (compiler.process(element.clauses, **kw), element.key)
+
+
+SUMMARY_COLUMNS = (
+    SavedRecipe.recipe_id,
+    SavedRecipe.recipe_title,
+    SavedRecipe.saved_at,
+    json_array_length(SavedRecipe.recipe_data, "ingredients").label("ingredient_count"),
+    json_array_length(SavedRecipe.recipe_data, "steps").label("step_count"),
+    SavedRecipe.recipe_data[("steps", 0)].as_string().label("first_step"),
+)
+
+
+class InvalidCursor(ValueError):
+    """A pagination cursor that was not produced by :func:`encode_cursor`."""
+
+
+def encode_cursor(saved_at: datetime, recipe_id: int) -> str:
+    raw = f"{saved_at.isoformat()}|{recipe_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        saved_at, recipe_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(saved_at), int(recipe_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(f"invalid cursor: {cursor!r}") from e
+
+
+def _words(text: Any) -> List[str]:
+    words = _WORD_RE.findall(str(text or "").lower())
+    # "mushrooms" and "mushroom" are the same term
+    return [w[:-1] if w.endswith("s") and not w.endswith("ss") and len(w) > 3 else w for w in words]
+
+
+def ingredient_terms(recipe: Dict[str, Any]) -> Set[str]:
+    """Search terms of a recipe: every run of up to four words of each ingredient name."""
+    terms: Set[str] = set()
+    for ingredient in recipe.get("ingredients") or ():
+        words = _words(ingredient.get("name") if isinstance(ingredient, dict) else ingredient)
+        for i in range(len(words)):
+            for j in range(i + 1, min(len(words), i + _MAX_TERM_WORDS) + 1):
+                terms.add(" ".join(words[i:j])[:255])
+    return terms
+
+
+def _query_terms(name: str) -> List[str]:
+    group = INGREDIENT_GROUPS.get(" ".join(name.lower().split()), (name,))
+    return [t for t in (" ".join(_words(g)) for g in group) if t]
+
+
+def _ingredient_filters(user_id: uuid.UUID, include: Iterable[str], exclude: Iterable[str]) -> List[Any]:
+    ing = SavedRecipeIngredient
+    # each include must match (any term of a group); no exclude may match
+    clauses: List[Any] = [
+        SavedRecipe.recipe_id.in_(select(ing.recipe_id).where(ing.user_id == user_id, ing.term.in_(_query_terms(n))))
+        for n in include
+    ]
+    excluded = [t for n in exclude for t in _query_terms(n)]
+    if excluded:
+        clauses.append(~exists().where(ing.recipe_id == SavedRecipe.recipe_id, ing.term.in_(excluded)))
+    return clauses
+
+
+def _summary(row) -> Dict[str, Any]:
+    return {
+        "recipe_id": row.recipe_id,
+        "name": row.recipe_title,
+        "saved_at": row.saved_at,
+        "ingredient_count": row.ingredient_count,
+        "step_count": row.step_count,
+        "first_step": row.first_step,
+    }
+
+
+def page_query(user_id: uuid.UUID, limit: int, cursor: Optional[str] = None,
+               include: Iterable[str] = (), exclude: Iterable[str] = ()) -> Select:
+    """Statement selecting up to ``limit`` summaries after ``cursor`` (for :func:`list_page` and EXPLAIN)."""
+    stmt = select(*SUMMARY_COLUMNS).where(SavedRecipe.user_id == user_id,
+                                          *_ingredient_filters(user_id, include, exclude))
+    if cursor:
+        saved_at, recipe_id = decode_cursor(cursor)
+        # (saved_at, recipe_id) < cursor, spelled out; the redundant saved_at <= bound
+        # gives every planner an index range to start from instead of filtering the OR
+        stmt = stmt.where(SavedRecipe.saved_at <= saved_at, or_(
+            SavedRecipe.saved_at < saved_at,
+            and_(SavedRecipe.saved_at == saved_at, SavedRecipe.recipe_id < recipe_id),
+        ))
+    return stmt.order_by(SavedRecipe.saved_at.desc(), SavedRecipe.recipe_id.desc()).limit(limit)
+
+
+async def list_page(session: AsyncSession, user_id: uuid.UUID, limit: int = 20, cursor: Optional[str] = None,
+                    include: Iterable[str] = (), exclude: Iterable[str] = ()
+                    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """One page of ``user_id``'s recipe summaries, newest first, and the cursor of the next page.
+
+    Only recipes with every ``include`` ingredient and none of the
+    ``exclude`` ones are listed; pass the same filters with the cursor.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    rows = (await session.execute(page_query(user_id, limit + 1, cursor, include, exclude))).all()
+    items = [_summary(r) for r in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last.saved_at, last.recipe_id)
+    return items, next_cursor
+
+
+async def get_recipe(session: AsyncSession, user_id: uuid.UUID, recipe_id: int) -> Optional[Dict[str, Any]]:
+    """Full saved recipe (``recipe_data`` plus id and timestamp), or None."""
+    stmt = select(SavedRecipe.recipe_id, SavedRecipe.saved_at, SavedRecipe.recipe_data).where(
+        SavedRecipe.user_id == user_id, SavedRecipe.recipe_id == recipe_id
+    )
+    row = (await session.execute(stmt)).first()
+    if row is None:
+        return None
+    return {**row.recipe_data, "recipe_id": row.recipe_id, "saved_at": row.saved_at}
+
+
+async def save_many(session: AsyncSession, user_id: uuid.UUID,
+                    recipes: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Insert ``recipes`` and their ingredient terms; returns the summaries in input order.
+
+    Recipes saved together share ``saved_at``; later ones in the list sort
+    first (higher ``recipe_id``). The caller commits.
+    """
+    recipes = list(recipes)
+    now = datetime.now(timezone.utc)
+    rows = [
+        {"user_id": user_id, "recipe_title": (r.get("name") or "Untitled recipe")[:255], "recipe_data": r,
+         "saved_at": now}
+        for r in recipes
+    ]
+    if not rows:
+        return []
+    stmt = insert(SavedRecipe).returning(*SUMMARY_COLUMNS, sort_by_parameter_order=True)
+    summaries = [_summary(r) for r in (await session.execute(stmt, rows)).all()]
+    terms = [
+        {"recipe_id": summary["recipe_id"], "user_id": user_id, "term": term}
+        for summary, recipe in zip(summaries, recipes) for term in ingredient_terms(recipe)
+    ]
+    if terms:
+        await session.execute(insert(SavedRecipeIngredient), terms)
+    return summaries
+
+
+async def delete_recipe(session: AsyncSession, user_id: uuid.UUID, recipe_id: int) -> bool:
+    """Delete one saved recipe and its terms; False if ``user_id`` has no such recipe. The caller commits."""
+    # explicit rather than relying on ON DELETE CASCADE (off by default on SQLite)
+    await session.execute(delete(SavedRecipeIngredient).where(
+        SavedRecipeIngredient.user_id == user_id, SavedRecipeIngredient.recipe_id == recipe_id
+    ))
+    result = await session.execute(
+        delete(SavedRecipe).where(SavedRecipe.user_id == user_id, SavedRecipe.recipe_id == recipe_id)
+    )
+    return result.rowcount > 0
+
+
+async def count(session: AsyncSession, user_id: uuid.UUID) -> int:
+    """Number of recipes ``user_id`` has saved."""
+    return (await session.execute(
+        select(func.count()).select_from(SavedRecipe).where(SavedRecipe.user_id == user_id)
+    )).scalar_one()
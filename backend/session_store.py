@@ -0,0 +1,255 @@
+"""Session storage backends for :mod:`backend.context_manager`.
+
+- :class:`MemorySessionStore` keeps sessions in-process with LRU eviction,
+  a session-count cap, an approximate byte budget and idle expiry.
+- :class:`SQLiteSessionStore` persists sessions in a SQLite file so several
+  uvicorn workers on one host share them (WAL mode; one row per session).
+
+Both expose ``load``/``save``/``delete``/``stats``. ``load`` returns a
+:class:`SessionState`; callers mutate it and hand it back to ``save``.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, FrozenSet, Optional
+
+from .utils.recipe_utils import freeze_recipe
+
+
+# rough per-message/per-session bookkeeping overhead in bytes
+_MESSAGE_OVERHEAD = 120
+_SESSION_OVERHEAD = 400
+
+MAX_MESSAGES = 50
+
+
+class SessionState:
+    """Compact per-session state.
+
+    current_recipe: frozen recipe snapshot (shared with readers, never copied)
+    dislikes: frozenset, replaced on write so readers can keep a reference
+    profile_dislikes: frozenset of the user's profile terms (see ``backend.user_profiles``)
+    profile_version: user and profile version ``profile_dislikes`` were loaded for ("" = not loaded)
+    messages: ring buffer of the last ``MAX_MESSAGES`` {role, content} dicts
+    turns: total messages ever appended (absolute index of the next one)
+    summary: rolling summary of turns before absolute index ``summary_upto``
+    """
+
+    __slots__ = ("current_recipe", "recipe_bytes", "dislikes", "profile_dislikes", "profile_version", "messages",
+                 "turns", "summary", "summary_upto")
+
+    def __init__(self, current_recipe: Optional[Dict[str, Any]] = None,
+                 dislikes: FrozenSet[str] = frozenset(), messages=(), turns: Optional[int] = None,
+                 summary: str = "", summary_upto: int = 0, profile_dislikes: FrozenSet[str] = frozenset(),
+                 profile_version: str = ""):
+        self.current_recipe = None
+        self.recipe_bytes = 0
+        self.dislikes: FrozenSet[str] = frozenset(dislikes)
+        self.profile_dislikes: FrozenSet[str] = frozenset(profile_dislikes)
+        self.profile_version = profile_version
+        self.messages: Deque[Dict[str, str]] = deque(messages, maxlen=MAX_MESSAGES)
+        self.turns = len(self.messages) if turns is None else turns
+        self.summary = summary
+        self.summary_upto = summary_upto
+        if current_recipe:
+            self.set_recipe(current_recipe)
+
+    def set_recipe(self, recipe: Optional[Dict[str, Any]]) -> None:
+        self.current_recipe = freeze_recipe(recipe) if recipe else None
+        self.recipe_bytes = _text_bytes(recipe) if recipe else 0
+
+
+def _text_bytes(value: Any) -> int:
+    """Approximate size of a JSON-like value without serializing it."""
+    if isinstance(value, str):
+        return len(value) + 50
+    if isinstance(value, dict):
+        return 64 + sum(len(k) + _text_bytes(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return 56 + sum(_text_bytes(v) for v in value)
+    return 32
+
+
+def estimate_bytes(session: SessionState) -> int:
+    """Cheap approximation of a session's memory footprint."""
+    size = _SESSION_OVERHEAD + session.recipe_bytes
+    for m in session.messages:
+        size += _MESSAGE_OVERHEAD + len(m.get("content", ""))
+    size += sum(len(d) + 50 for d in session.dislikes) + sum(len(d) + 50 for d in session.profile_dislikes)
+    return size + len(session.summary) + len(session.profile_version)
+
+
+class SessionStore:
+    """Interface shared by the session backends."""
+
+    def load(self, session_id: str) -> Optional[SessionState]:
+        raise NotImplementedError
+
+    def save(self, session_id: str, session: SessionState) -> None:
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class MemorySessionStore(SessionStore):
+    """In-process LRU + TTL store.
+
+    max_sessions: cap on live sessions (least recently used evicted first)
+    max_bytes: cap on the summed :func:`estimate_bytes` of live sessions
+    ttl: seconds of inactivity after which a session expires (0 disables)
+    """
+
+    def __init__(self, max_sessions: int = 10000, max_bytes: int = 256 * 1024 * 1024, ttl: float = 3600.0):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # session_id -> (session, last_access, size); ordered oldest access first
+        self._data: "OrderedDict[str, tuple[SessionState, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evicted_lru": 0, "evicted_bytes": 0, "expired": 0}
+
+    def _expired(self, last_access: float, now: float) -> bool:
+        return bool(self.ttl) and now - last_access > self.ttl
+
+    def _drop(self, session_id: str, reason: str) -> None:
+        _, _, size = self._data.pop(session_id)
+        self._bytes -= size
+        self._counters[reason] += 1
+
+    def _sweep(self, now: float) -> None:
+        # entries are ordered by last access, so expired ones sit at the front
+        while self._data:
+            sid, (_, last, _) = next(iter(self._data.items()))
+            if not self._expired(last, now):
+                break
+            self._drop(sid, "expired")
+
+    def load(self, session_id: str) -> Optional[SessionState]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(session_id)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            session, last, size = entry
+            if self._expired(last, now):
+                self._drop(session_id, "expired")
+                self._counters["misses"] += 1
+                return None
+            self._data[session_id] = (session, now, size)
+            self._data.move_to_end(session_id)
+            self._counters["hits"] += 1
+            return session
+
+    def save(self, session_id: str, session: SessionState) -> None:
+        now = time.monotonic()
+        size = estimate_bytes(session)
+        with self._lock:
+            old = self._data.pop(session_id, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._data[session_id] = (session, now, size)
+            self._bytes += size
+            self._sweep(now)
+            while len(self._data) > self.max_sessions:
+                self._drop(next(iter(self._data)), "evicted_lru")
+            while self._bytes > self.max_bytes and len(self._data) > 1:
+                self._drop(next(iter(self._data)), "evicted_bytes")
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            old = self._data.pop(session_id, None)
+            if old is not None:
+                self._bytes -= old[2]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"backend": "memory", "sessions": len(self._data), "bytes": self._bytes, **self._counters}
+
+
+def _dump(session: SessionState) -> str:
+    return json.dumps({
+        "current_recipe": session.current_recipe,
+        "dislikes": sorted(session.dislikes),
+        "profile_dislikes": sorted(session.profile_dislikes),
+        "profile_version": session.profile_version,
+        "messages": list(session.messages),
+        "turns": session.turns,
+        "summary": session.summary,
+        "summary_upto": session.summary_upto,
+    }, ensure_ascii=False)
+
+
+def _load(raw: str) -> SessionState:
+    data = json.loads(raw)
+    return SessionState(data.get("current_recipe"), frozenset(data.get("dislikes", [])), data.get("messages", []),
+                        data.get("turns"), data.get("summary", ""), data.get("summary_upto", 0),
+                        frozenset(data.get("profile_dislikes", [])), data.get("profile_version", ""))
+
+
+class SQLiteSessionStore(SessionStore):
+    """SQLite-backed store shared by worker processes on one host.
+
+    Expired rows (idle longer than ``ttl`` seconds) are ignored on read and
+    purged every ``purge_every`` writes.
+    """
+
+    def __init__(self, path: str = "sessions.db", ttl: float = 3600.0, purge_every: int = 500):
+        self.path = path
+        self.ttl = ttl
+        self.purge_every = purge_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "expired": 0}
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, data TEXT NOT NULL, updated REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_sessions_updated ON sessions (updated)")
+
+    def load(self, session_id: str) -> Optional[SessionState]:
+        with self._lock:
+            row = self._conn.execute("SELECT data, updated FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+            if self.ttl and time.time() - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+                self._counters["expired"] += 1
+                self._counters["misses"] += 1
+                return None
+            self._counters["hits"] += 1
+        return _load(row[0])
+
+    def save(self, session_id: str, session: SessionState) -> None:
+        raw = _dump(session)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sessions (id, data, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET data = excluded.data, updated = excluded.updated",
+                (session_id, raw, now),
+            )
+            self._writes += 1
+            if self.ttl and self._writes % self.purge_every == 0:
+                cur = self._conn.execute("DELETE FROM sessions WHERE updated < ?", (now - self.ttl,))
+                self._counters["expired"] += cur.rowcount
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()
+            return {"backend": "sqlite", "sessions": count, **self._counters}
@@ -0,0 +1,51 @@
+"""Single-flight coalescing of identical in-flight async calls.
+
+When several coroutines ask for the same key at once, only the first starts
+the work; the others await the same task and receive the same result (or
+exception). The work runs as its own task, so a caller that is cancelled
+(e.g. client disconnect) does not cancel it for the rest; only when every
+waiter has been cancelled is the work itself cancelled.
+
+Usage:
+    flight = SingleFlight()
+    result = await flight.do(key, lambda: expensive_call(...))
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self._counters = {"leaders": 0, "deduplicated": 0, "abandoned": 0}
+
+    def _done(self, key: str) -> None:
+        self._inflight.pop(key, None)
+        self._waiters.pop(key, None)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            self._counters["leaders"] += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t, k=key: self._done(k))
+        else:
+            self._counters["deduplicated"] += 1
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self._inflight.get(key) is task and self._waiters.get(key) == 1:
+                # nobody is left waiting: stop the upstream call
+                self._counters["abandoned"] += 1
+                task.cancel()
+            raise
+        finally:
+            if self._inflight.get(key) is task and key in self._waiters:
+                self._waiters[key] -= 1
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._counters, "in_flight": len(self._inflight)}
@@ -0,0 +1,162 @@
+"""Speculative execution of LLM work ahead of intent parsing.
+
+While the LLM parses an ambiguous message that still looks like a recipe
+request, ``/ask`` starts generating the guessed recipe at the same time.
+If the parsed intent agrees the result is taken (a hit, saving one
+sequential round trip); otherwise it is discarded and, if still running,
+cancelled.
+
+Speculation is bounded by a budget:
+
+- ``SPECULATION_MAX_INFLIGHT``: concurrent speculative tasks (0 disables)
+- ``SPECULATION_TOKEN_BUDGET``: tokens that discarded speculations may burn
+  per rolling minute; speculation pauses once it is spent (0 = unlimited).
+  A speculation cancelled in flight is charged its estimated prompt and
+  the output received so far.
+
+:func:`speculation_stats` reports hit rate, wasted tokens and time saved.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from . import llm_interface as llm
+
+
+_WINDOW = 60.0
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _norm(text: Any) -> str:
+    return " ".join(str(text or "").lower().split())
+
+
+class Speculation:
+    """One speculative task keyed by what it guessed (e.g. a recipe name)."""
+
+    def __init__(self, owner: "Speculator", guess: str, fn: Callable[[], Awaitable[Any]]):
+        self._owner = owner
+        self.guess = _norm(guess)
+        self.usage: Dict[str, int] = {}
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+        self._settled = False
+
+        async def run() -> Any:
+            llm.track_usage(self.usage)
+            return await fn()
+
+        self.task = asyncio.ensure_future(run())
+        self.task.add_done_callback(self._on_done)
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        self.finished = time.monotonic()
+        if not task.cancelled():
+            task.exception()  # mark retrieved; errors surface through take()
+
+    def matches(self, actual: Any) -> bool:
+        return bool(actual) and _norm(actual) == self.guess
+
+    async def take(self) -> Any:
+        """Use the speculative result (the parsed intent agreed)."""
+        self._owner._settle(self, hit=True)
+        return await self.task
+
+    def discard(self) -> None:
+        """Drop the speculation; cancel it if it is still running."""
+        self._owner._settle(self, hit=False)
+
+
+class Speculator:
+    def __init__(self, max_inflight: int = 4, token_budget: int = 20000):
+        self.max_inflight = max_inflight
+        self.token_budget = token_budget
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._waste: Deque[Tuple[float, int]] = deque()
+        self._counters: Dict[str, float] = {
+            "started": 0, "hits": 0, "misses": 0, "cancelled": 0,
+            "skipped_inflight": 0, "skipped_budget": 0,
+            "wasted_tokens": 0, "saved_seconds": 0.0,
+        }
+
+    def _wasted_recently(self, now: float) -> int:
+        while self._waste and now - self._waste[0][0] > _WINDOW:
+            self._waste.popleft()
+        return sum(t for _, t in self._waste)
+
+    def start(self, guess: Optional[str], fn: Callable[[], Awaitable[Any]]) -> Optional[Speculation]:
+        """Start ``fn`` speculatively, or return None if over budget."""
+        if not guess:
+            return None
+        with self._lock:
+            if self._inflight >= self.max_inflight:
+                self._counters["skipped_inflight"] += 1
+                return None
+            if self.token_budget and self._wasted_recently(time.monotonic()) >= self.token_budget:
+                self._counters["skipped_budget"] += 1
+                return None
+            self._inflight += 1
+            self._counters["started"] += 1
+        return Speculation(self, guess, fn)
+
+    def _settle(self, spec: Speculation, hit: bool) -> None:
+        if spec._settled:
+            return
+        spec._settled = True
+        now = time.monotonic()
+        with self._lock:
+            self._inflight -= 1
+            if hit:
+                self._counters["hits"] += 1
+                # the generation overlapped intent parsing up to now
+                self._counters["saved_seconds"] += (spec.finished or now) - spec.started
+                return
+            self._counters["misses"] += 1
+            # a guess cancelled in flight has been billed for what it sent and received so far
+            wasted = sum(spec.usage.get(k, 0) for k in ("prompt_tokens", "completion_tokens",
+                                                        "pending_prompt_tokens", "pending_completion_tokens"))
+            self._counters["wasted_tokens"] += wasted
+            self._waste.append((now, wasted))
+            if not spec.task.done():
+                self._counters["cancelled"] += 1
+        if not spec.task.done():
+            spec.task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            settled = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "in_flight": self._inflight,
+                "hit_rate": (self._counters["hits"] / settled) if settled else 0.0,
+                "wasted_tokens_last_minute": self._wasted_recently(time.monotonic()),
+            }
+
+
+_SPECULATOR: Optional[Speculator] = None
+
+
+def get_speculator() -> Speculator:
+    """Process-wide speculator, configured from env on first use."""
+    global _SPECULATOR
+    if _SPECULATOR is None:
+        _SPECULATOR = Speculator(
+            max_inflight=int(_env_number("SPECULATION_MAX_INFLIGHT", 4)),
+            token_budget=int(_env_number("SPECULATION_TOKEN_BUDGET", 20000)),
+        )
+    return _SPECULATOR
+
+
+def speculation_stats() -> Dict[str, Any]:
+    return get_speculator().stats()
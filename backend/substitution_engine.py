@@ -1,12 +1,41 @@
 """Ingredient substitution engine.
 
 Provides common swaps and helpers to apply substitutions to a recipe.
-Falls back to LLM (mocked) if a substitution is unknown.
+Falls back to the LLM if a substitution is unknown.
+
+Matching uses :class:`~backend.term_matcher.TermMatcher`: one compiled,
+case-insensitive alternation per term set (cached), so a recipe is
+rewritten in a single regex pass per string however many dislikes there
+are.
+
+Unknown ingredients are resolved in batches: every unknown ingredient of a
+request goes into one JSON completion. Answers are memoized (LRU + TTL) and
+structured model answers are persisted to a local JSON table of learned
+substitutions, so an ingredient reaches the model at most once. The table is
+a plain ``{"ingredient": ["substitute", ...]}`` file and can be extended by
+hand. A failed batch (provider unavailable, unusable reply) is not memoized:
+its ingredients get a generic hint and are asked for again next time.
+
+Configuration (env):
+    SUBSTITUTIONS_LEARNED_PATH  learned table (default data/learned_substitutions.json)
+    SUBSTITUTE_MEMO_SIZE        max memoized lookups (0 disables the memo)
+    SUBSTITUTE_MEMO_TTL         memo entry lifetime in seconds (0 = no expiry)
 """
 
-from typing import Dict, List, Set, Any
+import asyncio
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Any
 from copy import deepcopy
-from .llm_interface import ask_llm
+from .llm_cache import ResponseCache
+from .term_matcher import TermMatcher, _norm_term, get_matcher
+from .llm_interface import chat_json, chat_json_async, has_llm
+from .utils.logging_utils import get_logger
+
+
+logger = get_logger(__name__)
 
 
 SUBSTITUTIONS: Dict[str, List[str]] = {
@@ -22,48 +51,323 @@ SUBSTITUTIONS: Dict[str, List[str]] = {
 }
 
 
-def suggest_substitutes(ingredient: str) -> List[str]:
-    key = ingredient.lower().strip()
+_TABLE_KEYS: Optional[FrozenSet[str]] = None
+_TABLE_MATCHER: Optional[TermMatcher] = None
+
+
+def _table_matcher() -> TermMatcher:
+    # rebuilt only when keys are added to or removed from SUBSTITUTIONS
+    global _TABLE_KEYS, _TABLE_MATCHER
+    keys = frozenset(SUBSTITUTIONS)
+    if keys != _TABLE_KEYS:
+        _TABLE_MATCHER = TermMatcher(keys)
+        _TABLE_KEYS = keys
+    return _TABLE_MATCHER
+
+
+def _lookup_static(key: str) -> Optional[List[str]]:
     # direct match
     if key in SUBSTITUTIONS:
         return SUBSTITUTIONS[key]
-    # contains match (e.g., "button mushrooms")
-    for k, subs in SUBSTITUTIONS.items():
-        if k in key:
-            return subs
-    # fallback to mocked LLM
-    resp = ask_llm(f"Suggest simple home-friendly substitutes for {ingredient}.")
-    return [resp.get("text", "Try a similar vegetable or plant-based alternative.")]
+    # contains match on whole words ("button mushrooms", not "eggplant" for
+    # "egg" or "buttermilk" for "butter"); the longest table key wins
+    found = _table_matcher().find(key)
+    return SUBSTITUTIONS[max(found, key=len)] if found else None
 
 
-def apply_substitutions(recipe: Dict[str, Any], dislikes: Set[str]) -> Dict[str, Any]:
-    """Return a new recipe with disliked ingredients substituted where possible."""
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _learned_path() -> Path:
+    default = Path(__file__).resolve().parent.parent / "data" / "learned_substitutions.json"
+    return Path(os.getenv("SUBSTITUTIONS_LEARNED_PATH") or default)
+
+
+_LEARNED: Optional[Dict[str, List[str]]] = None
+_LEARNED_LOCK = threading.Lock()
+_MEMO: Optional[ResponseCache] = None
+_STATS = {"llm_batches": 0, "llm_ingredients": 0, "llm_failures": 0, "learned": 0}
+
+
+def _learned() -> Dict[str, List[str]]:
+    global _LEARNED
+    if _LEARNED is None:
+        with _LEARNED_LOCK:
+            if _LEARNED is None:
+                table: Dict[str, List[str]] = {}
+                try:
+                    with _learned_path().open("r", encoding="utf-8") as f:
+                        raw = json.load(f)
+                    table = {_norm_term(k): [str(x) for x in v] for k, v in raw.items() if isinstance(v, list) and v}
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    logger.warning(f"Ignoring unreadable learned substitutions: {e}")
+                _LEARNED = table
+    return _LEARNED
+
+
+def _learn(found: Dict[str, List[str]]) -> None:
+    """Add model answers to the learned table and persist it."""
+    if not found:
+        return
+    table = _learned()
+    with _LEARNED_LOCK:
+        table.update(found)
+        _STATS["learned"] += len(found)
+        path = _learned_path()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(path.suffix + ".tmp")
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump(table, f, ensure_ascii=False, indent=2, sort_keys=True)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Could not persist learned substitutions: {e}")
+
+
+def _memo() -> ResponseCache:
+    global _MEMO
+    if _MEMO is None:
+        _MEMO = ResponseCache(
+            max_entries=int(_env_number("SUBSTITUTE_MEMO_SIZE", 2048)),
+            ttl=_env_number("SUBSTITUTE_MEMO_TTL", 3600),
+        )
+    return _MEMO
+
+
+def _known(key: str) -> Optional[List[str]]:
+    """Substitutes available without the model: static, learned or memoized."""
+    subs = _lookup_static(key)
+    if subs is None:
+        subs = _learned().get(key)
+    if subs is None:
+        memo = _memo().get(key)
+        subs = list(memo) if memo is not None else None
+    return subs
+
+
+def known_substitutes(ingredient: str) -> Optional[List[str]]:
+    """Substitutes for ``ingredient`` from local tables only (never the LLM)."""
+    key = _norm_term(ingredient)
+    return _known(key) if key else None
+
+
+def warm_up() -> None:
+    """Compile the table matcher and load the learned table ahead of the first request (blocking)."""
+    _table_matcher()
+    _learned()
+    _memo()
+    get_matcher(SUBSTITUTIONS)
+
+
+def substitution_stats() -> Dict[str, Any]:
+    return {"learned_entries": len(_learned()), "memo": _memo().stats(), **_STATS}
+
+
+_LLM_DEFAULT = "Try a similar vegetable or plant-based alternative."
+
+
+def _batch_messages(keys: List[str]) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": "You suggest ingredient substitutes for home cooks. Reply with JSON only."},
+        {"role": "user", "content": (
+            "For each ingredient below suggest up to 3 simple home-friendly substitutes.\n"
+            'Reply as {"substitutes": {"<ingredient>": ["substitute", ...]}} using the ingredient names as given.\n'
+            f"Ingredients: {json.dumps(keys, ensure_ascii=False)}"
+        )},
+    ]
+
+
+def _batch_tokens(keys: List[str]) -> int:
+    return min(1500, 60 + 40 * len(keys))
+
+
+def _parse_batch(data: Dict[str, Any], keys: List[str]) -> Optional[Dict[str, List[str]]]:
+    """Answers per key; None when the call failed or the reply has no ``substitutes`` object."""
+    subs = data.get("substitutes") if isinstance(data, dict) else None
+    if not isinstance(subs, dict):
+        return None
+    wanted = set(keys)
+    found = {}
+    for k, v in subs.items():
+        k = _norm_term(str(k))
+        if k in wanted and isinstance(v, list):
+            clean = [str(x).strip() for x in v if isinstance(x, str) and x.strip()][:3]
+            if clean:
+                found[k] = clean
+    return found
+
+
+def _unknown(keys: Iterable[str], out: Dict[str, List[str]]) -> List[str]:
+    unknown = []
+    for k in keys:
+        subs = _known(k)
+        if subs is None:
+            unknown.append(k)
+        else:
+            out[k] = subs
+    return unknown
+
+
+def _finish_batch(unknown: List[str], found: Optional[Dict[str, List[str]]], out: Dict[str, List[str]]) -> None:
+    """Memoize model answers and fill the rest with the generic hint.
+
+    Keys the model left out are memoized with the hint (asking again would
+    not help); after a failed call (``found`` is None) nothing is memoized.
+    """
+    for k in unknown:
+        if found is not None and k in found:
+            out[k] = found[k]
+            _memo().put(k, found[k])
+        else:
+            out[k] = [_LLM_DEFAULT]
+            if found is not None:
+                _memo().put(k, out[k])
+
+
+def _keys(ingredients: Iterable[str]) -> List[str]:
+    return list(dict.fromkeys(k for k in (_norm_term(i) for i in ingredients) if k))
+
+
+def resolve_substitutes(ingredients: Iterable[str]) -> Dict[str, List[str]]:
+    """Substitutes for each ingredient (keyed by normalized name).
+
+    Known ingredients never reach the model; all unknown ones are resolved
+    with a single JSON completion. Ingredients the model does not answer
+    fall back to a generic hint, which is memoized but not learned; when
+    the call fails or no LLM is configured the hint is not memoized.
+    """
+    out: Dict[str, List[str]] = {}
+    unknown = _unknown(_keys(ingredients), out)
+    if not unknown:
+        return out
+    found: Optional[Dict[str, List[str]]] = None
+    if has_llm():
+        _STATS["llm_batches"] += 1
+        _STATS["llm_ingredients"] += len(unknown)
+        data = chat_json(_batch_messages(unknown), max_tokens=_batch_tokens(unknown), task="substitute")
+        found = _parse_batch(data, unknown)
+        if found is None:
+            _STATS["llm_failures"] += 1
+        _learn(found or {})
+    _finish_batch(unknown, found, out)
+    return out
+
+
+async def resolve_substitutes_async(ingredients: Iterable[str]) -> Dict[str, List[str]]:
+    """Async variant of :func:`resolve_substitutes`."""
+    out: Dict[str, List[str]] = {}
+    unknown = _unknown(_keys(ingredients), out)
+    if not unknown:
+        return out
+    found: Optional[Dict[str, List[str]]] = None
+    if has_llm():
+        _STATS["llm_batches"] += 1
+        _STATS["llm_ingredients"] += len(unknown)
+        data = await chat_json_async(_batch_messages(unknown), max_tokens=_batch_tokens(unknown),
+                                     task="substitute")
+        found = _parse_batch(data, unknown)
+        if found is None:
+            _STATS["llm_failures"] += 1
+        if found:
+            # the table file is rewritten on every learn; keep that off the event loop
+            await asyncio.to_thread(_learn, found)
+    _finish_batch(unknown, found, out)
+    return out
+
+
+def suggest_substitutes(ingredient: str) -> List[str]:
+    key = _norm_term(ingredient)
+    if not key:
+        return [_LLM_DEFAULT]
+    return resolve_substitutes([key])[key]
+
+
+async def suggest_substitutes_async(ingredient: str) -> List[str]:
+    """Async variant of :func:`suggest_substitutes` (non-blocking LLM fallback)."""
+    key = _norm_term(ingredient)
+    if not key:
+        return [_LLM_DEFAULT]
+    return (await resolve_substitutes_async([key]))[key]
+
+
+def recipe_texts(recipe: Dict[str, Any]) -> Iterator[str]:
+    """Ingredient names and step texts of a recipe, in order."""
+    for ing in recipe.get("ingredients", []):
+        if isinstance(ing, dict) and isinstance(ing.get("name"), str):
+            yield ing["name"]
+    for step in recipe.get("steps", []):
+        if isinstance(step, str):
+            yield step
+
+
+def _occurring_unknown(recipe: Dict[str, Any], matcher: "TermMatcher") -> List[str]:
+    """Dislikes with no local substitute that actually occur in the recipe."""
+    unknown = {t for t in matcher.terms() if _known(t) is None}
+    if not unknown:
+        return []  # common case: no extra pass over the recipe
+    return sorted({t for text in recipe_texts(recipe) for t in matcher.find(text) if t in unknown})
+
+
+def _rewrite(recipe: Dict[str, Any], matcher: "TermMatcher", resolved: Dict[str, List[str]]) -> Dict[str, Any]:
     new_recipe = deepcopy(recipe)
-    dislike_list = sorted({d.lower() for d in dislikes})
-    if not dislike_list:
-        return new_recipe
+
+    # each dislike is resolved once, and only if it actually occurs
+    chosen: Dict[str, Optional[str]] = {}
+
+    def replacement(term: str) -> Optional[str]:
+        if term not in chosen:
+            subs = resolved.get(term) or _known(term)
+            # choose the first suggested substitute
+            chosen[term] = subs[0] if subs else None
+        return chosen[term]
+
+    rewrite = matcher.replacer(replacement)
 
     # Replace ingredients
     for ing in new_recipe.get("ingredients", []):
-        name = ing.get("name", "").lower()
-        for d in dislike_list:
-            if d and d in name:
-                subs = suggest_substitutes(d)
-                if subs:
-                    # choose the first suggested substitute
-                    ing["name"] = ing["name"].replace(d, subs[0])
+        if isinstance(ing, dict) and isinstance(ing.get("name"), str):
+            ing["name"] = rewrite(ing["name"])
 
     # Best-effort update in steps
-    updated_steps = []
-    for step in new_recipe.get("steps", []):
-        s_lower = step.lower()
-        for d in dislike_list:
-            if d in s_lower:
-                subs = suggest_substitutes(d)
-                if subs:
-                    step = step.replace(d, subs[0])
-        updated_steps.append(step)
-    new_recipe["steps"] = updated_steps
+    new_recipe["steps"] = [
+        rewrite(step) if isinstance(step, str) else step
+        for step in new_recipe.get("steps", [])
+    ]
 
     return new_recipe
 
+
+def apply_substitutions(recipe: Dict[str, Any], dislikes: Set[str]) -> Dict[str, Any]:
+    """Return a new recipe with disliked ingredients substituted where possible.
+
+    Unknown dislikes occurring in the recipe are resolved together in one
+    batched lookup before rewriting.
+    """
+    matcher = get_matcher(dislikes)
+    if not matcher:
+        return deepcopy(recipe)
+    unknown = _occurring_unknown(recipe, matcher)
+    return _rewrite(recipe, matcher, resolve_substitutes(unknown) if unknown else {})
+
+
+def apply_known_substitutions(recipe: Dict[str, Any], dislikes: Set[str]) -> Dict[str, Any]:
+    """Like :func:`apply_substitutions` with local tables only; dislikes without a known substitute stay."""
+    matcher = get_matcher(dislikes)
+    if not matcher:
+        return deepcopy(recipe)
+    return _rewrite(recipe, matcher, {})
+
+
+async def apply_substitutions_async(recipe: Dict[str, Any], dislikes: Set[str]) -> Dict[str, Any]:
+    """Async variant of :func:`apply_substitutions`."""
+    matcher = get_matcher(dislikes)
+    if not matcher:
+        return deepcopy(recipe)
+    unknown = _occurring_unknown(recipe, matcher)
+    return _rewrite(recipe, matcher, await resolve_substitutes_async(unknown) if unknown else {})
@@ -0,0 +1,179 @@
+"""Whole-word ingredient term matching shared by substitutions, rewrites and patches.
+
+:class:`TermMatcher` compiles a set of terms into one case-insensitive
+alternation (factored into a prefix trie) that matches whole words with an
+optional plural suffix; :func:`get_matcher` caches one per term set.
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional
+
+
+def _norm_term(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _stem(term: str) -> str:
+    # "mushrooms" and "mushroom" match the same words
+    return term[:-1] if term.endswith("s") and not term.endswith("ss") and len(term) > 3 else term
+
+
+def _match_case(src: str, repl: str) -> str:
+    if src.isupper() and len(src) > 1:
+        return repl.upper()
+    if src[:1].isupper():
+        return repl[:1].upper() + repl[1:]
+    return repl
+
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """Regex alternation of ``terms`` factored into a prefix trie.
+
+    ``re`` tries alternatives one by one, so a flat ``a|b|c`` costs one
+    attempt per term at every position; sharing prefixes keeps each attempt
+    to roughly one branch per character.
+    """
+    trie: Dict[str, Any] = {}
+    for term in terms:
+        node = trie
+        for token in re.findall(r"\S|\s+", term):
+            node = node.setdefault(" " if token.isspace() else token, {})
+        node[""] = {}  # end of term
+
+    def build(node: Dict[str, Any]) -> str:
+        end = "" in node
+        branches = [(r"\s+" if ch == " " else re.escape(ch)) + build(child)
+                    for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if end:
+            # longest match first: the optional group is greedy
+            return "(?:" + body + ")?" if len(branches) > 1 or len(body) > 1 else body + "?"
+        return body
+
+    return build(trie)
+
+
+class TermMatcher:
+    """Finds and replaces a set of ingredient terms in one pass.
+
+    Terms match whole words, case-insensitively, with any run of whitespace
+    between words and an optional plural suffix ("egg" matches "Eggs" but not
+    "eggplant"). Longer terms win over terms they contain.
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        self._terms: Dict[str, str] = {}  # stem -> term as given
+        for t in terms:
+            t = _norm_term(t)
+            if t:
+                self._terms.setdefault(_stem(t), t)
+        self._re = None
+        self._re_ci = None
+        if self._terms:
+            # matched against lower-cased text without a leading boundary
+            # assertion, so ``re`` can skip ahead on the terms' first letters;
+            # the left word boundary is checked per match instead
+            body = _trie_pattern(self._terms)
+            self._re = re.compile(rf"(?P<term>{body})(?P<plural>e?s)?(?!\w)")
+            self._re_ci = re.compile(self._re.pattern, re.IGNORECASE)
+
+    def __bool__(self) -> bool:
+        return self._re is not None
+
+    def terms(self) -> List[str]:
+        return list(self._terms.values())
+
+    def _matches(self, text: str) -> Iterator["re.Match"]:
+        low = text.lower()
+        if len(low) == len(text):
+            found = self._re.finditer(low)
+        else:  # lower() changed offsets (rare Unicode); match the original
+            low, found = text, self._re_ci.finditer(text)
+        for m in found:
+            start = m.start()
+            if start:
+                c = low[start - 1]
+                if c.isalnum() or c == "_":
+                    continue
+            yield m
+
+    def _term(self, m: "re.Match") -> str:
+        return self._terms[_norm_term(m.group("term"))]
+
+    def find(self, text: str) -> List[str]:
+        """Terms occurring in ``text``, in order of appearance."""
+        if self._re is None or not text:
+            return []
+        return [self._term(m) for m in self._matches(text)]
+
+    def replacer(self, replacement: Callable[[str], Optional[str]]) -> Callable[[str], str]:
+        """Return ``text -> text`` replacing every term with ``replacement(term)``.
+
+        ``replacement`` returning None leaves that occurrence untouched. The
+        case of the matched text (lower, Capitalized, UPPER) is carried over,
+        and a plural suffix is kept unless the replacement already ends in "s".
+        Results are memoized per matched surface form, so ``replacement`` runs
+        once per distinct spelling however many strings are rewritten.
+        """
+        if self._re is None:
+            return lambda text: text
+        seen: Dict[str, str] = {}
+
+        def rewrite(text: str) -> str:
+            if not text:
+                return text
+            parts: List[str] = []
+            last = 0
+            for m in self._matches(text):
+                start, end = m.span()
+                src = text[start:end]
+                out = seen.get(src)
+                if out is None:
+                    out = replacement(self._term(m))
+                    if out is None:
+                        out = src
+                    else:
+                        plural = m.group("plural") or ""
+                        if plural and not out.endswith("s"):
+                            out += plural
+                        out = _match_case(src, out)
+                    seen[src] = out
+                parts.append(text[last:start])
+                parts.append(out)
+                last = end
+            if not parts:
+                return text
+            parts.append(text[last:])
+            return "".join(parts)
+
+        return rewrite
+
+    def strip(self, text: str) -> str:
+        """``text`` with every term occurrence (plural included) blanked out."""
+        if self._re is None or not text:
+            return text
+        parts: List[str] = []
+        last = 0
+        for m in self._matches(text):
+            parts.append(text[last:m.start()])
+            parts.append(" ")
+            last = m.end()
+        parts.append(text[last:])
+        return "".join(parts)
+
+    def sub(self, text: str, replacement: Callable[[str], Optional[str]]) -> str:
+        """Replace every term occurrence in ``text`` (see :meth:`replacer`)."""
+        return self.replacer(replacement)(text)
+
+
+@lru_cache(maxsize=256)
+def _cached_matcher(terms: FrozenSet[str]) -> TermMatcher:
+    return TermMatcher(terms)
+
+
+def get_matcher(terms: Iterable[str]) -> TermMatcher:
+    """Compiled matcher for ``terms``, built once per distinct term set."""
+    return _cached_matcher(frozenset(_norm_term(t) for t in terms if t))
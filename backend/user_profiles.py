@@ -0,0 +1,209 @@
+"""Profile constraints (allergies, diets, dislikes) for the /ask hot path.
+
+A user's ``user_profiles`` row is turned into a set of dislike terms and
+merged into the session's dislikes (see
+:func:`backend.context_manager.set_profile_dislikes`), so generation and
+edits honour it from the first turn without the user repeating it.
+
+- Per session: :func:`session_dislikes` loads the terms on a session's
+  first turn and tags them with :func:`profile_version`; later turns of
+  that session reuse them without a lookup until the version changes or
+  the session expires.
+- Read-through: :func:`get_dislikes` serves terms from a per-user LRU/TTL
+  cache; a miss loads the row once (concurrent misses share one query).
+- Write-through: :func:`update_profile` writes the row, replaces the
+  cached terms and bumps the version, so the next turn of every session
+  of that user picks up the change without another query.
+
+Diets and groups are expanded to ingredients: "vegetarian" becomes the
+meat and seafood groups, "dairy" (or "dairy-free") the dairy group; other
+entries are kept as given. With several worker processes, versions are
+per process: another worker's sessions keep their terms until they
+expire, and its new sessions see the write once the cached entry expires
+(``PROFILE_CACHE_TTL``).
+
+Configuration (env):
+    PROFILE_CACHE_SIZE  max cached users (0 disables the cache)
+    PROFILE_CACHE_TTL   entry lifetime in seconds (0 = no expiry)
+"""
+
+import os
+import uuid
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple
+
+from .ingredient_groups import INGREDIENT_GROUPS
+from .llm_cache import ResponseCache
+from .singleflight import SingleFlight
+from .utils.logging_utils import get_logger
+
+
+logger = get_logger(__name__)
+
+PROFILE_FIELDS = ("allergies", "dietary_restrictions", "disliked_ingredients")
+
+# diet -> ingredient groups (see ingredient_groups.INGREDIENT_GROUPS) or single ingredients
+_DIETS: Dict[str, Tuple[str, ...]] = {
+    "vegetarian": ("meat", "seafood"),
+    "pescatarian": ("meat",),
+    "vegan": ("meat", "seafood", "dairy", "egg", "honey"),
+}
+
+_FLIGHT = SingleFlight()
+_STATS = {"session_hits": 0, "loads": 0, "writes": 0, "errors": 0}
+# bumped on every write so a load that started earlier does not cache stale terms
+_GENERATION: Dict[str, int] = {}
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+_CACHE: Optional[ResponseCache] = None
+
+
+def _cache() -> ResponseCache:
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = ResponseCache(
+            max_entries=int(_env_number("PROFILE_CACHE_SIZE", 10000)),
+            ttl=_env_number("PROFILE_CACHE_TTL", 300),
+        )
+    return _CACHE
+
+
+def _norm(text: Any) -> str:
+    return " ".join(str(text or "").lower().split())
+
+
+def profile_terms(allergies: Iterable[str] = (), dietary_restrictions: Iterable[str] = (),
+                  disliked_ingredients: Iterable[str] = ()) -> FrozenSet[str]:
+    """Dislike terms for a profile, with diets and ingredient groups expanded."""
+    terms = set()
+    for entry in (*(allergies or ()), *(dietary_restrictions or ()), *(disliked_ingredients or ())):
+        term = _norm(entry)
+        for suffix in ("-free", " free"):
+            term = term[:-len(suffix)] if term.endswith(suffix) else term
+        if not term:
+            continue
+        for part in _DIETS.get(term, (term,)):
+            group = INGREDIENT_GROUPS.get(part)
+            if group:
+                terms.update(group)
+            else:
+                terms.add(part)
+    return frozenset(terms)
+
+
+async def _load(user_id: uuid.UUID) -> FrozenSet[str]:
+    from sqlalchemy import select
+
+    from .database import async_session
+    from .models import UserProfile
+
+    async with async_session() as session:
+        row = (await session.execute(
+            select(*(getattr(UserProfile, f) for f in PROFILE_FIELDS)).where(UserProfile.user_id == user_id)
+        )).first()
+    _STATS["loads"] += 1
+    return profile_terms(*row) if row is not None else frozenset()
+
+
+def profile_version(user_id: uuid.UUID) -> str:
+    """Identifies the user's current profile terms in this process; changes on every write."""
+    key = str(user_id)
+    return f"{key}:{_GENERATION.get(key, 0)}"
+
+
+async def _terms(user_id: uuid.UUID) -> Optional[FrozenSet[str]]:
+    """The user's terms from the cache or the database; None if loading failed."""
+    key = str(user_id)
+    cached = _cache().get(key)
+    if cached is not None:
+        return frozenset(cached)
+    generation = _GENERATION.get(key, 0)
+    try:
+        terms = await _FLIGHT.do(key, lambda: _load(user_id))
+    except ValueError:  # DATABASE_URL is not set: no profiles to merge
+        terms = frozenset()
+    except Exception as e:
+        _STATS["errors"] += 1
+        logger.warning("could not load profile of %s: %s", user_id, e)
+        return None
+    if _GENERATION.get(key, 0) == generation:
+        _cache().put(key, sorted(terms))
+    return terms
+
+
+async def get_dislikes(user_id: Optional[uuid.UUID]) -> FrozenSet[str]:
+    """The user's profile dislike terms (empty without a user, profile or database)."""
+    if user_id is None:
+        return frozenset()
+    return await _terms(user_id) or frozenset()
+
+
+async def session_dislikes(user_id: uuid.UUID, held: str) -> Optional[Tuple[FrozenSet[str], str]]:
+    """New (terms, version) for a session holding terms of version ``held``, or None if they are current.
+
+    A failed load returns empty terms with version "" so the next turn retries.
+    """
+    version = profile_version(user_id)
+    if held == version:
+        _STATS["session_hits"] += 1
+        return None
+    terms = await _terms(user_id)
+    if terms is None:
+        return frozenset(), ""
+    return terms, version
+
+
+async def update_profile(session: Any, user_id: uuid.UUID, fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Create or update the user's profile, commit, and refresh the cached terms."""
+    from sqlalchemy import select
+
+    from .models import UserProfile
+
+    profile = (await session.execute(select(UserProfile).where(UserProfile.user_id == user_id))).scalar_one_or_none()
+    if profile is None:
+        profile = UserProfile(user_id=user_id)
+        session.add(profile)
+    for name, value in fields.items():
+        setattr(profile, name, value)
+    await session.commit()
+    key = str(user_id)
+    _GENERATION[key] = _GENERATION.get(key, 0) + 1
+    _cache().put(key, sorted(profile_terms(*(getattr(profile, f) for f in PROFILE_FIELDS))))
+    _STATS["writes"] += 1
+    return profile_dict(profile)
+
+
+async def get_profile(session: Any, user_id: uuid.UUID) -> Optional[Dict[str, Any]]:
+    """The stored profile as a dict, or None."""
+    from sqlalchemy import select
+
+    from .models import UserProfile
+
+    profile = (await session.execute(select(UserProfile).where(UserProfile.user_id == user_id))).scalar_one_or_none()
+    return profile_dict(profile) if profile is not None else None
+
+
+def profile_dict(profile: Any) -> Dict[str, Any]:
+    return {
+        **{f: list(getattr(profile, f) or []) for f in PROFILE_FIELDS},
+        "skill_level": profile.skill_level,
+    }
+
+
+def profile_stats() -> Dict[str, Any]:
+    """Turns served from the session's terms, cache hits/misses, database loads, profile writes and load errors."""
+    cache = _cache().stats()
+    return {
+        "entries": cache["entries"],
+        "hits": cache["hits"],
+        "misses": cache["misses"],
+        "hit_ratio": cache["hit_ratio"],
+        **_STATS,
+        "coalesced": _FLIGHT.stats()["deduplicated"],
+    }
@@ -0,0 +1,42 @@
+"""Load a ``.env`` file into the environment once per process.
+
+Usage:
+    from backend.utils.env import load_env
+    load_env()
+
+Looks for ``.env`` in the current directory and then from the package
+directory upwards (where ``python-dotenv``'s ``load_dotenv()`` would find
+it). ``python-dotenv`` is only imported when such a file exists, so
+deployments that configure the process through real environment
+variables do not pay for it. Variables already set are not overridden.
+"""
+
+from pathlib import Path
+from typing import Optional
+
+_LOADED = False
+
+
+def find_env_file() -> Optional[Path]:
+    candidates = [Path.cwd() / ".env"]
+    here = Path(__file__).resolve().parent
+    candidates += [d / ".env" for d in (here, *here.parents)]
+    for path in candidates:
+        if path.is_file():
+            return path
+    return None
+
+
+def load_env() -> None:
+    global _LOADED
+    if _LOADED:
+        return
+    _LOADED = True
+    path = find_env_file()
+    if path is None:
+        return
+    try:
+        from dotenv import load_dotenv
+    except ImportError:  # pragma: no cover - package not installed
+        return
+    load_dotenv(path, override=False)
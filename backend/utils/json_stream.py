@@ -0,0 +1,310 @@
+"""Incremental JSON parsing for streamed model output.
+
+``IncrementalJSONParser`` consumes text chunks as they arrive and reports
+every value the moment it is complete, together with its path from the root
+(e.g. ``("steps", 2)``). Containers are attached to their parent as soon as
+they open, so the partially built document is always available.
+
+Text before the first ``{``/``[`` (markdown fences, chatter) and after the
+root value closes is ignored. Trailing commas are accepted. With
+``strict=False`` a syntax error stops parsing at that point instead of
+raising, and :meth:`IncrementalJSONParser.close` recovers truncated output
+(``max_tokens`` cut-offs) by dropping the unfinished scalar and closing every
+open container, so everything completed so far is kept.
+
+:func:`loads_lenient` applies this to a complete string; it tries
+``json.loads`` first and only runs the incremental parser when that fails.
+
+``RecipeStreamParser`` maps those callbacks onto recipe events:
+    ("name", {"name": str})
+    ("ingredient", {"index": int, "name": str, "quantity": str})
+    ("step", {"index": int, "text": str})
+"""
+
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+Path = Tuple[Any, ...]
+
+_WS = " \t\r\n"
+_LITERAL_CHARS = set("0123456789+-.eEtruefalsn")
+
+
+class _Frame:
+    __slots__ = ("container", "key", "state")
+
+    def __init__(self, container):
+        self.container = container
+        self.key = None
+        # obj: key | colon | value | comma ; arr: value | comma
+        self.state = "key" if isinstance(container, dict) else "value"
+
+
+class IncrementalJSONParser:
+    """Push parser: call :meth:`feed` with chunks, then :meth:`close`.
+
+    on_value(path, value) is called for every completed value, innermost
+    first (an ingredient's fields before the ingredient itself).
+    strict: raise ValueError on syntax errors (otherwise stop and recover)
+    """
+
+    def __init__(self, on_value: Optional[Callable[[Path, Any], None]] = None, strict: bool = True):
+        self._on_value = on_value
+        self._strict = strict
+        self._error: Optional[str] = None
+        self._truncated = False
+        self._stack: List[_Frame] = []
+        self._root: Any = None
+        self._started = False
+        self._done = False
+        self._str: Optional[List[str]] = None  # raw source of the open string
+        self._str_escape = False
+        self._lit: Optional[List[str]] = None  # open number/true/false/null
+
+    @property
+    def done(self) -> bool:
+        """True once the root value has been closed."""
+        return self._done
+
+    @property
+    def root(self) -> Any:
+        """The (possibly still incomplete) root value."""
+        return self._root
+
+    @property
+    def error(self) -> Optional[str]:
+        """First syntax error seen in non-strict mode, if any."""
+        return self._error
+
+    def _path(self) -> Path:
+        out = []
+        for f in self._stack:
+            out.append(f.key if isinstance(f.container, dict) else len(f.container) - 1)
+        return tuple(out)
+
+    def _notify(self, value: Any) -> None:
+        if self._on_value is not None:
+            self._on_value(self._path(), value)
+
+    def _attach(self, value: Any) -> None:
+        """Place a new value in its parent (or make it the root)."""
+        if not self._stack:
+            self._root = value
+            return
+        top = self._stack[-1]
+        if isinstance(top.container, dict):
+            top.container[top.key] = value
+        else:
+            top.container.append(value)
+
+    def _after_value(self) -> None:
+        if self._stack:
+            self._stack[-1].state = "comma"
+        else:
+            self._done = True
+
+    def _scalar(self, value: Any) -> None:
+        self._attach(value)
+        self._notify(value)
+        self._after_value()
+
+    def _open(self, container) -> None:
+        self._attach(container)
+        self._stack.append(_Frame(container))
+
+    def _close(self) -> None:
+        value = self._stack.pop().container
+        self._notify(value)
+        self._after_value()
+
+    def _end_string(self) -> None:
+        text = json.loads('"' + "".join(self._str) + '"')
+        self._str = None
+        top = self._stack[-1] if self._stack else None
+        if top is not None and isinstance(top.container, dict) and top.state == "key":
+            top.key = text
+            top.state = "colon"
+        else:
+            self._scalar(text)
+
+    def _end_literal(self) -> None:
+        raw = "".join(self._lit)
+        self._lit = None
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            raise ValueError(f"invalid literal {raw!r}") from None
+        self._scalar(value)
+
+    def feed(self, chunk: str) -> None:
+        if self._error is not None or self._done:
+            return
+        try:
+            self._feed(chunk)
+        except ValueError as e:
+            if self._strict:
+                raise
+            # stop at the first error; close() keeps what was completed
+            self._error = str(e)
+            self._str = self._lit = None
+
+    def _feed(self, chunk: str) -> None:
+        i, n = 0, len(chunk)
+        while i < n and not self._done:
+            if self._str is not None:
+                # bulk-consume string content up to the next quote or backslash
+                j = i
+                while j < n:
+                    c = chunk[j]
+                    if self._str_escape:
+                        self._str_escape = False
+                    elif c == "\\":
+                        self._str_escape = True
+                    elif c == '"':
+                        break
+                    j += 1
+                self._str.append(chunk[i:j])
+                if j < n:
+                    self._end_string()
+                    j += 1
+                i = j
+                continue
+
+            c = chunk[i]
+            if self._lit is not None:
+                if c in _LITERAL_CHARS:
+                    self._lit.append(c)
+                    i += 1
+                    continue
+                self._end_literal()
+                continue
+
+            if not self._started:
+                if c in "{[":
+                    self._started = True
+                else:
+                    i += 1
+                    continue
+
+            i += 1
+            if c in _WS:
+                continue
+            top = self._stack[-1] if self._stack else None
+            state = top.state if top is not None else "value"
+            if state == "colon":
+                if c != ":":
+                    raise ValueError(f"expected ':' got {c!r}")
+                top.state = "value"
+            elif state == "comma":
+                if c == ",":
+                    top.state = "key" if isinstance(top.container, dict) else "value"
+                elif c in "}]":
+                    self._close()
+                else:
+                    raise ValueError(f"expected ',' got {c!r}")
+            elif state == "key":
+                if c == '"':
+                    self._str, self._str_escape = [], False
+                elif c == "}":  # empty object or trailing comma
+                    self._close()
+                else:
+                    raise ValueError(f"expected object key got {c!r}")
+            else:  # expecting a value
+                if c == "{":
+                    self._open({})
+                elif c == "[":
+                    self._open([])
+                elif c == '"':
+                    self._str, self._str_escape = [], False
+                elif c == "]" and top is not None and isinstance(top.container, list):
+                    self._close()  # empty array or trailing comma
+                elif c in _LITERAL_CHARS:
+                    self._lit = [c]
+                else:
+                    raise ValueError(f"unexpected {c!r}")
+
+    def close(self) -> Any:
+        """Finish parsing and return the root value.
+
+        Strict parsers raise ValueError if the document is incomplete.
+        Otherwise the unfinished string or literal is dropped (a cut-off
+        value is not trusted; a cut-off key has no value yet) and open
+        containers are closed innermost first, notifying ``on_value`` for
+        each as if the closing bracket had arrived.
+        """
+        if self._done:
+            return self._root
+        if self._strict:
+            raise ValueError("incomplete JSON document")
+        self._str = self._lit = None
+        self._truncated = True
+        while self._stack:
+            self._close()
+        return self._root
+
+    @property
+    def complete(self) -> bool:
+        """True if the root closed normally (no truncation or syntax error)."""
+        return self._done and self._error is None and not self._truncated
+
+
+def loads_lenient(text: str) -> Tuple[Any, bool]:
+    """Parse model output, recovering truncated or garbled JSON.
+
+    Returns ``(value, complete)``; ``value`` is None if no JSON container
+    was found, ``complete`` is False when recovery was needed.
+    """
+    try:
+        return json.loads(text), True
+    except ValueError:
+        pass
+    parser = IncrementalJSONParser(strict=False)
+    parser.feed(text)
+    value = parser.close()
+    return value, parser.complete and value is not None
+
+
+class RecipeStreamParser:
+    """Turns a streamed recipe JSON completion into incremental events.
+
+    Parsing is lenient: syntax errors and truncation never raise, and
+    :meth:`close` returns whatever recipe could be recovered.
+    """
+
+    def __init__(self):
+        self._events: List[Tuple[str, Dict[str, Any]]] = []
+        self._parser = IncrementalJSONParser(self._on_value, strict=False)
+
+    def _on_value(self, path: Path, value: Any) -> None:
+        if path == ("name",) and isinstance(value, str):
+            self._events.append(("name", {"name": value}))
+        elif len(path) == 2 and path[0] == "ingredients":
+            if isinstance(value, dict):
+                name = value.get("name") or value.get("ingredient") or value.get("item")
+                qty = value.get("quantity") or value.get("qty") or ""
+            elif isinstance(value, str):
+                name, qty = value, ""
+            else:
+                return
+            if name:
+                self._events.append(("ingredient", {"index": path[1], "name": str(name), "quantity": str(qty)}))
+        elif len(path) == 2 and path[0] == "steps" and isinstance(value, str):
+            self._events.append(("step", {"index": path[1], "text": value}))
+
+    def feed(self, chunk: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """Consume a chunk and return the events it completed."""
+        self._parser.feed(chunk)
+        events, self._events = self._events, []
+        return events
+
+    def result(self) -> Optional[Dict[str, Any]]:
+        """The parsed recipe once the document is complete, else None."""
+        root = self._parser.root
+        return root if self._parser.complete and isinstance(root, dict) else None
+
+    def close(self) -> Tuple[Optional[Dict[str, Any]], List[Tuple[str, Dict[str, Any]]]]:
+        """End of stream: return the (possibly recovered) recipe and final events."""
+        root = self._parser.close()
+        events, self._events = self._events, []
+        return (root if isinstance(root, dict) else None), events
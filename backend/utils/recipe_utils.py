@@ -26,3 +26,48 @@ def normalize_recipe(data: Dict[str, Any]) -> Dict[str, Any]:
         steps = [str(s) for s in (raw_steps or [])]
     return {"name": name, "ingredients": ingredients, "steps": steps}
 
+
+
+class FrozenDict(dict):
+    """Read-only dict used for recipe snapshots shared between readers.
+
+    Still a ``dict`` so it serializes (json, pydantic) like the original;
+    ``copy.deepcopy`` returns a plain mutable copy.
+    """
+
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("recipe snapshot is read-only; use thaw_recipe() for a mutable copy")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return thaw_recipe(self)
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def freeze_recipe(data: Any) -> Any:
+    """Return an immutable snapshot (FrozenDict / tuple) of a recipe-like value."""
+    if isinstance(data, FrozenDict):
+        return data
+    if isinstance(data, dict):
+        return FrozenDict((k, freeze_recipe(v)) for k, v in data.items())
+    if isinstance(data, (list, tuple)):
+        return tuple(freeze_recipe(v) for v in data)
+    return data
+
+
+def thaw_recipe(data: Any) -> Any:
+    """Return a mutable (dict / list) copy of a frozen recipe snapshot."""
+    if isinstance(data, dict):
+        return {k: thaw_recipe(v) for k, v in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [thaw_recipe(v) for v in data]
+    return data
@@ -0,0 +1,60 @@
+"""Concurrent /ask latency against a local fake OpenAI server.
+
+With a non-blocking client N concurrent /ask calls should finish in roughly
+the latency of one call instead of N times that.
+
+Run from the repo root:
+    python -m benchmarks.bench_async_ask --concurrency 20 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from .fake_openai import FakeOpenAI
+
+
+async def _run(concurrency: int):
+    import httpx
+    from backend.app import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i: int):
+            r = await client.post("/ask", json={"message": "recipe for lasagna", "session_id": f"bench-{i}"})
+            r.raise_for_status()
+
+        await one(-1)  # warm up client construction and imports
+        start = time.perf_counter()
+        await one(-2)
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(concurrency)))
+        return single, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    server = FakeOpenAI(latency=args.latency).start()
+    os.environ["OPENAI_API_KEY"] = "sk-fake"
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    # measure upstream concurrency, not response-cache hits
+    os.environ["LLM_CACHE_SIZE"] = "0"
+    try:
+        single, elapsed = asyncio.run(_run(args.concurrency))
+    finally:
+        server.stop()
+
+    print(f"{args.concurrency} concurrent /ask: {elapsed:.3f}s "
+          f"(one call {single:.3f}s, serial would be ~{single * args.concurrency:.3f}s)")
+    print(f"upstream completions: {server.requests}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Database pool under load: checkout waits, saturation and exhaustion.
+
+Each request checks out a connection, runs a small query and keeps the
+transaction open for ``--hold`` seconds (a slow query or a handler doing
+other work mid-transaction). With ``--pool-size`` connections plus
+``--overflow`` extras, every phase runs ``--requests`` requests at one
+concurrency level and prints latency, pool counters from
+:func:`backend.database.pool_stats` and the ``/health`` status seen while
+the phase was running. Past the pool's capacity requests queue for a
+connection; once a wait exceeds ``--pool-timeout`` they fail.
+
+Runs against a throwaway SQLite file (aiosqlite) unless ``--url`` is given.
+
+Run from the repo root:
+    python -m benchmarks.bench_db_pool --pool-size 4 --overflow 2 --concurrency 2 6 12 48 160
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))] if values else 0.0
+
+
+async def _phase(concurrency: int, requests: int, hold: float):
+    from sqlalchemy import exc, text
+
+    from backend import database
+    from backend.app import health
+
+    latencies, errors = [], 0
+    queue = iter(range(requests))
+    saturation, status = 0.0, set()
+
+    async def one():
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            async with database.async_session() as session:
+                await session.execute(text("SELECT 1"))
+                await asyncio.sleep(hold)
+                await session.commit()
+        except exc.TimeoutError:  # no connection within --pool-timeout
+            errors += 1
+            return
+        latencies.append(time.perf_counter() - start)
+
+    async def worker():
+        for _ in queue:
+            await one()
+
+    async def sample():
+        nonlocal saturation
+        while True:
+            saturation = max(saturation, database.pool_stats().get("saturation", 0.0))
+            status.add((await health())["status"])
+            await asyncio.sleep(hold / 4)
+
+    before = database.pool_stats()
+    sampler = asyncio.create_task(sample())
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    sampler.cancel()
+    after = database.pool_stats()
+    waits = after["waits"] - before["waits"]
+    waited_ms = after["avg_wait_ms"] * after["waits"] - before["avg_wait_ms"] * before["waits"]
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": _percentile(latencies, 0.5),
+        "p99": _percentile(latencies, 0.99),
+        "errors": errors,
+        "waits": waits,
+        "avg_wait_ms": waited_ms / waits if waits else 0.0,
+        "timeouts": after["timeouts"] - before["timeouts"],
+        "saturation": saturation,
+        "health": "/".join(sorted(status)),
+    }
+
+
+async def _run(args):
+    from backend import database
+
+    print(f"pool {args.pool_size}+{args.overflow}, hold {args.hold * 1000:.0f}ms, timeout {args.pool_timeout}s")
+    print(f"{'conc':>5}{'req/s':>8}{'p50':>8}{'p99':>8}{'errors':>8}{'waits':>7}{'wait ms':>9}{'timeouts':>9}"
+          f"{'sat.':>6}  health")
+    try:
+        for concurrency in args.concurrency:
+            r = await _phase(concurrency, args.requests, args.hold)
+            print(f"{concurrency:>5}{r['rps']:>8.1f}{r['p50']:>8.3f}{r['p99']:>8.3f}{r['errors']:>8}{r['waits']:>7}"
+                  f"{r['avg_wait_ms']:>9.1f}{r['timeouts']:>9}{r['saturation']:>6.2f}  {r['health']}")
+    finally:
+        await database.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--overflow", type=int, default=2)
+    parser.add_argument("--pool-timeout", type=float, default=1.0, help="seconds to wait for a connection")
+    parser.add_argument("--hold", type=float, default=0.05, help="seconds each request keeps its connection")
+    parser.add_argument("--requests", type=int, default=200, help="requests per phase")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[2, 6, 12, 48, 160])
+    parser.add_argument("--url", help="database URL (default: a temporary SQLite file)")
+    args = parser.parse_args()
+
+    os.environ.update(DB_POOL_SIZE=str(args.pool_size), DB_MAX_OVERFLOW=str(args.overflow),
+                      DB_POOL_TIMEOUT=str(args.pool_timeout))
+    path = None
+    if args.url:
+        os.environ["DATABASE_URL"] = args.url
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "pool.db")
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{path}"
+    try:
+        asyncio.run(_run(args))
+    finally:
+        if path and os.path.exists(path):
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
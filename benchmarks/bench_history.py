@@ -0,0 +1,106 @@
+"""Prompt tokens per /ask call with token-budgeted history.
+
+Replays one long conversation (recipe requests, dislikes, chit-chat and an
+occasional pasted wall of text) through ``/ask`` against the fake OpenAI
+server, once with the legacy fixed slices of raw turns and once with the
+history window, and reports prompt tokens per upstream call plus the
+``history`` counters from ``/stats``.
+
+Run from the repo root:
+    python -m benchmarks.bench_history --turns 40
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+
+from .fake_openai import FakeOpenAI
+
+
+DISHES = ["lasagna", "ramen", "shakshuka", "risotto", "pad thai", "chili", "paella", "dal"]
+AVOID = ["mushrooms", "peanuts", "cilantro", "pork", "onions", "eggs"]
+PASTE = "My grandmother always said that a good sauce needs time and patience. " * 60
+
+
+def _messages(turns, rng):
+    out = []
+    for i in range(turns):
+        kind = rng.random()
+        if i % 10 == 7:
+            out.append(f"here is some context about our family dinners: {PASTE}")
+        elif kind < 0.4:
+            out.append(f"could you maybe show me something like {rng.choice(DISHES)} tonight")
+        elif kind < 0.7:
+            out.append(f"hmm, I'd rather not have {rng.choice(AVOID)} if possible")
+        else:
+            out.append("thanks, that sounds lovely, what wine goes with it?")
+    return out
+
+
+async def _run(messages):
+    import httpx
+    from backend.app import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        for message in messages:
+            r = await client.post("/ask", json={"message": message, "session_id": "history-bench"})
+            r.raise_for_status()
+        return (await client.get("/stats")).json()["history"]
+
+
+def _legacy(history, task, legacy_limit):
+    turns = [m for m in getattr(history, "raw", history) or () if m.get("role") in ("user", "assistant")]
+    return [{"role": m["role"], "content": m["content"]} for m in turns[-legacy_limit:] if m.get("content")]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=40)
+    args = parser.parse_args()
+
+    def reply(body):
+        if (body.get("response_format") or {}).get("type") == "json_object":
+            if "intent parser" in body["messages"][0]["content"]:
+                text = body["messages"][-1]["content"]
+                dish = next((d for d in DISHES if d in text), None)
+                avoid = next((a for a in AVOID if a in text), None)
+                if dish:
+                    return json.dumps({"intent": "get_recipe", "recipe_name": dish})
+                if avoid:
+                    return json.dumps({"intent": "add_dislike", "dislikes": [avoid]})
+                return json.dumps({"intent": "smalltalk"})
+            if "recipe patch" in body["messages"][0]["content"]:
+                return json.dumps({"ops": []})
+            return json.dumps({"name": "dish", "ingredients": [{"name": "x", "quantity": "1"}], "steps": ["Cook."]})
+        return "Happy cooking!"
+
+    server = FakeOpenAI(latency=0.0, reply=reply).start()
+    os.environ.update(OPENAI_API_KEY="sk-fake", OPENAI_BASE_URL=server.base_url, LLM_CACHE_SIZE="0")
+    from backend import context_manager as ctx
+    from backend import history
+
+    messages = _messages(args.turns, random.Random(0))
+    fit = history.fit
+    try:
+        for label in ("legacy", "budgeted"):
+            history.fit = _legacy if label == "legacy" else fit
+            ctx.reset_session("history-bench")
+            calls, tokens = server.requests, server.prompt_tokens
+            stats = asyncio.run(_run(messages))
+            n = server.requests - calls
+            print(f"{label:<9} calls {n:>3}  prompt tokens {server.prompt_tokens - tokens:>7}  "
+                  f"per call {(server.prompt_tokens - tokens) / max(1, n):.0f}")
+        for task, s in sorted(stats.items()):
+            if isinstance(s, dict):
+                print(f"  {task:<9} calls {s['calls']:>3}  history tokens {s['history_tokens']:>6}  "
+                      f"saved/call {s['saved_per_call']:.0f}")
+    finally:
+        history.fit = fit
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
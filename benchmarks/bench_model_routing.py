@@ -0,0 +1,98 @@
+"""Per-task model routing: small model for intents, large model for recipes.
+
+The fake server answers the small model (``gpt-4o-mini``) after
+``--small-latency`` seconds and the large one (``gpt-4o``) after
+``--large-latency``, both at ``--token-rate`` output tokens per second. Each
+phase sends ``--calls`` intent parses, substitution batches and recipe
+generations and prints p50/p95 per task:
+
+- ``single``: every task pinned to the large model (the old behaviour)
+- ``routed``: default routes (small model for intent/substitute/smalltalk)
+- ``fallback``: routed, with the small model missing upstream (404), so
+  every small-model task falls back to the large model
+
+Run from the repo root:
+    python -m benchmarks.bench_model_routing --calls 40
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from collections import defaultdict
+
+from .fake_openai import FakeOpenAI
+
+
+PHASES = {
+    "single": {f"OPENAI_MODEL_{t.upper()}": "gpt-4o" for t in ("intent", "smalltalk", "substitute")},
+    "routed": {},
+    "fallback": {},
+}
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))] if values else 0.0
+
+
+async def _run(calls: int):
+    from backend import llm_interface
+
+    timings = defaultdict(list)
+
+    async def timed(task, coro):
+        start = time.perf_counter()
+        await coro
+        timings[task].append(time.perf_counter() - start)
+
+    for i in range(calls):
+        # distinct requests: nothing is cached or coalesced
+        intent = [{"role": "system", "content": "You are an intent parser."},
+                  {"role": "user", "content": f"something warm for dinner #{i}?"}]
+        substitute = [{"role": "system", "content": "You suggest ingredient substitutes."},
+                      {"role": "user", "content": f'Ingredients: ["spice {i}"]'}]
+        await asyncio.gather(
+            timed("intent", llm_interface.chat_json_async(intent, task="intent")),
+            timed("substitute", llm_interface.chat_json_async(substitute, task="substitute")),
+            timed("generate", llm_interface.generate_recipe_async(f"stew {i}")),
+        )
+    await llm_interface.aclose()
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=40)
+    parser.add_argument("--small-latency", type=float, default=0.08)
+    parser.add_argument("--large-latency", type=float, default=0.3)
+    parser.add_argument("--token-rate", type=float, default=400.0, help="output tokens per second")
+    args = parser.parse_args()
+
+    os.environ.update(OPENAI_API_KEY="sk-fake", LLM_CACHE_SIZE="0", LLM_HEDGE="0")
+    from backend import model_routing
+
+    print(f"{'phase':<10}{'task':<12}{'models':<22}{'p50':>9}{'p95':>9}")
+    for phase, env in PHASES.items():
+        server = FakeOpenAI(latency=args.large_latency, model_latency={"gpt-4o-mini": args.small_latency},
+                            token_delay=1.0 / args.token_rate,
+                            missing_models={"gpt-4o-mini"} if phase == "fallback" else ()).start()
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        for key in PHASES["single"]:
+            os.environ.pop(key, None)
+        os.environ.update(env)
+        model_routing._ROUTES = None  # re-read the routes for this phase
+        try:
+            timings = asyncio.run(_run(args.calls))
+        finally:
+            server.stop()
+        for task, values in timings.items():
+            models = ",".join(model_routing.get_route(task).models)
+            print(f"{phase:<10}{task:<12}{models:<22}{_percentile(values, 0.5):>9.3f}"
+                  f"{_percentile(values, 0.95):>9.3f}")
+    stats = model_routing.routing_stats()
+    print("fallbacks: " + ", ".join(f"{task} {s['fallbacks']}" for task, s in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Output tokens and wall time of modify_recipe: full regeneration vs patch.
+
+A scripted fake model answers full-mode requests with the whole edited
+recipe and patch-mode requests with the equivalent patch, generating at
+``--token-rate`` tokens per second, so the difference is the output size
+alone. A last scenario returns an invalid patch to show the fallback cost.
+
+Run from the repo root:
+    python -m benchmarks.bench_modify_patch --ingredients 20 --steps 15 --token-rate 80
+"""
+
+import argparse
+import json
+import os
+import time
+
+from benchmarks.fake_openai import FakeOpenAI
+
+
+def _recipe(n_ing: int, n_steps: int):
+    ings = [{"name": f"ingredient {i}", "quantity": f"{i % 4 + 1} cups"} for i in range(n_ing)]
+    ings[0] = {"name": "milk", "quantity": "1 cup"}
+    ings[1] = {"name": "butter", "quantity": "2 tbsp"}
+    ings[2] = {"name": "mushrooms", "quantity": "200 g"}
+    steps = [f"Step {i}: combine ingredient {i} with the rest and cook for {i + 2} minutes, stirring often."
+             for i in range(n_steps)]
+    steps[1] = "Warm the milk with the butter until it just simmers."
+    steps[3] = "Saute the mushrooms until golden."
+    return {"name": "big casserole", "ingredients": ings, "steps": steps}
+
+
+EDITS = {
+    "one swap (milk -> oat milk)": (
+        [], [("milk", "oat milk")],
+        {"ops": [{"op": "replace_ingredient", "index": 0, "name": "oat milk"},
+                 {"op": "replace_step", "index": 1, "text": "Warm the oat milk with the butter until it just simmers."}]},
+    ),
+    "two swaps": (
+        [], [("milk", "oat milk"), ("butter", "olive oil")],
+        {"ops": [{"op": "replace_ingredient", "index": 0, "name": "oat milk"},
+                 {"op": "replace_ingredient", "index": 1, "name": "olive oil"},
+                 {"op": "replace_step", "index": 1, "text": "Warm the oat milk with the olive oil until it just simmers."}]},
+    ),
+    "drop a dislike": (
+        ["mushrooms"], [],
+        {"ops": [{"op": "remove_ingredient", "index": 2}, {"op": "remove_step", "index": 3}]},
+    ),
+    "invalid patch -> fallback": (
+        [], [("milk", "oat milk")],
+        {"ops": [{"op": "replace_ingredient", "index": 999, "name": "oat milk"}]},
+    ),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ingredients", type=int, default=20)
+    parser.add_argument("--steps", type=int, default=15)
+    parser.add_argument("--token-rate", type=float, default=80.0, help="simulated output tokens per second")
+    parser.add_argument("--latency", type=float, default=0.3, help="simulated time to first token")
+    args = parser.parse_args()
+
+    from backend import recipe_patch
+
+    base = _recipe(args.ingredients, args.steps)
+    script = {}
+
+    def reply(body):
+        if "recipe patch" in body["messages"][0]["content"]:
+            return json.dumps(script["patch"])
+        return json.dumps(script["full"])
+
+    server = FakeOpenAI(latency=args.latency, reply=reply, token_delay=1.0 / args.token_rate).start()
+    os.environ["OPENAI_API_KEY"] = "sk-fake"
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ["LLM_CACHE_SIZE"] = "0"
+    from backend import llm_interface as llm
+
+    print(f"recipe: {args.ingredients} ingredients, {args.steps} steps, {len(json.dumps(base))} chars")
+    print(f"{'edit':<28} {'mode':<6} {'calls':>5} {'out tok':>8} {'wall s':>7}")
+    try:
+        for label, (dislikes, subs, patch) in EDITS.items():
+            script["patch"] = patch
+            try:
+                script["full"] = recipe_patch.apply_patch(base, patch)
+            except recipe_patch.PatchError:
+                script["full"] = recipe_patch.apply_patch(base, EDITS["one swap (milk -> oat milk)"][2])
+            for mode in ("full", "patch"):
+                os.environ["MODIFY_MODE"] = mode
+                calls, tokens = server.requests, server.completion_tokens
+                start = time.perf_counter()
+                result = llm.modify_recipe(base, dislikes, subs)
+                elapsed = time.perf_counter() - start
+                assert result["ingredients"] == script["full"]["ingredients"], (label, mode)
+                print(f"{label:<28} {mode:<6} {server.requests - calls:>5} "
+                      f"{server.completion_tokens - tokens:>8} {elapsed:>7.2f}")
+        print(f"patch stats: {recipe_patch.patch_stats()}")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Recipe lookups per second against catalogue size.
+
+Compares the old behaviour (re-parse recipes.json and scan linearly on every
+lookup) with the in-memory index, both from JSON and from the memory-mapped
+compact format.
+
+Run from the repo root:
+    python -m benchmarks.bench_recipe_lookup --sizes 1000 10000 50000
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from backend.recipe_index import RecipeIndex, write_compact
+
+
+_WORDS = ["spicy", "creamy", "roasted", "garlic", "lemon", "chicken", "tofu", "bean", "tomato",
+          "basil", "curry", "noodle", "soup", "salad", "stew", "pie", "cake", "rice", "taco", "pasta"]
+
+
+def _catalogue(n: int, rng: random.Random):
+    recipes = []
+    for i in range(n):
+        name = " ".join(rng.sample(_WORDS, 3)) + f" {i}"
+        recipes.append({
+            "name": name,
+            "ingredients": [{"name": w, "quantity": "1 cup"} for w in rng.sample(_WORDS, 5)],
+            "steps": [f"Step {k} for {name}." for k in range(6)],
+        })
+    return recipes
+
+
+def _queries(recipes, rng: random.Random, count: int):
+    out = []
+    for _ in range(count):
+        name = rng.choice(recipes)["name"]
+        kind = rng.random()
+        if kind < 0.5:
+            out.append(name)                      # exact
+        elif kind < 0.9:
+            out.append(name.split(" ", 1)[1])     # contains
+        else:
+            out.append("no such dish")            # miss
+    return out
+
+
+def _old_lookup(path: Path, name: str):
+    name_l = name.lower().strip()
+    with path.open("r", encoding="utf-8") as f:
+        data = json.load(f)
+    for r in data.get("recipes", []):
+        if r.get("name", "").lower() == name_l:
+            return r
+        if name_l in r.get("name", "").lower():
+            return r
+    return None
+
+
+def _rate(fn, queries) -> float:
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return len(queries) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    print(f"{'recipes':>8} {'old/s':>10} {'index/s':>12} {'mmap/s':>12} {'build s':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            recipes = _catalogue(n, rng)
+            queries = _queries(recipes, rng, args.queries)
+            json_path = Path(tmp) / f"recipes_{n}.json"
+            json_path.write_text(json.dumps({"recipes": recipes}), encoding="utf-8")
+            compact_path = Path(tmp) / f"recipes_{n}.idx"
+            write_compact(recipes, compact_path)
+
+            old = _rate(lambda q: _old_lookup(json_path, q), queries[: max(20, 20000 // n)])
+            start = time.perf_counter()
+            index = RecipeIndex.from_recipes(recipes)
+            build = time.perf_counter() - start
+            fast = _rate(index.get, queries)
+            mapped = _rate(RecipeIndex.from_compact(compact_path).get, queries)
+            print(f"{n:>8} {old:>10.1f} {fast:>12.0f} {mapped:>12.0f} {build:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Hedged intent calls and circuit-breaker fallbacks.
+
+Hedging: sends ``--calls`` intent-style JSON completions against a fake
+server where ``--tail-rate`` of requests take ``--tail-latency`` extra
+seconds, once without and once with hedging, and prints p50/p95/p99 and the
+extra upstream requests the hedges cost.
+
+Breaker: points the app at a fake server that fails every request and
+replays "recipe for lasagna" through /ask. The first requests pay for the
+retries until the breaker opens; the rest are answered from the local recipe
+store without touching the provider.
+
+Run from the repo root:
+    python -m benchmarks.bench_resilience --calls 200 --tail-rate 0.05
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from .fake_openai import FakeOpenAI
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))] if values else 0.0
+
+
+async def _intent_calls(calls: int, hedge: bool):
+    from backend import llm_interface
+
+    latencies = []
+    for i in range(calls):
+        # distinct messages: nothing is coalesced
+        messages = [{"role": "system", "content": "You are an intent parser."},
+                    {"role": "user", "content": f"something for dinner #{i}, hedge={hedge}"}]
+        start = time.perf_counter()
+        await llm_interface.chat_json_async(messages, max_tokens=100, hedge=hedge)
+        latencies.append(time.perf_counter() - start)
+    await llm_interface.aclose()
+    return latencies
+
+
+async def _breaker_run(requests: int):
+    import httpx
+    from backend import llm_interface
+    from backend.app import app
+
+    rows = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        for i in range(requests):
+            start = time.perf_counter()
+            r = await client.post("/ask", json={"message": "recipe for lasagna", "session_id": f"breaker-{i}"})
+            body = r.json()
+            rows.append((time.perf_counter() - start, body.get("path"), bool(body.get("recipe"))))
+    await llm_interface.aclose()
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--tail-rate", type=float, default=0.05)
+    parser.add_argument("--tail-latency", type=float, default=1.0)
+    parser.add_argument("--requests", type=int, default=20, help="/ask requests against the failing server")
+    args = parser.parse_args()
+
+    os.environ.update(OPENAI_API_KEY="sk-fake", LLM_CACHE_SIZE="0", LLM_HEDGE_MIN_DELAY="0.05",
+                      LLM_BREAKER_FAILURES="5", LLM_BREAKER_RESET="60")
+    from backend import resilience
+    policy = resilience.get_resilience()
+
+    server = FakeOpenAI(latency=args.latency, tail_rate=args.tail_rate, tail_latency=args.tail_latency,
+                        seed=0).start()
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    try:
+        print(f"{'hedging':<10}{'calls':>7}{'upstream':>10}{'p50':>9}{'p95':>9}{'p99':>9}")
+        for hedge in (False, True):
+            before = server.requests
+            latencies = asyncio.run(_intent_calls(args.calls, hedge))
+            print(f"{'on' if hedge else 'off':<10}{len(latencies):>7}{server.requests - before:>10}"
+                  f"{_percentile(latencies, 0.5):>9.3f}{_percentile(latencies, 0.95):>9.3f}"
+                  f"{_percentile(latencies, 0.99):>9.3f}")
+    finally:
+        server.stop()
+    stats = policy.stats()
+    print(f"hedges sent: {stats['hedged']}, won: {stats['hedge_wins']}, "
+          f"delay: {stats.get('hedge_delay_chat_json', 0.0):.3f}s")
+
+    server = FakeOpenAI(latency=args.latency, error_rate=1.0, seed=0).start()
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    try:
+        rows = asyncio.run(_breaker_run(args.requests))
+    finally:
+        server.stop()
+    opened = next((i for i, (_, path, _) in enumerate(rows) if path == "fallback"), len(rows))
+    slow, fast = [s for s, _, _ in rows[:opened]], [s for s, _, _ in rows[opened:]]
+    print(f"breaker: opened after {opened} requests ({server.requests} upstream attempts); "
+          f"p50 {_percentile(slow, 0.5):.3f}s before, {_percentile(fast, 0.5) * 1000:.1f}ms after; "
+          f"{sum(1 for _, _, has in rows[opened:] if has)}/{len(fast)} fallback replies carried a recipe")
+    print(f"resilience: {policy.stats()}")
+
+
+if __name__ == "__main__":
+    main()
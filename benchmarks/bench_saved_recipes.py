@@ -0,0 +1,226 @@
+"""Saved-recipe storage: bulk insert, keyset vs OFFSET paging, list projections.
+
+Runs against a throwaway SQLite database (aiosqlite) standing in for
+Postgres, or against ``--url`` (e.g. a local
+``postgresql+asyncpg://...`` with the Alembic migrations applied; the
+benchmark users and their recipes are deleted afterwards). Two users get
+``--recipes`` saved recipes each; the benchmark then:
+
+- compares :func:`backend.saved_recipes.save_many` with a batch per call
+  (one INSERT per batch) and with one recipe per call
+- walks one user's whole list with keyset cursors and with ``OFFSET``,
+  printing page latency at the start and at the end of the list
+- compares a page of summary projections with a page of full rows
+- runs include/exclude ingredient searches, checks them against a scan
+  of the recipes in Python and prints their query plans
+- prints the query plan of a keyset page
+
+Run from the repo root:
+    python -m benchmarks.bench_saved_recipes --recipes 20000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import Text, cast, delete, func, or_, select, text
+
+
+PANTRY = [
+    "chicken breast", "ground beef", "salmon fillet", "tofu", "chickpeas", "whole milk", "oat milk", "butter",
+    "olive oil", "parmesan cheese", "heavy cream", "greek yogurt", "eggs", "all-purpose flour", "rice", "pasta",
+    "tomatoes", "onion", "garlic", "spinach", "mushrooms", "bell pepper", "carrots", "potatoes", "lemon",
+    "basil", "cumin", "paprika", "soy sauce", "honey", "almonds", "black beans", "coconut milk", "ginger",
+]
+
+SEARCHES = [
+    (["chicken"], []),
+    ([], ["dairy"]),
+    (["garlic", "spinach"], ["meat", "dairy"]),
+    (["salmon"], ["gluten"]),
+]
+
+
+def _recipe(i):
+    rng = random.Random(i)
+    return {
+        "name": f"Weeknight dish {i}",
+        "ingredients": [{"name": n, "quantity": f"{rng.randint(1, 4)} cups"} for n in rng.sample(PANTRY, 10)],
+        "steps": [f"Step {s + 1}: do the next thing carefully for a few minutes until it looks right." for s in range(8)],
+    }
+
+
+def _matches(recipe, include, exclude):
+    from backend.saved_recipes import INGREDIENT_GROUPS, ingredient_terms
+
+    terms = ingredient_terms(recipe)
+
+    def found(name):
+        return any(max(ingredient_terms({"ingredients": [n]}), key=len) in terms
+                   for n in INGREDIENT_GROUPS.get(name, (name,)))
+
+    return all(found(n) for n in include) and not any(found(n) for n in exclude)
+
+
+async def _explain(session, engine, stmt):
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    compiled = stmt.compile(engine, compile_kwargs={"literal_binds": True})
+    for row in (await session.execute(text(prefix + str(compiled)))).all():
+        print("    " + str(row[-1]))
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))] if values else 0.0
+
+
+async def _run(args):
+
+    from backend import saved_recipes
+    from backend import database
+    from backend.database import Base, async_session
+    from backend.models import SavedRecipe, SavedRecipeIngredient, User
+
+    engine = database.get_engine()
+    sqlite = engine.dialect.name == "sqlite"
+    if sqlite:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    users = [uuid.uuid4(), uuid.uuid4()]
+    async with async_session() as session:
+        session.add_all(User(user_id=u, email=f"{u}@bench", password_hash="x") for u in users)
+        await session.commit()
+
+    try:
+        # bulk insert: both users, interleaved batches
+        start = time.perf_counter()
+        async with async_session() as session:
+            for first in range(0, args.recipes, args.batch):
+                for u in users:
+                    await saved_recipes.save_many(session, u, [_recipe(first + i) for i in range(args.batch)])
+                await session.commit()
+        bulk = time.perf_counter() - start
+        rows = len(users) * (args.recipes // args.batch) * args.batch
+        start = time.perf_counter()
+        async with async_session() as session:
+            for i in range(args.single):
+                await saved_recipes.save_many(session, users[0], [_recipe(i)])
+            await session.commit()
+        single = time.perf_counter() - start
+        print(f"insert: bulk {rows / bulk:,.0f} rows/s ({args.batch} per statement), "
+              f"one by one {args.single / single:,.0f} rows/s")
+
+        user = users[0]
+        async with async_session() as session:
+            total = await saved_recipes.count(session, user)
+
+            keyset, seen, cursor = [], set(), None
+            while True:
+                start = time.perf_counter()
+                items, cursor = await saved_recipes.list_page(session, user, args.page, cursor)
+                keyset.append(time.perf_counter() - start)
+                seen.update(i["recipe_id"] for i in items)
+                if cursor is None:
+                    break
+            assert len(seen) == total, f"keyset walk returned {len(seen)} of {total} recipes"
+
+            offset = []
+            order = (SavedRecipe.saved_at.desc(), SavedRecipe.recipe_id.desc())
+            for n in range(0, total, args.page):
+                stmt = (select(*saved_recipes.SUMMARY_COLUMNS).where(SavedRecipe.user_id == user)
+                        .order_by(*order).offset(n).limit(args.page))
+                start = time.perf_counter()
+                (await session.execute(stmt)).all()
+                offset.append(time.perf_counter() - start)
+
+            print(f"paging {total} recipes, {args.page} per page ({len(keyset)} pages), p50 ms first/last 10 pages:")
+            for name, times in (("keyset", keyset), ("offset", offset)):
+                print(f"  {name:<7}{_percentile(times[:10], 0.5) * 1000:>8.2f}{_percentile(times[-10:], 0.5) * 1000:>8.2f}"
+                      f"   whole walk {sum(times):.2f}s")
+
+            start = time.perf_counter()
+            items, _ = await saved_recipes.list_page(session, user, args.page)
+            summary_s = time.perf_counter() - start
+            start = time.perf_counter()
+            full = (await session.execute(
+                select(SavedRecipe).where(SavedRecipe.user_id == user).order_by(*order).limit(args.page)
+            )).scalars().all()
+            full_s = time.perf_counter() - start
+            summary_bytes = len(json.dumps(items, default=str))
+            full_bytes = len(json.dumps([{"recipe_id": r.recipe_id, "name": r.recipe_title, "saved_at": r.saved_at,
+                                          "recipe": r.recipe_data} for r in full], default=str))
+            print(f"page of {args.page}: summaries {summary_s * 1000:.2f}ms / {summary_bytes / 1024:.1f} KiB, "
+                  f"full rows {full_s * 1000:.2f}ms / {full_bytes / 1024:.1f} KiB")
+
+            recipes = dict((await session.execute(
+                select(SavedRecipe.recipe_id, SavedRecipe.recipe_data).where(SavedRecipe.user_id == user)
+            )).all())
+            print("ingredient search:")
+            for include, exclude in SEARCHES:
+                expected = {rid for rid, data in recipes.items() if _matches(data, include, exclude)}
+                found, cursor, first = set(), None, None
+                while True:
+                    start = time.perf_counter()
+                    items, cursor = await saved_recipes.list_page(session, user, args.page, cursor, include, exclude)
+                    first = first if first is not None else time.perf_counter() - start
+                    found.update(i["recipe_id"] for i in items)
+                    if cursor is None:
+                        break
+                assert found == expected, f"search {include}/{exclude}: {len(found)} found, {len(expected)} expected"
+
+                # baseline without the term table: LIKE over every candidate's JSON blob
+                blob = func.lower(cast(SavedRecipe.recipe_data, Text))
+                like = [[blob.like(f"%{t}%") for t in saved_recipes.INGREDIENT_GROUPS.get(n, (n,))]
+                        for n in (*include, *exclude)]
+                stmt = (select(*saved_recipes.SUMMARY_COLUMNS)
+                        .where(SavedRecipe.user_id == user, *(or_(*c) for c in like[:len(include)]),
+                               *(~or_(*c) for c in like[len(include):]))
+                        .order_by(*order).limit(args.page + 1))
+                start = time.perf_counter()
+                (await session.execute(stmt)).all()
+                scan = time.perf_counter() - start
+                print(f"  include={include} exclude={exclude}: {len(found)} of {total}, first page "
+                      f"{first * 1000:.2f}ms (JSON LIKE scan {scan * 1000:.2f}ms)")
+                await _explain(session, engine, saved_recipes.page_query(user, args.page + 1, None, include, exclude))
+
+            cursor = saved_recipes.encode_cursor(items[-1]["saved_at"], items[-1]["recipe_id"])
+            print("keyset page plan:")
+            await _explain(session, engine, saved_recipes.page_query(user, args.page + 1, cursor))
+    finally:
+        async with async_session() as session:
+            await session.execute(delete(SavedRecipeIngredient).where(SavedRecipeIngredient.user_id.in_(users)))
+            await session.execute(delete(SavedRecipe).where(SavedRecipe.user_id.in_(users)))
+            await session.execute(delete(User).where(User.user_id.in_(users)))
+            await session.commit()
+        await database.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=20000, help="saved recipes per user")
+    parser.add_argument("--batch", type=int, default=1000, help="recipes per bulk insert")
+    parser.add_argument("--single", type=int, default=500, help="rows inserted one by one for comparison")
+    parser.add_argument("--page", type=int, default=50)
+    parser.add_argument("--url", help="database URL (default: a temporary SQLite file)")
+    args = parser.parse_args()
+
+    path = None
+    if args.url:
+        os.environ["DATABASE_URL"] = args.url
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "saved.db")
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{path}"
+    try:
+        asyncio.run(_run(args))
+    finally:
+        if path and os.path.exists(path):
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
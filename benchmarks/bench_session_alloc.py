@@ -0,0 +1,120 @@
+"""Allocation and time per /ask turn for session state handling.
+
+Replays the context_manager calls one /ask turn makes (append user message,
+read history, dislikes and current recipe, store a new recipe, append the
+reply) against the original dict/deepcopy implementation and the current
+slotted, copy-free one.
+
+Run from the repo root:
+    python -m benchmarks.bench_session_alloc --turns 2000
+"""
+
+import argparse
+import time
+import tracemalloc
+from copy import deepcopy
+
+from backend import context_manager as ctx
+from backend.session_store import MemorySessionStore
+
+
+RECIPE = {
+    "name": "lasagna",
+    "ingredients": [{"name": f"ingredient {i}", "quantity": f"{i} cups"} for i in range(15)],
+    "steps": [f"Step {i}: do something reasonably descriptive with the ingredients." for i in range(12)],
+}
+
+
+class LegacyContext:
+    """The original in-memory dict implementation, kept for comparison."""
+
+    def __init__(self):
+        self.sessions = {}
+
+    def get_or_create_session(self, session_id):
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = {"current_recipe": None, "dislikes": set(), "messages": []}
+            self.sessions[session_id] = session
+        return session
+
+    def get_dislikes(self, session_id):
+        return set(self.get_or_create_session(session_id)["dislikes"])
+
+    def add_dislike(self, session_id, ingredient):
+        self.get_or_create_session(session_id)["dislikes"].add(ingredient.lower())
+
+    def set_current_recipe(self, session_id, recipe):
+        self.get_or_create_session(session_id)["current_recipe"] = deepcopy(recipe)
+
+    def get_current_recipe(self, session_id):
+        recipe = self.get_or_create_session(session_id).get("current_recipe")
+        return deepcopy(recipe) if recipe else None
+
+    def get_messages(self, session_id, limit=20):
+        return self.get_or_create_session(session_id).get("messages", [])[-limit:]
+
+    def _append(self, session_id, role, text):
+        session = self.get_or_create_session(session_id)
+        session.setdefault("messages", []).append({"role": role, "content": text})
+        session["messages"] = session["messages"][-50:]
+
+    def append_user_message(self, session_id, text):
+        self._append(session_id, "user", text)
+
+    def append_assistant_message(self, session_id, text):
+        self._append(session_id, "assistant", text)
+
+
+def _turn(c, sid: str, i: int) -> None:
+    c.append_user_message(sid, f"turn {i}: make it without ingredient {i % 15}")
+    c.get_messages(sid)
+    c.get_dislikes(sid)
+    c.get_current_recipe(sid)
+    c.get_dislikes(sid)
+    c.get_current_recipe(sid)
+    if i % 4 == 0:
+        c.add_dislike(sid, f"ingredient {i % 15}")
+        c.set_current_recipe(sid, RECIPE)
+    c.append_assistant_message(sid, "Regenerated the recipe based on your dislikes.")
+
+
+def _measure(c, turns: int):
+    sid = "bench"
+    c.set_current_recipe(sid, RECIPE)
+    for i in range(50):  # fill the history so trimming is exercised
+        _turn(c, sid, i)
+
+    # transient bytes per turn: peak traced memory above the starting point
+    tracemalloc.start()
+    transient = 0
+    sample = max(1, turns // 10)
+    for i in range(sample):
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        _turn(c, sid, i)
+        transient += tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for i in range(turns):
+        _turn(c, sid, i)
+    elapsed = time.perf_counter() - start
+    return elapsed / turns * 1e6, transient / sample
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=2000)
+    args = parser.parse_args()
+
+    ctx.set_store(MemorySessionStore(ttl=0))
+    rows = [("legacy dict", LegacyContext()), ("slotted", ctx)]
+    print(f"{'impl':<12} {'us/turn':>9} {'bytes/turn':>11}")
+    for label, impl in rows:
+        us, transient = _measure(impl, args.turns)
+        print(f"{label:<12} {us:>9.1f} {transient:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Coalescing of identical concurrent /ask requests.
+
+Fires N concurrent "recipe for lasagna" requests from different sessions at
+the app (response cache disabled) and checks that they share one upstream
+completion, then prints the single-flight counters.
+
+Run from the repo root:
+    python -m benchmarks.bench_singleflight --concurrency 50
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from .fake_openai import FakeOpenAI
+
+
+async def _run(concurrency: int):
+    import httpx
+    from backend import llm_interface
+    from backend.app import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i: int):
+            r = await client.post("/ask", json={"message": "recipe for lasagna", "session_id": f"trend-{i}"})
+            r.raise_for_status()
+            return r.json()["recipe"]
+
+        start = time.perf_counter()
+        recipes = await asyncio.gather(*(one(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return recipes, elapsed, llm_interface.inflight_stats()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.3)
+    args = parser.parse_args()
+
+    server = FakeOpenAI(latency=args.latency).start()
+    os.environ["OPENAI_API_KEY"] = "sk-fake"
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ["LLM_CACHE_SIZE"] = "0"  # isolate coalescing from caching
+    try:
+        recipes, elapsed, stats = asyncio.run(_run(args.concurrency))
+    finally:
+        server.stop()
+
+    assert all(r == recipes[0] for r in recipes), "coalesced callers got different results"
+    print(f"{args.concurrency} identical /ask in {elapsed:.3f}s, upstream completions: {server.requests}")
+    print(f"single-flight: {stats}")
+
+
+if __name__ == "__main__":
+    main()
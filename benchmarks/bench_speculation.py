@@ -0,0 +1,100 @@
+"""/ask latency with and without speculative recipe generation.
+
+Sends recipe requests the local intent rules cannot settle ("recipe for
+lasagna but without mushrooms") so the LLM parses every intent. A ``--disagree``
+fraction of them is answered by the scripted model with a different intent,
+which forces the speculation to be discarded. Reports p50/p95 latency,
+speculation hit rate and wasted tokens.
+
+Run from the repo root:
+    python -m benchmarks.bench_speculation --requests 40 --disagree 0.25
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import time
+
+from .fake_openai import RECIPE_JSON, FakeOpenAI
+
+
+DISHES = ["lasagna", "ramen", "shakshuka", "risotto", "pad thai", "chili", "paella", "dal"]
+AVOID = ["mushrooms", "peanuts", "cilantro", "pork", "dairy", "gluten", "onions", "eggs"]
+
+
+def _reply_for(intents):
+    def reply(body):
+        messages = body["messages"]
+        if "intent parser" in messages[0]["content"]:
+            return json.dumps(intents.get(messages[-1]["content"], {"intent": "smalltalk"}))
+        if (body.get("response_format") or {}).get("type") == "json_object":
+            return json.dumps(RECIPE_JSON)
+        return "Happy cooking!"
+    return reply
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+async def _run(messages):
+    import httpx
+    from backend.app import app
+
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        for i, message in enumerate(messages):
+            start = time.perf_counter()
+            r = await client.post("/ask", json={"message": message, "session_id": f"spec-{i}"})
+            r.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+        stats = (await client.get("/stats")).json()["speculation"]
+    return latencies, stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--disagree", type=float, default=0.25)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--token-rate", type=float, default=200.0)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    intents, messages = {}, []
+    for i in range(args.requests):
+        dish, avoid = rng.choice(DISHES), rng.choice(AVOID)
+        message = f"recipe for {dish} but without {avoid}"
+        messages.append(message)
+        if message in intents:
+            continue
+        if rng.random() < args.disagree:
+            intents[message] = {"intent": "add_dislike", "dislikes": [avoid]}
+        else:
+            intents[message] = {"intent": "get_recipe", "recipe_name": dish}
+
+    server = FakeOpenAI(latency=args.latency, reply=_reply_for(intents), token_delay=1.0 / args.token_rate).start()
+    os.environ.update(OPENAI_API_KEY="sk-fake", OPENAI_BASE_URL=server.base_url, LLM_CACHE_SIZE="0")
+    from backend import speculation
+
+    try:
+        for label, inflight in (("sequential", 0), ("speculative", 4)):
+            speculation._SPECULATOR = speculation.Speculator(max_inflight=inflight)
+            tokens = server.completion_tokens
+            latencies, stats = asyncio.run(_run(messages))
+            print(f"{label:<12} p50 {statistics.median(latencies):.3f}s  p95 {_percentile(latencies, 0.95):.3f}s  "
+                  f"completion tokens {server.completion_tokens - tokens}")
+        print(f"speculation: hit_rate {stats['hit_rate']:.2f}, hits {stats['hits']}, misses {stats['misses']}, "
+              f"cancelled {stats['cancelled']}, wasted_tokens {stats['wasted_tokens']}, "
+              f"saved {stats['saved_seconds']:.2f}s")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""Import time of the app and time to the first successful /ask.
+
+Import: runs ``python -X importtime -c "import backend.app"`` ``--runs``
+times in fresh interpreters and prints the best total, the packages that
+cost the most (self time summed per top-level package) and whether the
+lazily imported dependencies (OpenAI SDK, httpx, SQLAlchemy) were loaded.
+
+Startup: starts ``uvicorn backend.app:app`` in a subprocess against a local
+fake OpenAI server (and a throwaway SQLite database, so the pool warm-up
+runs) and measures, from process start, the first ``/health`` answer, the
+end of the startup warm-up (``/health`` no longer ``starting``) and the
+first successful ``/ask`` and that /ask's own latency, in three modes:
+``warmed`` sends the /ask once the warm-up has finished, ``warming`` as
+soon as ``/health`` answers, ``no warm-up`` with ``STARTUP_WARMUP=0``.
+The largest ``/health`` latency seen while polling shows whether health
+checks stay responsive during the warm-up.
+
+``--max-import-ms`` and ``--max-first-ask`` make the run exit non-zero on
+a regression.
+
+Run from the repo root:
+    python -m benchmarks.bench_startup --runs 5 --max-import-ms 900 --max-first-ask 3.0
+"""
+
+import argparse
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+
+from .fake_openai import FakeOpenAI
+
+
+LAZY_MODULES = ("openai", "httpx", "sqlalchemy")
+
+# label, STARTUP_WARMUP, send the first /ask only once the warm-up is done
+MODES = (
+    ("warmed", "1", True),
+    ("warming", "1", False),
+    ("no warm-up", "0", False),
+)
+
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+
+def import_profile():
+    """(total ms, self ms per top-level package, loaded lazy modules) of one cold ``import backend.app``."""
+    code = f"import json, sys, backend.app; print(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True,
+                          check=True)
+    total, packages = 0.0, defaultdict(float)
+    for line in proc.stderr.splitlines():
+        m = _IMPORTTIME_RE.match(line)
+        if not m:
+            continue
+        self_us, cumulative_us, _, module = m.groups()
+        packages[module.split(".")[0]] += int(self_us) / 1000
+        if module == "backend.app":
+            total = int(cumulative_us) / 1000
+    return total, dict(packages), json.loads(proc.stdout)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _request(url, body=None, timeout=10.0):
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=timeout) as r:
+        return json.loads(r.read())
+
+
+def startup_run(env, timeout: float, wait: bool):
+    """Seconds from process start to first /health, warm-up done and first /ask (None if not reached).
+
+    With ``wait`` the /ask is sent once the warm-up has finished, else as
+    soon as /health answers.
+    """
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", "backend.app:app", "--port", str(port),
+                             "--log-level", "warning"], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    out = {"health": None, "warm": None, "ask": None, "ask_latency": None, "health_max": 0.0, "steps": {}}
+
+    def poll():
+        sent = time.perf_counter()
+        health = _request(base + "/health", timeout=timeout)
+        out["health_max"] = max(out["health_max"], time.perf_counter() - sent)
+        return health
+
+    try:
+        while out["health"] is None:
+            if proc.poll() is not None or time.perf_counter() - start > timeout:
+                raise RuntimeError("server did not start: " + proc.stderr.read().decode()[-2000:])
+            try:
+                health = poll()
+            except OSError:  # not listening yet
+                time.sleep(0.005)
+                continue
+            out["health"] = time.perf_counter() - start
+
+        def ask():
+            sent = time.perf_counter()
+            try:
+                _request(base + "/ask", {"message": "recipe for lasagna", "session_id": "bench-startup"}, timeout)
+            except urllib.error.HTTPError:
+                return
+            out["ask"] = time.perf_counter() - start
+            out["ask_latency"] = time.perf_counter() - sent
+
+        if not wait:
+            ask()
+        # without the warm-up there is nothing to wait for ("ready" stays false)
+        while health["status"] == "starting" and time.perf_counter() - start < timeout:
+            time.sleep(0.02)
+            health = poll()
+        if health["warmup"]["ready"]:
+            out["warm"] = time.perf_counter() - start
+            out["steps"] = {k: v.get("seconds") for k, v in health["warmup"].items() if isinstance(v, dict)}
+        if wait:
+            ask()
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    return out
+
+
+def _fmt(values):
+    values = [v for v in values if v is not None]
+    return f"{statistics.median(values):>9.3f}" if values else f"{'-':>9}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="packages to list by import time")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake model latency (s)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for the server")
+    parser.add_argument("--no-db", action="store_true", help="start without DATABASE_URL")
+    parser.add_argument("--max-import-ms", type=float, help="fail if the best import of backend.app is slower")
+    parser.add_argument("--max-first-ask", type=float, help="fail if the median first /ask (s from process start, sent while warming up) is slower")
+    args = parser.parse_args()
+
+    profiles = [import_profile() for _ in range(args.runs)]
+    best, packages, loaded = min(profiles, key=lambda p: p[0])
+    print(f"import backend.app: best {best:.0f} ms, median {statistics.median(p[0] for p in profiles):.0f} ms "
+          f"({args.runs} cold interpreters)")
+    for name, ms in sorted(packages.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"  {name:<22}{ms:>8.1f} ms")
+    print(f"lazy modules loaded at import: {', '.join(loaded) or 'none'}")
+
+    server = FakeOpenAI(latency=args.latency).start()
+    db_dir = tempfile.mkdtemp()
+    env = dict(os.environ, OPENAI_API_KEY="sk-fake", OPENAI_BASE_URL=server.base_url, LLM_CACHE_SIZE="0",
+               PYTHONPATH=os.getcwd() + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    if not args.no_db:
+        env["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(db_dir, 'startup.db')}"
+    results = {}
+    try:
+        for label, warmup, wait in MODES:
+            results[label] = [startup_run(dict(env, STARTUP_WARMUP=warmup), args.timeout, wait)
+                              for _ in range(args.runs)]
+    finally:
+        server.stop()
+
+    print(f"startup, median s from process start ({args.runs} runs, model latency {args.latency * 1000:.0f}ms):")
+    print(f"  {'':<12}{'/health':>9}{'warm':>9}{'1st /ask':>9}{'/ask s':>9}{'max /health ms':>16}")
+    for label, runs in results.items():
+        print(f"  {label:<12}{_fmt([r['health'] for r in runs])}{_fmt([r['warm'] for r in runs])}"
+              f"{_fmt([r['ask'] for r in runs])}{_fmt([r['ask_latency'] for r in runs])}"
+              f"{max(r['health_max'] for r in runs) * 1000:>16.1f}")
+    steps = defaultdict(list)
+    for r in results["warmed"]:
+        for name, seconds in r["steps"].items():
+            steps[name].append(seconds)
+    if steps:
+        print("  warm-up steps (median s): " + ", ".join(f"{k} {statistics.median(v):.3f}" for k, v in steps.items()
+                                                        if None not in v))
+
+    first_ask = [r["ask"] for r in results["warming"]]
+    breached = []
+    if args.max_import_ms is not None and best > args.max_import_ms:
+        breached.append(f"import {best:.0f} ms > {args.max_import_ms} ms")
+    if None in first_ask:
+        breached.append("a first /ask failed")
+    elif args.max_first_ask is not None and statistics.median(first_ask) > args.max_first_ask:
+        breached.append(f"first /ask {statistics.median(first_ask):.3f}s > {args.max_first_ask}s")
+    if breached:
+        print("FAIL: " + "; ".join(breached))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
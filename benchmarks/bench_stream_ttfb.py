@@ -0,0 +1,88 @@
+"""Time-to-first-event for /ask/stream versus total time for /ask.
+
+The app is served by uvicorn on a local port (httpx's ASGI transport buffers
+whole responses, which would hide the streaming).
+
+Run from the repo root:
+    python -m benchmarks.bench_stream_ttfb --latency 0.3 --chunk-delay 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import threading
+import time
+
+from .fake_openai import FakeOpenAI
+
+
+def _serve_app():
+    import uvicorn
+    from backend.app import app
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, f"http://127.0.0.1:{port}"
+
+
+async def _run(base_url: str):
+    import httpx
+
+    body = {"message": "recipe for lasagna", "session_id": "stream"}
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        await client.post("/ask", json={**body, "session_id": "warmup"})
+
+        start = time.perf_counter()
+        r = await client.post("/ask", json={**body, "session_id": "plain"})
+        r.raise_for_status()
+        plain = time.perf_counter() - start
+
+        firsts = {}
+        final = None
+        start = time.perf_counter()
+        async with client.stream("POST", "/ask/stream", json=body) as resp:
+            event = None
+            async for line in resp.aiter_lines():
+                if line.startswith("event: "):
+                    event = line[7:]
+                    firsts.setdefault(event, time.perf_counter() - start)
+                elif line.startswith("data: ") and event == "done":
+                    final = json.loads(line[6:])
+        total = time.perf_counter() - start
+    return plain, firsts, total, final
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--chunk-delay", type=float, default=0.02)
+    args = parser.parse_args()
+
+    server = FakeOpenAI(latency=args.latency, chunk_delay=args.chunk_delay).start()
+    os.environ["OPENAI_API_KEY"] = "sk-fake"
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ["LLM_CACHE_SIZE"] = "0"
+    app_server, base_url = _serve_app()
+    try:
+        plain, firsts, total, final = asyncio.run(_run(base_url))
+    finally:
+        app_server.should_exit = True
+        server.stop()
+
+    print(f"/ask total:              {plain:.3f}s")
+    for event, t in firsts.items():
+        print(f"/ask/stream first {event + ':':<11} {t:.3f}s")
+    print(f"/ask/stream total:       {total:.3f}s")
+    print(f"final recipe: {final['recipe']['name']} "
+          f"({len(final['recipe']['ingredients'])} ingredients, {len(final['recipe']['steps'])} steps)")
+
+
+if __name__ == "__main__":
+    main()
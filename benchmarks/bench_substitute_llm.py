@@ -0,0 +1,85 @@
+"""Upstream completions spent on unknown substitutions.
+
+Applies a set of dislikes missing from the static table to a long recipe,
+first the old way (one ``ask_llm`` per matching ingredient and step), then
+with the batched resolver: a cold run (one JSON completion for the recipe)
+and a warm run answered from the learned table.
+
+Run from the repo root:
+    python -m benchmarks.bench_substitute_llm --unknown 8 --steps 200 --latency 0.2
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from copy import deepcopy
+from pathlib import Path
+
+from benchmarks.fake_openai import FakeOpenAI
+
+
+def _old_apply(recipe, dislikes, ask_llm):
+    new_recipe = deepcopy(recipe)
+    dislike_list = sorted({d.lower() for d in dislikes})
+    for ing in new_recipe.get("ingredients", []):
+        for d in dislike_list:
+            if d in ing["name"].lower():
+                ing["name"] = ing["name"].replace(d, ask_llm(d).get("text", ""))
+    steps = []
+    for step in new_recipe.get("steps", []):
+        for d in dislike_list:
+            if d in step.lower():
+                step = step.replace(d, ask_llm(d).get("text", ""))
+        steps.append(step)
+    new_recipe["steps"] = steps
+    return new_recipe
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--unknown", type=int, default=8)
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    server = FakeOpenAI(latency=args.latency).start()
+    os.environ["OPENAI_API_KEY"] = "sk-fake"
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ["SUBSTITUTIONS_LEARNED_PATH"] = str(Path(tempfile.mkdtemp()) / "learned.json")
+    from backend import substitution_engine as se
+    from backend.llm_interface import ask_llm
+
+    rng = random.Random(0)
+    dislikes = {f"exotic{i}" for i in range(args.unknown)}
+    words = sorted(dislikes) + ["stir", "the", "pan", "until", "golden"]
+    recipe = {
+        "name": "bench",
+        "ingredients": [{"name": d, "quantity": "1"} for d in sorted(dislikes)],
+        "steps": [" ".join(rng.choice(words) for _ in range(12)) for _ in range(args.steps)],
+    }
+
+    try:
+        for label, fn in (
+            ("old per-hit ask_llm", lambda: _old_apply(recipe, dislikes, lambda d: ask_llm(se._llm_prompt(d)))),
+            ("batched, cold", lambda: se.apply_substitutions(recipe, dislikes)),
+            ("batched, learned", lambda: se.apply_substitutions(recipe, dislikes)),
+        ):
+            before = server.requests
+            start = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start
+            print(f"{label:<22} {server.requests - before:>5} completions  {elapsed:8.2f}s")
+        se._MEMO.clear()
+        se._LEARNED = None  # reload from disk, as a fresh process would
+        before = server.requests
+        se.apply_substitutions(recipe, dislikes)
+        print(f"{'new process, learned':<22} {server.requests - before:>5} completions")
+        print(f"stats: {se.substitution_stats()}")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
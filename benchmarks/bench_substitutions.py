@@ -0,0 +1,94 @@
+"""apply_substitutions throughput on large recipes and dislike lists.
+
+Compares the old nested loop (every ingredient and step x every dislike,
+re-scanning the substitution table on each hit) with the compiled
+single-pass matcher. All dislikes have static substitutes, so neither path
+calls the LLM.
+
+Run from the repo root:
+    python -m benchmarks.bench_substitutions --steps 100 500 --dislikes 10 200
+"""
+
+import argparse
+import random
+import time
+from copy import deepcopy
+
+from backend import substitution_engine as se
+
+
+_FILLER = ["stir", "gently", "until", "golden", "then", "add", "the", "pan", "and", "season", "with", "salt"]
+
+
+def _old_apply(recipe, dislikes):
+    new_recipe = deepcopy(recipe)
+    dislike_list = sorted({d.lower() for d in dislikes})
+    for ing in new_recipe.get("ingredients", []):
+        name = ing.get("name", "").lower()
+        for d in dislike_list:
+            if d and d in name:
+                subs = se.suggest_substitutes(d)
+                if subs:
+                    ing["name"] = ing["name"].replace(d, subs[0])
+    updated_steps = []
+    for step in new_recipe.get("steps", []):
+        s_lower = step.lower()
+        for d in dislike_list:
+            if d in s_lower:
+                subs = se.suggest_substitutes(d)
+                if subs:
+                    step = step.replace(d, subs[0])
+        updated_steps.append(step)
+    new_recipe["steps"] = updated_steps
+    return new_recipe
+
+
+def _workload(n_steps: int, n_dislikes: int, rng: random.Random):
+    # large dislike lists: the real table plus many synthetic entries
+    table = dict(se.SUBSTITUTIONS)
+    for i in range(n_dislikes):
+        table.setdefault(f"spice{i}", [f"herb{i}"])
+    se.SUBSTITUTIONS.update(table)
+    dislikes = set(rng.sample(sorted(table), min(n_dislikes, len(table))))
+    words = list(table)
+    recipe = {
+        "name": "benchmark stew",
+        "ingredients": [{"name": rng.choice(words).title(), "quantity": "1 cup"} for _ in range(40)],
+        # ~25 words per step, a few of them ingredients
+        "steps": [" ".join(rng.choice(words) if rng.random() < 0.12 else rng.choice(_FILLER)
+                           for _ in range(25)).capitalize() + "."
+                  for _ in range(n_steps)],
+    }
+    return recipe, dislikes
+
+
+def _time(fn, recipe, dislikes, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(recipe, dislikes)
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, nargs="+", default=[100, 500])
+    parser.add_argument("--dislikes", type=int, nargs="+", default=[10, 200])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    original = dict(se.SUBSTITUTIONS)
+
+    print(f"{'steps':>6} {'dislikes':>9} {'old ms':>9} {'new ms':>9} {'speedup':>8}")
+    for n_steps in args.steps:
+        for n_dislikes in args.dislikes:
+            recipe, dislikes = _workload(n_steps, n_dislikes, rng)
+            se.apply_substitutions(recipe, dislikes)  # build the matcher once
+            old = _time(_old_apply, recipe, dislikes, args.repeat)
+            new = _time(se.apply_substitutions, recipe, dislikes, args.repeat)
+            print(f"{n_steps:>6} {n_dislikes:>9} {old * 1000:>9.1f} {new * 1000:>9.1f} {old / new:>7.1f}x")
+            se.SUBSTITUTIONS.clear()
+            se.SUBSTITUTIONS.update(original)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""Local fake of the OpenAI chat-completions endpoint.
+
+Point the backend at it through ``OPENAI_BASE_URL`` so benchmarks run
+offline and with a predictable per-call latency. Requests with
+``stream: true`` get the same canned content as SSE chunks of
+``chunk_chars`` characters, ``chunk_delay`` seconds apart.
+
+``reply`` replaces :func:`canned_reply` to script completions, and
+``token_delay`` adds a per-output-token generation time (tokens are
+approximated as 4 characters) to non-streamed responses. ``usage`` reports
+the same approximation, summed in ``prompt_tokens`` and ``completion_tokens``.
+``model_latency`` maps model names to their own base latency, and models
+in ``missing_models`` are answered with a 404 (unknown model).
+``error_rate`` answers that fraction of requests with an HTTP 500, and
+``tail_rate`` delays that fraction by a further ``tail_latency`` seconds
+(a slow tail, for hedging).
+
+Usage:
+    server = FakeOpenAI(latency=0.2).start()
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    ...
+    server.stop()
+
+or standalone, for a backend started with ``OPENAI_BASE_URL`` pointing at it:
+    python -m benchmarks.fake_openai --port 8900 --latency 0.3 --token-rate 80
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+INTENT_JSON = {"intent": "get_recipe", "recipe_name": "lasagna", "dislikes": [], "replacements": []}
+
+RECIPE_JSON = {
+    "name": "lasagna",
+    "ingredients": [
+        {"name": "lasagna noodles", "quantity": "12 pieces"},
+        {"name": "tomato sauce", "quantity": "2 cups"},
+        {"name": "ricotta cheese", "quantity": "1 cup"},
+    ],
+    "steps": [
+        "Preheat oven to 375°F (190°C).",
+        "Layer noodles, sauce and cheese.",
+        "Bake for 45 minutes.",
+    ],
+}
+
+
+def canned_reply(body: Dict[str, Any]) -> str:
+    """Pick a canned completion based on the request shape."""
+    messages: List[Dict[str, str]] = body.get("messages") or []
+    system = messages[0].get("content", "") if messages else ""
+    if "intent parser" in system:
+        return json.dumps(INTENT_JSON)
+    if "ingredient substitutes" in system:
+        match = re.search(r"Ingredients: (\[.*\])", messages[-1].get("content", ""))
+        names = json.loads(match.group(1)) if match else []
+        return json.dumps({"substitutes": {n: [f"{n} alternative"] for n in names}})
+    if "recipe patch" in system:
+        return json.dumps(_patch_reply(messages[-1].get("content", "")))
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        name = re.search(r"Recipe: (.+?)\. Exclude", messages[-1].get("content", ""))
+        return json.dumps({**RECIPE_JSON, "name": name.group(1)} if name else RECIPE_JSON)
+    return "Happy cooking!"
+
+
+def _patch_reply(prompt: str) -> Dict[str, Any]:
+    """Drop every ingredient that names a dislike, swap in requested substitutions."""
+    match = re.search(r"Recipe JSON: (\{.*\})\s*$", prompt, re.S)
+    dislikes = re.search(r"Dislikes: (.*)", prompt)
+    subs = re.search(r"Substitutions: (.*)", prompt)
+    if not match:
+        return {"ops": []}
+    recipe = json.loads(match.group(1))
+    avoid = [d.strip().lower() for d in (dislikes.group(1) if dislikes else "").split(",") if d.strip() != "none"]
+    swaps = dict(pair.split(" -> ", 1) for pair in (subs.group(1) if subs else "").split("; ") if " -> " in pair)
+    ops = []
+    for i, ing in enumerate(recipe.get("ingredients", [])):
+        name = str(ing.get("name", "")).lower()
+        src = next((s for s in swaps if s.lower() in name), None)
+        if src:
+            ops.append({"op": "replace_ingredient", "index": i, "name": swaps[src]})
+        elif any(d and d in name for d in avoid):
+            ops.append({"op": "remove_ingredient", "index": i})
+    return {"ops": ops}
+
+
+def approx_tokens(text: str) -> int:
+    return max(1, (len(text) + 3) // 4)
+
+
+def prompt_tokens(body: Dict[str, Any]) -> int:
+    return sum(4 + approx_tokens(m.get("content") or "") for m in body.get("messages") or [])
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def handle_error(self, request, client_address):
+        # clients hanging up mid-response (cancelled calls) are expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FakeOpenAI:
+    """Threaded HTTP server answering ``POST /v1/chat/completions``."""
+
+    def __init__(self, latency: float = 0.2, host: str = "127.0.0.1", port: int = 0,
+                 chunk_chars: int = 12, chunk_delay: float = 0.01,
+                 reply: Optional[Callable[[Dict[str, Any]], str]] = None, token_delay: float = 0.0,
+                 error_rate: float = 0.0, seed: Optional[int] = None, tail_rate: float = 0.0,
+                 tail_latency: float = 0.0, model_latency: Optional[Dict[str, float]] = None,
+                 missing_models: Iterable[str] = ()):
+        self.latency = latency
+        self.chunk_chars = chunk_chars
+        self.chunk_delay = chunk_delay
+        self.reply = reply or canned_reply
+        self.token_delay = token_delay
+        self.error_rate = error_rate
+        self.tail_rate = tail_rate
+        self.tail_latency = tail_latency
+        self.model_latency = dict(model_latency or {})
+        self.missing_models = set(missing_models)
+        self._rng = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):  # keep benchmark output clean
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if body.get("model") in fake.missing_models:
+                    self._error(404, f"The model `{body['model']}` does not exist", "invalid_request_error")
+                    return
+                with fake._lock:
+                    fake.requests += 1
+                    fail = fake.error_rate > 0 and fake._rng.random() < fake.error_rate
+                    slow = fake.tail_rate > 0 and fake._rng.random() < fake.tail_rate
+                    if fail:
+                        fake.errors += 1
+                    else:
+                        fake.prompt_tokens += prompt_tokens(body)
+                latency = fake.model_latency.get(body.get("model"), fake.latency)
+                time.sleep(latency + (fake.tail_latency if slow else 0.0))
+                if fail:
+                    self._error()
+                    return
+                if body.get("stream"):
+                    self._stream(body)
+                    return
+                content = fake.reply(body)
+                tokens = approx_tokens(content)
+                with fake._lock:
+                    fake.completion_tokens += tokens
+                time.sleep(fake.token_delay * tokens)
+                payload = json.dumps({
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "fake"),
+                    "choices": [{
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": content},
+                    }],
+                    "usage": {"prompt_tokens": prompt_tokens(body), "completion_tokens": tokens,
+                              "total_tokens": prompt_tokens(body) + tokens},
+                }).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _error(self, status=500, message="fake upstream error", kind="server_error"):
+                payload = json.dumps({"error": {"message": message, "type": kind}}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _stream(self, body):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                content = fake.reply(body)
+                with fake._lock:
+                    fake.completion_tokens += approx_tokens(content)
+                for i in range(0, len(content), fake.chunk_chars):
+                    chunk = {
+                        "id": "chatcmpl-fake",
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": body.get("model", "fake"),
+                        "choices": [{
+                            "index": 0,
+                            "finish_reason": None,
+                            "delta": {"content": content[i:i + fake.chunk_chars]},
+                        }],
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                    time.sleep(fake.chunk_delay)
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+        return Handler
+
+    def start(self) -> "FakeOpenAI":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the fake OpenAI server in the foreground")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--token-rate", type=float, default=0.0, help="output tokens per second (0 = instant)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--tail-rate", type=float, default=0.0, help="fraction of requests that are slow")
+    parser.add_argument("--tail-latency", type=float, default=0.0, help="extra seconds for slow requests")
+    parser.add_argument("--model-latency", action="append", default=[], metavar="MODEL=SECONDS",
+                        help="per-model latency, e.g. gpt-4o-mini=0.1 (repeatable)")
+    args = parser.parse_args()
+
+    server = FakeOpenAI(latency=args.latency, host=args.host, port=args.port, error_rate=args.error_rate,
+                        tail_rate=args.tail_rate, tail_latency=args.tail_latency,
+                        model_latency={m: float(v) for m, v in (x.split("=", 1) for x in args.model_latency)},
+                        token_delay=(1.0 / args.token_rate) if args.token_rate else 0.0).start()
+    print(f"fake OpenAI listening on {server.base_url}")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
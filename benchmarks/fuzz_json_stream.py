@@ -0,0 +1,71 @@
+"""Recovery time of the lenient JSON parser on large malformed completions.
+
+Times :func:`backend.utils.json_stream.loads_lenient` on a truncated and a
+garbled large recipe against the old ``json.loads`` + DOTALL regex
+fallback. The correctness checks (the corpus in
+``corpus/model_outputs.json``, every truncation of random recipes,
+garbled documents, chunked streaming) run under pytest in
+``tests/test_json_stream.py``.
+
+Run from the repo root:
+    python -m benchmarks.fuzz_json_stream
+"""
+
+import argparse
+import json
+import random
+import re
+import time
+
+from backend.utils.json_stream import loads_lenient
+
+
+def _recipe(rng: random.Random, n_ing: int, n_steps: int):
+    return {
+        "name": f"dish {rng.randint(0, 999)} \"special\" é",
+        "ingredients": [{"name": f"item {i}", "quantity": f"{rng.randint(1, 9)}/2 cup"} for i in range(n_ing)],
+        "steps": [f"Step {i}: stir\\n well at {rng.randint(100, 250)}°C." for i in range(n_steps)],
+    }
+
+
+def _old_parse(content: str):
+    try:
+        return json.loads(content)
+    except Exception:
+        match = re.search(r"\{.*\}\s*$", content, re.DOTALL)
+        if match:
+            try:
+                return json.loads(match.group(0))
+            except Exception:
+                pass
+        return {}
+
+
+def time_large(rng: random.Random) -> None:
+    text = json.dumps(_recipe(rng, 400, 600))
+    cut = text[: int(len(text) * 0.9)]  # max_tokens cut-off
+    garbled = "{" * 2000 + cut
+    for label, doc in (("truncated", cut), ("garbled", garbled)):
+        start = time.perf_counter()
+        old = _old_parse(doc)
+        t_old = time.perf_counter() - start
+        start = time.perf_counter()
+        new, _ = loads_lenient(doc)
+        t_new = time.perf_counter() - start
+        steps = len((new or {}).get("steps", [])) if isinstance(new, dict) else 0
+        print(f"  {label:<10} {len(doc):>7} chars  old {t_old * 1000:8.1f} ms ({len(old.get('steps', []))} steps)"
+              f"  new {t_new * 1000:8.1f} ms ({steps} steps)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    print("large completions:")
+    time_large(rng)
+
+
+if __name__ == "__main__":
+    main()
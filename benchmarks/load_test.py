@@ -0,0 +1,179 @@
+"""Replay multi-turn conversation traces against /ask under load.
+
+Each virtual user replays traces from ``benchmarks/corpus/traces.json``
+(get_recipe -> add_dislike -> replace ...) in a fresh session, turn after
+turn, while all users run concurrently. Upstream completions go to the fake
+OpenAI server, which answers the intent parser with each turn's scripted
+intent and everything else with canned JSON, after ``--latency`` seconds plus
+``--token-rate`` generation time; ``--error-rate`` injects HTTP 500s.
+
+Reports throughput, p50/p95/p99 latency (overall and per intent), failed
+and shed turns, upstream calls and memory per session. ``--max-p95`` and
+``--max-error-rate`` turn it into a gate: the exit status is 1 when either is
+exceeded.
+
+By default the app runs in-process; ``--url`` targets a running backend
+instead (start it with ``OPENAI_BASE_URL`` pointing at
+``python -m benchmarks.fake_openai``, which answers every LLM-parsed intent
+with its one canned intent; memory figures are then not available).
+
+Run from the repo root:
+    python -m benchmarks.load_test --users 20 --iterations 5 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+from .fake_openai import FakeOpenAI, canned_reply
+
+
+TRACES = Path(__file__).parent / "corpus" / "traces.json"
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))] if values else 0.0
+
+
+def _reply_for(traces):
+    intents = {turn["message"]: turn["intent"] for trace in traces for turn in trace["turns"]}
+
+    def reply(body):
+        messages = body.get("messages") or []
+        if messages and "intent parser" in messages[0].get("content", ""):
+            return json.dumps(intents.get(messages[-1].get("content"), {"intent": "smalltalk"}))
+        return canned_reply(body)
+    return reply
+
+
+async def _user(client, user, traces, iterations, samples, failures, shed):
+    for it in range(iterations):
+        trace = traces[(user + it) % len(traces)]
+        session_id = f"load-{user}-{it}"
+        for turn in trace["turns"]:
+            kind = turn["intent"].get("intent", "unknown")
+            start = time.perf_counter()
+            try:
+                r = await client.post("/ask", json={"message": turn["message"], "session_id": session_id})
+                ok = r.status_code == 200
+                if ok and r.json().get("retry_after") is not None:
+                    shed[kind] += 1
+            except Exception:
+                ok = False
+            elapsed = time.perf_counter() - start
+            samples.append((kind, elapsed))
+            if not ok:
+                failures[kind] += 1
+
+
+async def _run(args, traces, baseline):
+    import httpx
+
+    if args.url:
+        transport, base_url = None, args.url
+    else:
+        from backend.app import app
+        transport, base_url = httpx.ASGITransport(app=app), "http://load"
+    samples, failures, shed = [], defaultdict(int), defaultdict(int)
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout) as client:
+        # one unmeasured pass builds clients, indexes and caches
+        await _user(client, -1, traces, 1, [], defaultdict(int), defaultdict(int))
+        baseline()
+        start = time.perf_counter()
+        await asyncio.gather(*(_user(client, u, traces, args.iterations, samples, failures, shed)
+                               for u in range(args.users)))
+        elapsed = time.perf_counter() - start
+    return samples, failures, shed, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--iterations", type=int, default=5, help="traces replayed per user")
+    parser.add_argument("--traces", type=Path, default=TRACES)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--token-rate", type=float, default=0.0, help="output tokens per second (0 = instant)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--url", help="run against this backend instead of in-process")
+    parser.add_argument("--trace-memory", action="store_true", help="measure retained memory with tracemalloc")
+    parser.add_argument("--max-p95", type=float, help="fail if overall p95 latency (s) exceeds this")
+    parser.add_argument("--max-error-rate", type=float, help="fail if the failed-turn fraction exceeds this")
+    args = parser.parse_args()
+
+    traces = json.loads(args.traces.read_text(encoding="utf-8"))["traces"]
+    server = None
+    if not args.url:
+        server = FakeOpenAI(latency=args.latency, reply=_reply_for(traces), error_rate=args.error_rate, seed=0,
+                            token_delay=(1.0 / args.token_rate) if args.token_rate else 0.0).start()
+        os.environ.update(OPENAI_API_KEY="sk-fake", OPENAI_BASE_URL=server.base_url)
+        from backend import app  # noqa: F401  (import cost stays out of the measurement)
+    if args.trace_memory:
+        tracemalloc.start()
+    mark = {"traced": 0, "sessions": 0, "bytes": 0, "requests": 0, "errors": 0, "prompt": 0, "completion": 0}
+
+    def baseline():
+        gc.collect()
+        if args.trace_memory:
+            mark["traced"] = tracemalloc.get_traced_memory()[0]
+        if server is not None:
+            from backend import context_manager as ctx
+            store = ctx.session_stats()
+            mark.update(sessions=store.get("sessions", 0), bytes=store.get("bytes", 0), requests=server.requests,
+                        errors=server.errors, prompt=server.prompt_tokens, completion=server.completion_tokens)
+
+    try:
+        samples, failures, shed, elapsed = asyncio.run(_run(args, traces, baseline))
+    finally:
+        if server is not None:
+            server.stop()
+
+    latencies = [s for _, s in samples]
+    failed = sum(failures.values())
+    print(f"{len(samples)} turns from {args.users} users in {elapsed:.2f}s: {len(samples) / elapsed:.1f} turns/s, "
+          f"{failed} failed, {sum(shed.values())} shed")
+    print(f"{'intent':<12}{'turns':>7}{'p50':>9}{'p95':>9}{'p99':>9}")
+    by_kind = defaultdict(list)
+    for kind, s in samples:
+        by_kind[kind].append(s)
+    for kind, values in sorted(by_kind.items()) + [("all", latencies)]:
+        print(f"{kind:<12}{len(values):>7}{_percentile(values, 0.5):>9.3f}{_percentile(values, 0.95):>9.3f}"
+              f"{_percentile(values, 0.99):>9.3f}")
+    if server is not None:
+        print(f"upstream: {server.requests - mark['requests']} completions, {server.errors - mark['errors']} "
+              f"injected errors, {server.prompt_tokens - mark['prompt']} prompt / "
+              f"{server.completion_tokens - mark['completion']} completion tokens")
+        from backend import context_manager as ctx
+        store = ctx.session_stats()
+        sessions = max(1, store.get("sessions", 0) - mark["sessions"])
+        line = f"memory: {(store.get('bytes', 0) - mark['bytes']) / sessions / 1024:.1f} KiB/session (store estimate, {sessions} sessions)"
+        if args.trace_memory:
+            gc.collect()
+            retained = tracemalloc.get_traced_memory()[0] - mark["traced"]
+            line += f", {retained / sessions / 1024:.1f} KiB/session retained (tracemalloc)"
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 if sys.platform != "darwin" else 1024 ** 2)
+        print(line + f", peak RSS {peak:.0f} MiB")
+
+    p95, error_rate = _percentile(latencies, 0.95), failed / max(1, len(samples))
+    breached = []
+    if args.max_p95 is not None and p95 > args.max_p95:
+        breached.append(f"p95 {p95:.3f}s > {args.max_p95}s")
+    if args.max_error_rate is not None and error_rate > args.max_error_rate:
+        breached.append(f"error rate {error_rate:.3f} > {args.max_error_rate}")
+    if breached:
+        print("FAIL: " + "; ".join(breached))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
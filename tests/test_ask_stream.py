@@ -0,0 +1,44 @@
+"""/ask/stream must not report an edit that failed as done."""
+
+import json
+
+from fastapi.testclient import TestClient
+
+from backend import app as app_module
+from backend import context_manager as ctx
+
+RECIPE = {"name": "Pancakes", "ingredients": [{"name": "milk", "quantity": "1 cup"}], "steps": ["Mix the milk."]}
+
+
+def _events(body: str):
+    out = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        out.append((lines["event"], json.loads(lines["data"])))
+    return out
+
+
+def test_failed_modify_stream_reports_unchanged_recipe(monkeypatch):
+    async def parse(message, history):
+        return {"intent": "replace", "recipe_name": None, "dislikes": [],
+                "replacements": [{"src": "milk", "dst": "oat milk"}]}
+
+    async def broken_stream(*args, **kwargs):
+        yield '{"name": "Panc'
+        raise RuntimeError("connection reset")
+
+    monkeypatch.setattr(app_module, "has_llm", lambda: True)
+    monkeypatch.setattr(app_module, "parse_intent_async", parse)
+    monkeypatch.setattr(app_module, "rewrite_recipe", lambda *a: (None, "llm"))
+    monkeypatch.setattr(app_module.llm, "modify_recipe_stream", broken_stream)
+    ctx.reset_session("stream-fail")
+    ctx.set_current_recipe("stream-fail", RECIPE)
+
+    response = TestClient(app_module.app).post("/ask/stream", json={"message": "use oat milk instead of milk",
+                                                                   "session_id": "stream-fail"})
+    event, done = _events(response.text)[-1]
+    assert event == "done"
+    assert done["failed"] is True
+    assert "unchanged" in done["reply"] and not done["reply"].startswith("Updated")
+    assert done["recipe"]["ingredients"][0]["name"] == "milk"
+    assert ctx.get_current_recipe("stream-fail")["name"] == "Pancakes"
@@ -0,0 +1,75 @@
+"""Local intent rules: clear requests are answered, chat falls through to the LLM."""
+
+import pytest
+
+from backend import intent_rules
+
+
+# ordinary chat or non-food requests: must not be classified with enough
+# confidence to skip the LLM parser
+CHAT = [
+    "I don't want to cook tonight",
+    "I'm out of time",
+    "I don't have an oven",
+    "Make me laugh",
+    "give me a joke",
+    "show me my saved recipes",
+    "give me another recipe",
+    "I want something vegetarian",
+    "I would like a different one",
+    "make it spicier",
+    "cook something else",
+    "recipe for something vegetarian",
+    "what's for dinner",
+    "hmm, mushrooms are not really my thing",
+    "something warm like a ramen tonight?",
+    "a recipe",
+    "any recipe",
+    "give me a vegan recipe",
+    "show me a quick recipe",
+    "what is a good recipe for a party?",
+    "how do i make my sauce thicker",
+    "how do i make pasta healthier",
+    "I don't like cooking",
+]
+
+# questions that mention a recipe phrasing: left to the LLM
+QUESTIONS = [
+    "is there a recipe for lasagna?",
+    "what's your favourite chili recipe",
+]
+
+CLEAR = [
+    ("recipe for lasagna", "get_recipe", "lasagna"),
+    ("how do I make pancakes", "get_recipe", "pancakes"),
+    ("give me a chili recipe", "get_recipe", "chili"),
+    ("I want to make carbonara", "get_recipe", "carbonara"),
+    ("chicken curry recipe", "get_recipe", "chicken curry"),
+    ("vegan lasagna recipe", "get_recipe", "vegan lasagna"),
+    ("can you give me a recipe for lasagna?", "get_recipe", "lasagna"),
+    ("I don't like mushrooms", "add_dislike", ["mushrooms"]),
+    ("I'm allergic to peanuts", "add_dislike", ["peanuts"]),
+    ("replace milk with oat milk", "replace", [{"src": "milk", "dst": "oat milk"}]),
+]
+
+_THRESHOLD = 0.8  # INTENT_MIN_CONFIDENCE default
+
+
+@pytest.mark.parametrize("message", CHAT + QUESTIONS)
+def test_chat_falls_through_to_llm(message):
+    _, confidence = intent_rules.classify(message)
+    assert confidence < _THRESHOLD
+
+
+@pytest.mark.parametrize("message", CHAT)
+def test_chat_is_not_guessed_as_a_dish(message):
+    assert intent_rules.guess_recipe_name(message) is None
+
+
+@pytest.mark.parametrize("message,intent,value", CLEAR)
+def test_clear_requests_skip_llm(message, intent, value):
+    result, confidence = intent_rules.classify(message)
+    assert confidence >= _THRESHOLD
+    assert result["intent"] == intent
+    field = {"get_recipe": "recipe_name", "add_dislike": "dislikes", "replace": "replacements"}[intent]
+    assert result[field] == value
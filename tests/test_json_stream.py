@@ -0,0 +1,93 @@
+"""Lenient and incremental JSON parsing of model output (corpus and fuzz)."""
+
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from backend.utils.json_stream import RecipeStreamParser, loads_lenient
+
+
+CORPUS = json.loads((Path(__file__).resolve().parent.parent / "benchmarks" / "corpus" / "model_outputs.json")
+                    .read_text(encoding="utf-8"))
+_NOISE = '{}[]",:\\ \nabc01-.tfn'
+
+
+def _recipe(rng: random.Random, n_ing: int, n_steps: int):
+    return {
+        "name": f"dish {rng.randint(0, 999)} \"special\" é",
+        "ingredients": [{"name": f"item {i}", "quantity": f"{rng.randint(1, 9)}/2 cup"} for i in range(n_ing)],
+        "steps": [f"Step {i}: stir\\n well at {rng.randint(100, 250)}°C." for i in range(n_steps)],
+    }
+
+
+def _stream(text: str, rng: random.Random):
+    parser = RecipeStreamParser()
+    events = []
+    i = 0
+    while i < len(text):
+        k = rng.randint(1, 16)
+        events += parser.feed(text[i:i + k])
+        i += k
+    recipe, tail = parser.close()
+    return recipe, events + tail
+
+
+def _is_prefix(part, full) -> bool:
+    """part was recovered from a truncation of full."""
+    if isinstance(part, dict):
+        return isinstance(full, dict) and all(k in full and _is_prefix(v, full[k]) for k, v in part.items())
+    if isinstance(part, list):
+        return (isinstance(full, list) and len(part) <= len(full)
+                and all(_is_prefix(a, b) for a, b in zip(part[:-1], full))
+                and (not part or _is_prefix(part[-1], full[len(part) - 1])))
+    return part == full
+
+
+@pytest.mark.parametrize("case", CORPUS, ids=[c["name"] for c in CORPUS])
+def test_corpus(case):
+    value, complete = loads_lenient(case["text"])
+    assert (value, complete) == (case["expected"], case["complete"])
+    recipe, _ = _stream(case["text"], random.Random(0))
+    if complete and isinstance(value, dict):
+        assert recipe == value
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_truncations_recover_a_prefix(seed):
+    rng = random.Random(seed)
+    full = _recipe(rng, rng.randint(0, 8), rng.randint(0, 8))
+    text = json.dumps(full, ensure_ascii=False, indent=rng.choice([None, 1]))
+    for cut in range(len(text) + 1):
+        value, complete = loads_lenient(text[:cut])
+        assert value is None or _is_prefix(value, full), text[:cut]
+        assert complete == (cut == len(text)) or value is None, text[:cut]
+    recipe, events = _stream(text, rng)
+    assert recipe == full
+    assert [e for e, _ in events].count("step") == len(full["steps"])
+
+
+def test_complete_documents_parse_like_json_loads():
+    rng = random.Random(1)
+    for _ in range(50):
+        text = json.dumps(_recipe(rng, rng.randint(0, 6), rng.randint(0, 6)))
+        assert loads_lenient(text) == (json.loads(text), True)
+
+
+def test_garbled_documents_never_raise():
+    rng = random.Random(2)
+    for _ in range(300):
+        text = list(json.dumps(_recipe(rng, rng.randint(0, 6), rng.randint(0, 6))))
+        for _ in range(rng.randint(1, 6)):
+            op, pos = rng.random(), rng.randrange(len(text) + 1)
+            if op < 0.4:
+                text.insert(pos, rng.choice(_NOISE))
+            elif op < 0.7 and pos < len(text):
+                del text[pos]
+            elif pos < len(text):
+                text[pos] = rng.choice(_NOISE)
+        garbled = "".join(text)
+        value, _ = loads_lenient(garbled)
+        assert value is None or isinstance(value, (dict, list))
+        _stream(garbled, rng)
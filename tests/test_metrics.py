@@ -0,0 +1,27 @@
+"""The /metrics exposition must be accepted by Prometheus as a whole."""
+
+import re
+
+from fastapi.testclient import TestClient
+
+from backend.app import app
+
+
+def _scrape() -> str:
+    response = TestClient(app).get("/metrics")
+    assert response.status_code == 200
+    return response.text
+
+
+def test_each_metric_has_one_type():
+    names = re.findall(r"^# TYPE (\S+) \S+$", _scrape(), re.M)
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    assert not duplicates, duplicates
+
+
+def test_samples_belong_to_one_family():
+    owner = {}
+    for name, kind in re.findall(r"^# TYPE (\S+) (\S+)$", _scrape(), re.M):
+        for suffix in (("_bucket", "_sum", "_count") if kind == "histogram" else ("",)):
+            assert name + suffix not in owner, (name, owner.get(name + suffix))
+            owner[name + suffix] = name
@@ -0,0 +1,68 @@
+"""Fallback routing and the response cache."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from backend import llm_cache, llm_interface, model_routing, resilience
+
+RECIPE = {"name": "Pancakes", "ingredients": [{"name": "flour", "quantity": "1 cup"}], "steps": ["Mix."]}
+
+
+class _Completions:
+    def __init__(self, failing):
+        self.failing = failing
+        self.models = []
+
+    def _answer(self, model):
+        self.models.append(model)
+        if model in self.failing:
+            raise RuntimeError(f"{model} is down")
+        message = SimpleNamespace(content=json.dumps(RECIPE))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+    def create(self, model, **params):
+        return self._answer(model)
+
+
+class _AsyncCompletions(_Completions):
+    async def create(self, model, **params):
+        return self._answer(model)
+
+
+def _client(completions):
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+
+@pytest.fixture
+def routed(monkeypatch):
+    monkeypatch.setenv("OPENAI_MODEL_GENERATE", "primary,backup")
+    monkeypatch.setattr(model_routing, "_ROUTES", None)
+    monkeypatch.setattr(resilience, "_RESILIENCE", None)
+    monkeypatch.setattr(llm_cache, "_CACHE", llm_cache.ResponseCache(max_entries=16))
+    return llm_cache.generate_key("primary", "pancakes", [])
+
+
+def test_fallback_answer_is_not_cached(routed, monkeypatch):
+    completions = _Completions(failing={"primary"})
+    monkeypatch.setattr(llm_interface, "_client", _client(completions))
+    assert llm_interface.generate_recipe("pancakes")["ingredients"] == RECIPE["ingredients"]
+    assert completions.models == ["primary", "backup"]
+    assert llm_cache.get_cache().get(routed) is None
+
+
+def test_primary_answer_is_cached(routed, monkeypatch):
+    monkeypatch.setattr(llm_interface, "_client", _client(_Completions(failing=())))
+    llm_interface.generate_recipe("pancakes")
+    assert llm_cache.get_cache().get(routed) is not None
+
+
+def test_async_fallback_answer_is_not_cached(routed, monkeypatch):
+    completions = _AsyncCompletions(failing={"primary"})
+    monkeypatch.setattr(llm_interface, "_async_client", _client(completions))
+    recipe = asyncio.run(llm_interface.generate_recipe_async("pancakes"))
+    assert recipe["ingredients"] == RECIPE["ingredients"]
+    assert completions.models == ["primary", "backup"]
+    assert llm_cache.get_cache().get(routed) is None
@@ -0,0 +1,28 @@
+"""Patched recipes are checked with the same term matching as substitutions."""
+
+import pytest
+
+from backend.recipe_patch import PatchError, check_avoided
+
+
+def _recipe(*names):
+    return {"name": "Test", "ingredients": [{"name": n, "quantity": ""} for n in names], "steps": ["Cook."]}
+
+
+@pytest.mark.parametrize("names,avoid,allowed", [
+    (["eggplant", "buttermilk"], ["egg", "butter"], []),
+    (["oat milk", "Oat Milks"], ["milk"], ["oat milk"]),
+    (["olive oil"], ["Butter"], ["olive oil"]),
+])
+def test_allowed_and_longer_words_pass(names, avoid, allowed):
+    check_avoided(_recipe(*names), avoid, allowed)
+
+
+@pytest.mark.parametrize("names,avoid", [
+    (["2 Eggs"], ["egg"]),
+    (["button mushrooms"], ["Mushroom"]),
+    (["whole  milk", "oat milk"], ["milk"]),
+])
+def test_remaining_terms_are_rejected(names, avoid):
+    with pytest.raises(PatchError):
+        check_avoided(_recipe(*names), avoid, ["oat milk"])
@@ -0,0 +1,21 @@
+"""Recipe index source selection."""
+
+import json
+
+from backend import recipe_retrieval as rr
+from backend.recipe_index import RecipeIndex
+
+
+def test_index_path_json_is_loaded(tmp_path, monkeypatch):
+    path = tmp_path / "catalogue.json"
+    path.write_text(json.dumps({"recipes": [{"name": "Test Shakshuka", "ingredients": [], "steps": []}]}))
+    monkeypatch.setenv("RECIPES_INDEX_PATH", str(path))
+    index = rr.get_index()
+    assert len(index) == 1
+    assert index.get("test shakshuka")["name"] == "Test Shakshuka"
+
+
+def test_exact_name_wins_over_earlier_substring_match():
+    index = RecipeIndex.from_recipes([{"name": "Banana pancakes"}, {"name": "Pancakes"}])
+    assert index.get("pancakes")["name"] == "Pancakes"
+    assert index.get("pancake")["name"] == "Banana pancakes"
@@ -0,0 +1,42 @@
+"""Local replace: exact swaps are applied, partial-name matches go to the LLM."""
+
+from backend.recipe_rewrite import rewrite_recipe
+
+
+RECIPE = {
+    "name": "Curry",
+    "ingredients": [
+        {"name": "coconut milk", "quantity": "1 can"},
+        {"name": "Chicken breast", "quantity": "2"},
+        {"name": "eggs", "quantity": "2"},
+        {"name": "butter", "quantity": "1 tbsp"},
+    ],
+    "steps": ["Melt the butter.", "Fry the chicken breast.", "Stir in the coconut milk and the eggs."],
+}
+
+
+def _names(recipe):
+    return [i["name"] for i in recipe["ingredients"]]
+
+
+def test_exact_swap_is_local():
+    out, reason = rewrite_recipe(RECIPE, [{"src": "butter", "dst": "olive oil"}], [])
+    assert reason == "local"
+    assert _names(out)[3] == "olive oil"
+    assert out["steps"][0] == "Melt the olive oil."
+
+
+def test_plural_swap_is_local():
+    out, reason = rewrite_recipe(RECIPE, [{"src": "egg", "dst": "flax egg"}], [])
+    assert reason == "local"
+    assert _names(out)[2] == "flax eggs"
+
+
+def test_term_inside_longer_name_is_ambiguous():
+    assert rewrite_recipe(RECIPE, [{"src": "milk", "dst": "oat milk"}], []) == (None, "ambiguous")
+    assert rewrite_recipe(RECIPE, [{"src": "chicken", "dst": "tofu"}], []) == (None, "ambiguous")
+
+
+def test_missing_and_technique():
+    assert rewrite_recipe(RECIPE, [{"src": "cheese", "dst": "tofu"}], []) == (None, "missing")
+    assert rewrite_recipe(RECIPE, [{"src": "chicken breast", "dst": "tofu"}], []) == (None, "technique")
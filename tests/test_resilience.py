@@ -0,0 +1,53 @@
+"""Circuit breaker accounting in Resilience.call."""
+
+import asyncio
+
+import pytest
+
+from backend.resilience import CircuitBreaker, CircuitOpen, Resilience, Unavailable
+
+
+class _Status(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def _policy(failures=2):
+    return Resilience(CircuitBreaker(failures=failures, reset_after=60), retries=0, hedge=False)
+
+
+def _failing(exc):
+    async def attempt(timeout):
+        raise exc
+    return attempt
+
+
+def test_non_retryable_errors_do_not_open_the_breaker():
+    policy = _policy()
+    for _ in range(5):
+        with pytest.raises(_Status):
+            asyncio.run(policy.call("chat_json", _failing(_Status(400))))
+    assert policy.breaker.state == "closed"
+    assert policy.breaker.stats()["consecutive_failures"] == 0
+
+
+def test_retryable_errors_open_the_breaker():
+    policy = _policy()
+    for _ in range(2):
+        with pytest.raises(Unavailable):
+            asyncio.run(policy.call("chat_json", _failing(_Status(503))))
+    assert policy.breaker.state == "open"
+    with pytest.raises(CircuitOpen):
+        asyncio.run(policy.call("chat_json", _failing(_Status(503))))
+
+
+def test_non_retryable_error_ends_a_probe_without_reopening():
+    policy = _policy(failures=1)
+    with pytest.raises(Unavailable):
+        asyncio.run(policy.call("chat_json", _failing(ConnectionError("reset"))))
+    policy.breaker.reset_after = 0
+    with pytest.raises(_Status):
+        asyncio.run(policy.call("chat_json", _failing(_Status(400))))
+    assert policy.breaker.state == "half_open"
+    assert policy.breaker.allow()  # the next call may probe
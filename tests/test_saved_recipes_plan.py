@@ -0,0 +1,67 @@
+"""Query plans of the saved-recipe listing on SQLite (the schema's indexes must be used)."""
+
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from backend import saved_recipes  # noqa: E402
+from backend.database import Base  # noqa: E402
+from backend.models import User  # noqa: E402
+
+RECIPES = [
+    {"name": "Chicken curry", "ingredients": [{"name": "chicken thighs"}, {"name": "coconut milk"}]},
+    {"name": "Cheese toast", "ingredients": [{"name": "bread"}, {"name": "cheddar cheese"}]},
+    {"name": "Dal", "ingredients": [{"name": "red lentils"}, {"name": "butter"}]},
+]
+
+
+def _plans(tmp_path, *statements):
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'plan.db'}")
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            user = uuid.uuid4()
+            async with async_sessionmaker(engine)() as session:
+                session.add(User(user_id=user, email=f"{user}@test", password_hash="x"))
+                await session.flush()
+                await saved_recipes.save_many(session, user, RECIPES)
+                await session.commit()
+                out = []
+                for build in statements:
+                    compiled = build(user).compile(engine, compile_kwargs={"literal_binds": True})
+                    rows = (await session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))).all()
+                    out.append("\n".join(str(r[-1]) for r in rows))
+                return out
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+def test_pages_use_the_keyset_index(tmp_path):
+    cursor = saved_recipes.encode_cursor(datetime.now(timezone.utc), 10)
+    first, later = _plans(
+        tmp_path,
+        lambda user: saved_recipes.page_query(user, 21),
+        lambda user: saved_recipes.page_query(user, 21, cursor),
+    )
+    for plan in (first, later):
+        assert "ix_saved_recipes_user_saved" in plan, plan
+        assert "TEMP B-TREE" not in plan, plan  # ordered by the index, no sort
+    assert "saved_at<?" in later, later  # the cursor is an index range, not a filter
+
+
+def test_ingredient_filters_use_the_term_index(tmp_path):
+    (plan,) = _plans(tmp_path, lambda user: saved_recipes.page_query(user, 21, include=["chicken"],
+                                                                     exclude=["dairy"]))
+    assert "ix_saved_recipe_ingredients_user_term (user_id=? AND term=?)" in plan, plan
+    # excludes probe the (recipe_id, term) primary key per candidate
+    assert "(recipe_id=? AND term=?)" in plan, plan
+    assert "SCAN" not in plan, plan
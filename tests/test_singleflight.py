@@ -0,0 +1,83 @@
+"""SingleFlight: identical concurrent calls share one upstream call."""
+
+import asyncio
+
+import pytest
+
+from backend.singleflight import SingleFlight
+
+N = 50
+
+
+def _upstream(calls, result=None, error=None, delay=0.02):
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return result
+    return call
+
+
+def test_concurrent_identical_calls_share_one_upstream_call():
+    flight, calls = SingleFlight(), []
+    result = {"text": "lasagna"}
+
+    async def run():
+        return await asyncio.gather(*(flight.do("k", _upstream(calls, result)) for _ in range(N)))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(r is result for r in results)
+    assert flight.stats() == {"leaders": 1, "deduplicated": N - 1, "abandoned": 0, "in_flight": 0}
+
+
+def test_exception_reaches_every_waiter():
+    flight, calls = SingleFlight(), []
+    error = RuntimeError("upstream failed")
+
+    async def run():
+        return await asyncio.gather(*(flight.do("k", _upstream(calls, error=error)) for _ in range(N)),
+                                    return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(r is error for r in results)
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_different_keys_are_not_coalesced():
+    flight, calls = SingleFlight(), []
+
+    async def run():
+        return await asyncio.gather(*(flight.do(str(i), _upstream(calls, i)) for i in range(5)))
+
+    assert asyncio.run(run()) == list(range(5))
+    assert len(calls) == 5
+
+
+def test_next_call_after_completion_starts_fresh():
+    flight, calls = SingleFlight(), []
+
+    async def run():
+        await flight.do("k", _upstream(calls, 1))
+        return await flight.do("k", _upstream(calls, 2))
+
+    assert asyncio.run(run()) == 2
+    assert len(calls) == 2
+
+
+def test_cancelled_waiter_does_not_cancel_the_others():
+    flight, calls = SingleFlight(), []
+
+    async def run():
+        first = asyncio.ensure_future(flight.do("k", _upstream(calls, "ok", delay=0.05)))
+        second = asyncio.ensure_future(flight.do("k", _upstream(calls, "ok", delay=0.05)))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "ok"
+    assert len(calls) == 1
@@ -0,0 +1,58 @@
+"""Discarded speculations count against the token budget, also when cancelled in flight."""
+
+import asyncio
+from types import SimpleNamespace
+
+from backend import llm_interface as llm
+from backend.speculation import Speculator
+
+MESSAGES = [{"role": "user", "content": "Write a detailed lasagna recipe. " * 20}]
+
+
+class _Hanging:
+    """Completions that never answer, like a slow generation cut short by the parsed intent."""
+
+    def __init__(self):
+        self.sent = 0
+
+    async def create(self, **kwargs):
+        self.sent += 1
+        await asyncio.sleep(3600)
+
+
+def _generate(completions):
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return lambda: llm._attempt(client, "generate_recipe", {"model": "m", "messages": MESSAGES}, 3600)
+
+
+def test_cancelled_speculation_is_charged_its_prompt():
+    async def run():
+        speculator = Speculator(token_budget=0)
+        spec = speculator.start("lasagna", _generate(_Hanging()))
+        await asyncio.sleep(0.01)  # the request is in flight
+        spec.discard()
+        await asyncio.sleep(0)
+        return speculator.stats()
+
+    stats = asyncio.run(run())
+    assert stats["cancelled"] == 1
+    assert stats["wasted_tokens"] >= llm._prompt_tokens({"messages": MESSAGES}) > 0
+
+
+def test_budget_stops_speculation_after_cancelled_guesses():
+    async def run():
+        completions = _Hanging()
+        budget = 3 * llm._prompt_tokens({"messages": MESSAGES})
+        speculator = Speculator(token_budget=budget)
+        for _ in range(10):
+            spec = speculator.start("lasagna", _generate(completions))
+            if spec is None:
+                break
+            await asyncio.sleep(0.01)
+            spec.discard()
+            await asyncio.sleep(0)
+        return speculator.stats(), completions.sent
+
+    stats, sent = asyncio.run(run())
+    assert stats["skipped_budget"] == 1
+    assert stats["started"] == sent == 3
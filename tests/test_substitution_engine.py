@@ -0,0 +1,73 @@
+"""Static substitution lookups match whole words only; failed LLM batches are not memoized."""
+
+import asyncio
+import json
+
+import pytest
+
+from backend import substitution_engine as se
+
+
+@pytest.mark.parametrize("ingredient,expected", [
+    ("button mushrooms", se.SUBSTITUTIONS["mushroom"]),
+    ("Eggs", se.SUBSTITUTIONS["egg"]),
+    ("whole milk", se.SUBSTITUTIONS["milk"]),
+    ("eggplant", None),
+    ("buttermilk", None),
+])
+def test_known_substitutes_match_whole_words(ingredient, expected):
+    assert se.known_substitutes(ingredient) == expected
+
+
+def test_known_substitutions_leave_longer_words_alone():
+    recipe = {
+        "name": "Roast eggplant",
+        "ingredients": [{"name": "eggplant", "quantity": "1"}, {"name": "buttermilk", "quantity": "1 cup"},
+                        {"name": "egg", "quantity": "2"}],
+        "steps": ["Slice the eggplant.", "Whisk the egg into the buttermilk."],
+    }
+    out = se.apply_known_substitutions(recipe, {"egg", "butter"})
+    names = [i["name"] for i in out["ingredients"]]
+    assert names[:2] == ["eggplant", "buttermilk"]
+    assert names[2] == se.SUBSTITUTIONS["egg"][0]
+    assert "eggplant" in out["steps"][0] and "buttermilk" in out["steps"][1]
+
+
+@pytest.fixture
+def batch(monkeypatch, tmp_path):
+    monkeypatch.setenv("SUBSTITUTIONS_LEARNED_PATH", str(tmp_path / "learned.json"))
+    monkeypatch.setattr(se, "_LEARNED", None)
+    monkeypatch.setattr(se, "_MEMO", se.ResponseCache(max_entries=16))
+    monkeypatch.setattr(se, "has_llm", lambda: True)
+    replies = []
+    monkeypatch.setattr(se, "chat_json", lambda *a, **kw: replies.pop(0))
+
+    async def chat_json_async(*a, **kw):
+        return replies.pop(0)
+
+    monkeypatch.setattr(se, "chat_json_async", chat_json_async)
+    return replies
+
+
+def test_failed_batch_is_not_memoized(batch):
+    batch.append({})  # chat_json's answer when the call failed
+    assert se.resolve_substitutes(["yuzu"]) == {"yuzu": [se._LLM_DEFAULT]}
+    assert se.known_substitutes("yuzu") is None
+    batch.append({"substitutes": {"yuzu": ["lemon", "lime"]}})
+    assert se.resolve_substitutes(["yuzu"]) == {"yuzu": ["lemon", "lime"]}
+
+
+def test_key_left_out_by_the_model_is_memoized(batch):
+    batch.append({"substitutes": {"yuzu": ["lemon"]}})
+    out = se.resolve_substitutes(["yuzu", "sumac"])
+    assert out == {"yuzu": ["lemon"], "sumac": [se._LLM_DEFAULT]}
+    assert se.known_substitutes("sumac") == [se._LLM_DEFAULT]
+    assert not batch  # answered from the memo and the learned table, no second call
+    assert se.resolve_substitutes(["yuzu", "sumac"]) == out
+
+
+def test_async_batch_learns_and_skips_failures(batch, tmp_path):
+    batch.extend([{}, {"substitutes": {"yuzu": ["lemon"]}}])
+    assert asyncio.run(se.resolve_substitutes_async(["yuzu"])) == {"yuzu": [se._LLM_DEFAULT]}
+    assert asyncio.run(se.resolve_substitutes_async(["yuzu"])) == {"yuzu": ["lemon"]}
+    assert json.loads((tmp_path / "learned.json").read_text()) == {"yuzu": ["lemon"]}
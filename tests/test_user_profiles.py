@@ -0,0 +1,56 @@
+"""Profile terms are loaded once per session and reloaded after a write."""
+
+import asyncio
+import uuid
+
+import pytest
+
+from backend import llm_cache, user_profiles
+from backend.session_store import SessionState, _dump, _load
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    calls = []
+
+    async def load(user_id):
+        calls.append(user_id)
+        return frozenset({"peanut"})
+
+    monkeypatch.setattr(user_profiles, "_load", load)
+    # no per-user cache: every lookup that is not skipped reaches the database
+    monkeypatch.setattr(user_profiles, "_CACHE", llm_cache.ResponseCache(max_entries=0))
+    monkeypatch.setattr(user_profiles, "_GENERATION", {})
+    return calls
+
+
+def test_session_reuses_its_terms(loads):
+    user = uuid.uuid4()
+    terms, version = asyncio.run(user_profiles.session_dislikes(user, ""))
+    assert terms == {"peanut"}
+    for _ in range(3):
+        assert asyncio.run(user_profiles.session_dislikes(user, version)) is None
+    assert len(loads) == 1
+
+
+def test_write_or_other_user_reloads(loads):
+    user = uuid.uuid4()
+    _, version = asyncio.run(user_profiles.session_dislikes(user, ""))
+    assert asyncio.run(user_profiles.session_dislikes(uuid.uuid4(), version)) is not None
+    user_profiles._GENERATION[str(user)] = 1  # as update_profile does
+    _, newer = asyncio.run(user_profiles.session_dislikes(user, version))
+    assert newer != version
+    assert len(loads) == 3
+
+
+def test_failed_load_is_retried(monkeypatch, loads):
+    async def broken(user_id):
+        raise RuntimeError("database down")
+
+    monkeypatch.setattr(user_profiles, "_load", broken)
+    assert asyncio.run(user_profiles.session_dislikes(uuid.uuid4(), "")) == (frozenset(), "")
+
+
+def test_version_survives_the_shared_session_store():
+    state = SessionState(profile_dislikes=frozenset({"peanut"}), profile_version="u:2")
+    assert _load(_dump(state)).profile_version == "u:2"